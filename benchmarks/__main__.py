@@ -0,0 +1,177 @@
+"""
+Run the benchmarks without ``asv``
+
+Executes every ``time_*`` method of the benchmark classes for all
+parameter combinations, reporting the best of several repeats.
+Results can be saved to a JSON file named after the current commit,
+and compared against results from a previous commit::
+
+    $ python -m benchmarks --save benchmarks/results
+    $ git checkout feature
+    $ python -m benchmarks --compare benchmarks/results/<commit>.json
+
+Positional arguments select benchmarks containing any of the given
+strings, e.g. ``python -m benchmarks cram TimeDataBank``.
+
+The suite is also configured for ``asv`` through ``asv.conf.json`` in
+the root of the repository, which stores results for each commit
+benchmarked, e.g. ``asv continuous master HEAD``.
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import pathlib
+import platform
+import subprocess
+import sys
+import time
+
+import numpy
+
+PACKAGE = pathlib.Path(__file__).parent
+
+
+def discover():
+    """Yield benchmark classes from all ``bench_*`` modules"""
+    for path in sorted(PACKAGE.glob("bench_*.py")):
+        module = importlib.import_module(f"{__package__}.{path.stem}")
+        for name in sorted(dir(module)):
+            obj = getattr(module, name)
+            if isinstance(obj, type) and name.startswith("Time"):
+                yield path.stem[len("bench_"):], obj
+
+
+def getCommit():
+    """Current commit and a flag indicating uncommitted changes"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=PACKAGE, capture_output=True,
+            check=True, text=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=PACKAGE,
+            capture_output=True, check=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(status)
+
+
+def runBenchmark(bench, method, params, repeat):
+    """Best time [s] of ``repeat`` calls, or None if skipped"""
+    case = bench()
+    setup = getattr(case, "setup", None)
+    if setup is not None:
+        try:
+            setup(*params)
+        except NotImplementedError:
+            return None
+    func = getattr(case, method)
+    best = numpy.inf
+    # Slow benchmarks may limit the number of repeats, as in asv
+    limit = getattr(bench, "repeat", repeat)
+    if isinstance(limit, int) and limit > 0:
+        repeat = min(repeat, limit)
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(*params)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        teardown = getattr(case, "teardown", None)
+        if teardown is not None:
+            teardown(*params)
+    return best
+
+
+def runAll(patterns, repeat):
+    results = {}
+    for module, bench in discover():
+        params = getattr(bench, "params", ())
+        names = getattr(bench, "param_names", ())
+        methods = sorted(m for m in dir(bench) if m.startswith("time_"))
+        for method in methods:
+            for combo in itertools.product(*params):
+                label = ", ".join(f"{k}={v}" for k, v in zip(names, combo))
+                key = f"{module}.{bench.__name__}.{method}({label})"
+                if patterns and not any(p in key for p in patterns):
+                    continue
+                best = runBenchmark(bench, method, combo, repeat)
+                results[key] = best
+                if best is None:
+                    print(f"{key}: skipped")
+                else:
+                    print(f"{key}: {best:.4e} s")
+                sys.stdout.flush()
+    return results
+
+
+def compare(results, previous, threshold):
+    """Print the ratio of current to previous timings"""
+    print(f"\nCompared to {previous['commit']}:")
+    for key, current in results.items():
+        old = previous["results"].get(key)
+        if current is None or old is None:
+            continue
+        ratio = current / old
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  SLOWER"
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{ratio:7.3f} {key}{flag}")
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__package__}", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "patterns", nargs="*", help="Only run benchmarks containing these strings"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of calls for each benchmark"
+    )
+    parser.add_argument(
+        "--save", type=pathlib.Path, help="Directory to write <commit>.json results"
+    )
+    parser.add_argument(
+        "--compare", type=pathlib.Path, help="Previous results to compare against"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="Relative change flagged when comparing. Default: 0.1",
+    )
+    options = parser.parse_args(args)
+
+    results = runAll(options.patterns, options.repeat)
+
+    if options.compare is not None:
+        with options.compare.open() as stream:
+            compare(results, json.load(stream), options.threshold)
+
+    if options.save is not None:
+        commit, dirty = getCommit()
+        options.save.mkdir(parents=True, exist_ok=True)
+        dest = options.save / f"{commit}{'-dirty' if dirty else ''}.json"
+        with dest.open("w") as stream:
+            json.dump(
+                {
+                    "commit": commit,
+                    "dirty": dirty,
+                    "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "machine": platform.node(),
+                    "python": platform.python_version(),
+                    "numpy": numpy.__version__,
+                    "results": results,
+                },
+                stream,
+                indent=2,
+            )
+        print(f"Results written to {dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Benchmarks for reading the depletion chain and forming matrices
+"""
+
+import hydep
+
+from .common import CHAIN_FILE, loadChain, getFissionYields, getReactionRates
+
+
+class TimeChainRead:
+    """Parse the ENDF/B-VII.1 chain from XML"""
+
+    timeout = 120
+
+    def time_fromXml(self):
+        hydep.DepletionChain.fromXml(str(CHAIN_FILE))
+
+
+class TimeFormMatrix:
+    """Build depletion matrices from reaction rates and fission yields"""
+
+    params = ([1, 100, 1000], )
+    param_names = ["materials"]
+
+    def setup(self, nmaterials):
+        self.chain = loadChain()
+        self.rates = getReactionRates(self.chain, nmaterials)
+        self.fissionYields = getFissionYields(self.chain, nmaterials)
+        # Build the cached matrix pattern outside the timed region
+        self.chain.getMatrixPattern()
+
+    def time_formMatrix(self, nmaterials):
+        for rates, fissionYields in zip(self.rates, self.fissionYields):
+            self.chain.formMatrix(rates, fissionYields)
+
+    def time_formMatrices(self, nmaterials):
+        self.chain.formMatrices(self.rates, self.fissionYields)
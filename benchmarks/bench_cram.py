@@ -0,0 +1,87 @@
+"""
+Benchmarks for the CRAM depletion solvers
+
+Compares the original ``spsolve`` implementation against the
+SuperLU path with reused orderings, and the compiled elimination
+schedule, using depletion matrices built from the ENDF/B-VII.1
+chain. Run through ``asv`` or the runner in this package::
+
+    $ python -m benchmarks cram
+
+"""
+
+import numpy
+import scipy.sparse
+from scipy.sparse.linalg import spsolve
+
+from hydep.internal.cram import (
+    IPFCramSolver,
+    BatchedCramSolver,
+    Cram16Solver,
+    Cram48Solver,
+)
+
+from .common import DT, loadChain, getFissionYields, getReactionRates
+
+
+def spsolveCram(solver, A, n0, dt):
+    """Reference implementation calling spsolve for every pole"""
+    A = scipy.sparse.csr_matrix(A * dt, dtype=numpy.float64)
+    y = numpy.array(n0, dtype=numpy.float64)
+    ident = scipy.sparse.eye(A.shape[0])
+    for alpha, theta in zip(solver.alpha, solver.theta):
+        y += 2 * numpy.real(alpha * spsolve(A - theta * ident, y))
+    return y * solver.alpha0
+
+
+def buildProblem(nmaterials, seed=20201201):
+    """Depletion matrices and compositions for the ENDF/B-VII.1 chain"""
+    chain = loadChain()
+    rates = getReactionRates(chain, nmaterials, seed)
+    pattern = chain.getMatrixPattern()
+    data = chain.formMatrices(rates, getFissionYields(chain, nmaterials))
+    matrices = [pattern.toCsr(d) for d in data]
+    densities = numpy.random.default_rng(seed).random((nmaterials, len(chain))) * 1e20
+    return matrices, densities
+
+
+def compiledSolver(solver):
+    return IPFCramSolver(solver.alpha, solver.theta, solver.alpha0, compiled=True)
+
+
+class TimeCramSingle:
+    """Deplete a single material"""
+
+    params = (["cram16", "cram48"], ["spsolve", "superlu", "compiled"])
+    param_names = ["order", "method"]
+
+    def setup(self, order, method):
+        self.matrices, self.densities = buildProblem(1)
+        base = Cram16Solver if order == "cram16" else Cram48Solver
+        if method == "spsolve":
+            self.solver = lambda A, n0, dt: spsolveCram(base, A, n0, dt)
+        elif method == "superlu":
+            self.solver = base
+        else:
+            self.solver = compiledSolver(base)
+        # Build orderings and schedules outside the timed region
+        self.solver(self.matrices[0], self.densities[0], DT)
+
+    def time_solve(self, order, method):
+        self.solver(self.matrices[0], self.densities[0], DT)
+
+
+class TimeCramBatched:
+    """Deplete many materials with a batched solver"""
+
+    params = ([20], ["superlu", "compiled"])
+    param_names = ["materials", "method"]
+
+    def setup(self, nmaterials, method):
+        self.matrices, self.densities = buildProblem(nmaterials)
+        base = Cram48Solver if method == "superlu" else compiledSolver(Cram48Solver)
+        self.solver = BatchedCramSolver(base, blockSize=nmaterials)
+        self.solver(self.matrices[:1], self.densities[:1], DT)
+
+    def time_solve(self, nmaterials, method):
+        self.solver(self.matrices, self.densities, DT)
@@ -0,0 +1,31 @@
+"""
+Benchmarks for depleting many materials through the Manager
+"""
+
+import hydep
+from hydep.internal import CompBundle
+
+from .common import DT, loadChain, getFissionYields, getReactionRates, getDensities
+
+
+class TimeManagerDeplete:
+    """Deplete materials in the calling process"""
+
+    params = ([1, 100, 1000], ["cram16", "batchcram16"])
+    param_names = ["materials", "solver"]
+    # Depleting 1000 materials takes about a minute
+    repeat = 1
+    number = 1
+    timeout = 600
+
+    def setup(self, nmaterials, solver):
+        chain = loadChain()
+        self.manager = hydep.Manager(
+            chain, [DT / 86400], [1e4], [1], depletionSolver=solver, numProcesses=1
+        )
+        self.compositions = CompBundle(tuple(chain), getDensities(chain, nmaterials))
+        self.rates = getReactionRates(chain, nmaterials)
+        self.fissionYields = getFissionYields(chain, nmaterials)
+
+    def time_deplete(self, nmaterials, solver):
+        self.manager.deplete(DT, self.compositions, self.rates, self.fissionYields)
@@ -0,0 +1,53 @@
+"""
+Benchmarks for writing Serpent inputs at each coarse step
+
+Requires the optional ``serpentTools`` package used by the Serpent
+interface. Benchmarks are skipped if it is not installed.
+"""
+
+import pathlib
+import tempfile
+
+import hydep
+from hydep.internal import CompBundle, TimeStep
+
+from .common import loadChain, getDensities
+
+
+class TimeSteadyStateFile:
+    """Write compositions of all burnable materials"""
+
+    params = ([100, 1000], )
+    param_names = ["materials"]
+    timeout = 300
+
+    def setup(self, nmaterials):
+        try:
+            from hydep.serpent import SerpentWriter
+        except ImportError as ie:
+            raise NotImplementedError("serpentTools not available") from ie
+
+        chain = loadChain()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmpdir.name) / "serpent-s1"
+        self.writer = SerpentWriter()
+        self.writer.burnable = [
+            hydep.BurnableMaterial(
+                f"fuel{ix}", mdens=10.4, temperature=(600, 900)[ix % 2], U235=1e-3
+            )
+            for ix in range(nmaterials)
+        ]
+        self.writer.base = pathlib.Path(self.tmpdir.name) / "serpent-base.sss"
+        densities = getDensities(chain, nmaterials)
+        # Mimic the many small densities from depletion
+        densities[:, ::3] *= 1e-25
+        self.compositions = CompBundle(tuple(chain), densities)
+        self.timestep = TimeStep(1, 1, 1, 86400)
+
+    def teardown(self, nmaterials):
+        self.tmpdir.cleanup()
+
+    def time_writeSteadyStateFile(self, nmaterials):
+        self.writer.writeSteadyStateFile(
+            self.path, self.compositions, self.timestep, 1e4
+        )
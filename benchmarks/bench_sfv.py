@@ -0,0 +1,43 @@
+"""
+Benchmarks for rebuilding macroscopic cross sections in the SFV solver
+
+Requires the optional ``sfv`` package. Benchmarks are skipped if
+it is not installed.
+"""
+
+import numpy
+
+from hydep.internal import CompBundle
+
+from .common import loadChain, getReactionRates, getDensities
+
+
+class TimeSfvMacroXs:
+    """Reconstruct macroscopic cross sections for the substep solution"""
+
+    params = ([100, 1000, 10000], [1, 4])
+    param_names = ["materials", "threads"]
+    timeout = 300
+
+    def setup(self, nmaterials, threads):
+        try:
+            from hydep.sfv.solver import SfvSolver, DataIndexes
+        except ImportError as ie:
+            raise NotImplementedError("sfv package not available") from ie
+
+        chain = loadChain()
+        self.solver = SfvSolver()
+        self.solver._processIsotopeFissionQ(chain)
+        self.solver._densityCutoff = 1e-10
+        self.solver._macroData = numpy.ones((nmaterials, len(DataIndexes)))
+        self.solver._configureThreads(threads, nmaterials)
+        self.compositions = CompBundle(tuple(chain), getDensities(chain, nmaterials))
+        self.microxs = getReactionRates(chain, nmaterials)
+        # Cache the gather pattern outside the timed region
+        self.solver._updateMacroFromMicroXs(self.compositions, self.microxs)
+
+    def teardown(self, nmaterials, threads):
+        self.solver.finalize(True)
+
+    def time_updateMacroFromMicroXs(self, nmaterials, threads):
+        self.solver._updateMacroFromMicroXs(self.compositions, self.microxs)
@@ -0,0 +1,63 @@
+"""
+Benchmarks for cross section extrapolation and composition bundles
+"""
+
+import numpy
+
+import hydep
+from hydep.internal import DataBank, MaterialDataArray, compBundleFromMaterials
+
+from .common import SEED, loadChain, getReactionRates, getDensities
+
+
+class TimeDataBank:
+    """Extrapolate microscopic cross sections and reaction rates"""
+
+    params = ([100, 1000], ["dense", "sparse"])
+    param_names = ["materials", "storage"]
+
+    def setup(self, nmaterials, storage):
+        chain = loadChain()
+        self.bank = DataBank(
+            3, nmaterials, chain.reactionIndex, order=1, sparse=storage == "sparse"
+        )
+        for step in range(3):
+            xs = getReactionRates(chain, nmaterials, seed=SEED + step)
+            # Mimic reactions that are not tallied in any material
+            xs.data[:, ::4] = 0
+            self.bank.push(step * 86400.0, xs)
+        self.flux = numpy.random.default_rng(SEED).random(nmaterials) * 1e14
+        self.out = MaterialDataArray(
+            chain.reactionIndex, numpy.empty((nmaterials, len(chain.reactionIndex)))
+        )
+
+    def time_at(self, nmaterials, storage):
+        self.bank.at(3.5 * 86400)
+
+    def time_getReactionRatesAt(self, nmaterials, storage):
+        self.bank.getReactionRatesAt(3.5 * 86400, self.flux, out=self.out)
+
+
+class TimeCompBundle:
+    """Collect compositions from burnable materials"""
+
+    params = ([100, 1000], )
+    param_names = ["materials"]
+
+    def setup(self, nmaterials):
+        chain = loadChain()
+        # Fuel-like materials contain a fraction of the isotopes in the chain
+        self.isotopes = tuple(chain)[::4]
+        densities = getDensities(chain, nmaterials)[:, ::4]
+        self.materials = []
+        for ix, row in enumerate(densities):
+            mat = hydep.BurnableMaterial(f"fuel{ix}", adens=row.sum(), volume=1.0)
+            for iso, value in zip(self.isotopes, row):
+                mat[iso.zai] = value
+            self.materials.append(mat)
+
+    def time_compBundleFromMaterials(self, nmaterials):
+        compBundleFromMaterials(self.materials)
+
+    def time_compBundleWithIsotopes(self, nmaterials):
+        compBundleFromMaterials(self.materials, self.isotopes)
@@ -0,0 +1,50 @@
+"""
+Shared problem construction for the benchmarks
+
+All problems are built from the ENDF/B-VII.1 chain shipped with the
+repository, with reaction rates, fission yields, and compositions
+drawn from a seeded random number generator so timings are
+comparable between commits.
+"""
+
+import functools
+import pathlib
+
+import numpy
+
+import hydep
+from hydep.internal import MaterialDataArray, FakeSequence
+
+CHAIN_FILE = pathlib.Path(__file__).parents[1] / "chains" / "chain_endfb71.xml"
+DT = 30 * 86400
+SEED = 20201201
+
+
+@functools.lru_cache(maxsize=1)
+def loadChain():
+    """ENDF/B-VII.1 depletion chain, read once per process"""
+    return hydep.DepletionChain.fromXml(str(CHAIN_FILE))
+
+
+def getFissionYields(chain, nmaterials):
+    """Thermal fission yields repeated for every material"""
+    yields = {
+        iso.zai: iso.fissionYields.at(0)
+        for iso in chain if iso.fissionYields is not None
+    }
+    return FakeSequence(yields, nmaterials)
+
+
+def getReactionRates(chain, nmaterials, seed=SEED):
+    """Random reaction rates [#/s] ordered by the chain reaction index"""
+    rng = numpy.random.default_rng(seed)
+    return MaterialDataArray(
+        chain.reactionIndex,
+        rng.random((nmaterials, len(chain.reactionIndex))) * 1e-9,
+    )
+
+
+def getDensities(chain, nmaterials, seed=SEED):
+    """Random atom densities [#/b/cm] for every isotope in the chain"""
+    rng = numpy.random.default_rng(seed + 1)
+    return rng.random((nmaterials, len(chain))) * 1e-4
@@ -18,5 +18,6 @@ from .chain import DepletionChain
 from .manager import Manager
 from .integrators import PredictorIntegrator, CELIIntegrator, RK4Integrator
 from .settings import Settings, SerpentSettings, SfvSettings
+from .batch import BatchDriver
 
 __version__ = "0.1.0"
@@ -4,8 +4,8 @@ import numbers
 from collections.abc import Mapping
 import copy
 import pathlib
-import os
 import configparser
+import cProfile
 import typing
 import tempfile
 import warnings
@@ -19,7 +19,8 @@ from .settings import Settings
 from .lib import HighFidelitySolver, ReducedOrderSolver, BaseStore
 from .typed import TypedAttr
 from .constants import SECONDS_PER_DAY
-from .internal import DataBank, compBundleFromMaterials, TimeStep
+from .internal import DataBank, MaterialDataArray, compBundleFromMaterials, TimeStep
+from .internal.timers import Timers
 
 __logger__ = logging.getLogger("hydep")
 
@@ -54,8 +55,9 @@ class Integrator(ABC):
         and depletion solver
     store : hydep.lib.BaseStore, optional
         Instance responsible for writing transport and depletion
-        result data. If not provided, will be set to
-        :class:`hydep.hdf.Store`
+        result data. If not provided, will be set to a
+        :class:`hydep.hdf.Store` writing to ``hydep-results.h5`` in
+        :attr:`hydep.Settings.basedir`
 
     Attributes
     ----------
@@ -72,11 +74,17 @@ class Integrator(ABC):
         and depletion solver
     store : hydep.lib.BaseStore or None
         Instance responsible for writing transport and depletion
-        result data. If not provided, will be set to
-        :class:`hydep.hdf.Store`
+        result data. If not provided, will be set to a
+        :class:`hydep.hdf.Store` writing to ``hydep-results.h5`` in
+        :attr:`hydep.Settings.basedir`
     settings : hydep.Settings
         Simulation settings. Can be updated directly, or
         through :meth:`configure`
+    timers : hydep.internal.timers.Timers
+        Walltime spent in each section of the most recent simulation,
+        e.g. ``"transport"``, ``"depletion"``, and ``"store"``. The
+        sections timed since the previous transport solution are
+        written to :attr:`store` after each transport solution
 
     """
 
@@ -96,6 +104,8 @@ class Integrator(ABC):
         self.store = store
         self.settings = Settings()
         self._xs = None
+        self._rateBuffers = {}
+        self.timers = Timers()
 
     @abstractmethod
     def __call__(
@@ -198,7 +208,97 @@ class Integrator(ABC):
             len(self.dep.burnable),
             self.dep.chain.reactionIndex,
             self.settings.fittingOrder,
+            dtype=(
+                numpy.float32 if self.settings.singlePrecisionXsHistory
+                else numpy.float64
+            ),
+            sparse=self.settings.sparseXsHistory,
         )
+        self._rateBuffers = {}
+        self.timers = Timers(recordEvents=self.settings.timingTrace)
+        self.dep.timers = self.timers
+
+    def _getRateBuffer(self, key):
+        """Reaction rate storage reused across calls to :meth:`__call__`
+
+        Parameters
+        ----------
+        key : hashable
+            Identifier for this buffer. Distinct keys should be used
+            for reaction rates that are needed simultaneously
+
+        Returns
+        -------
+        hydep.internal.MaterialDataArray
+            Array with uninitialized data to be passed as the ``out``
+            argument of :meth:`hydep.internal.DataBank.getReactionRatesAt`
+
+        """
+        buffer = self._rateBuffers.get(key)
+        if buffer is None:
+            buffer = self._rateBuffers[key] = MaterialDataArray(
+                self._xs.reactionIndex,
+                numpy.empty((self._xs.nmaterials, self._xs.nreactions)),
+            )
+        return buffer
+
+    def _getReactionRates(self, time, flux, key):
+        """Extrapolated reaction rates written into a reused buffer
+
+        Parameters
+        ----------
+        time : float
+            Point in calendar time [s]
+        flux : numpy.ndarray
+            Flux in each burnable material at ``time``
+        key : hashable
+            Identifier passed to :meth:`_getRateBuffer`
+
+        Returns
+        -------
+        hydep.internal.MaterialDataArray
+            Reaction rates in each burnable material
+
+        """
+        with self.timers.time("xsExtrapolation"):
+            return self._xs.getReactionRatesAt(
+                time, flux, out=self._getRateBuffer(key)
+            )
+
+    def _intermediateSolve(self, timestep, compositions, time):
+        """Flux from the reduced order solver at an intermediate point
+
+        Parameters
+        ----------
+        timestep : hydep.internal.TimeStep
+            Time step for the beginning of the current interval
+        compositions : hydep.internal.CompBundle
+            Compositions at the intermediate point
+        time : float
+            Point in calendar time [s] for extrapolating microscopic
+            cross sections
+
+        Returns
+        -------
+        numpy.ndarray
+            Flux in each burnable material
+
+        """
+        with self.timers.time("xsExtrapolation"):
+            microXS = self._xs.at(time)
+        with self.timers.time("reducedOrder"):
+            flux, _runTime = self.ro.intermediateSolve(
+                timestep, compositions, microXS
+            )
+        return flux
+
+    def _writeTimings(self, timestep, result, section):
+        """Write timers and phases reported in ``result`` to the store"""
+        timings = self.timers.pop()
+        if result.timings:
+            for name, seconds in result.timings.items():
+                timings[f"{section}.{name}"] = seconds
+        self.store.writeTimings(timestep, timings)
 
     def integrate(self, initialDays=0):
         """Launch the coupled sequence and hold your breath
@@ -252,12 +352,15 @@ class Integrator(ABC):
         elif not rundir.is_dir():
             rundir.mkdir(parents=True)
 
-        previousDir = pathlib.Path.cwd()
-
         success = False
+        profiler = cProfile.Profile() if self.settings.profile else None
 
+        # All files are written relative to basedir and rundir, so the
+        # working directory is left untouched. This allows multiple
+        # integrators to run concurrently in a single process
         try:
-            os.chdir(self.settings.rundir)
+            if profiler is not None:
+                profiler.enable()
             self.beforeMain()
 
             # Context manager?
@@ -267,18 +370,44 @@ class Integrator(ABC):
         finally:
             self.hf.finalize(success)
             self.ro.finalize(success)
+            self.dep.finalize(success)
             self._locked = False
-            os.chdir(previousDir)
             if tempdir is not None:
                 tempdir.cleanup()
                 self.settings.rundir = None
+            try:
+                self._afterMain(profiler)
+            except Exception:
+                # Do not hide the exception that stopped the simulation
+                if success:
+                    raise
+                __logger__.exception("Failed to write timing and profiling data")
+
+    def _afterMain(self, profiler):
+        """Report timers and write profiling data"""
+        for name, seconds in sorted(
+            self.timers.totals.items(), key=lambda item: item[1], reverse=True
+        ):
+            __logger__.info("Time spent in %s: %.4E [s]", name, seconds)
+
+        if profiler is not None:
+            profiler.disable()
+            dest = self.settings.basedir / "hydep-profile.pstats"
+            __logger__.info("Writing profile statistics to %s", dest)
+            profiler.dump_stats(dest)
+
+        if self.timers.recordEvents:
+            dest = self.settings.basedir / "hydep-trace.json"
+            __logger__.info("Writing timing trace to %s", dest)
+            self.timers.writeChromeTrace(dest)
 
     def _mainsequence(self, startSeconds):
         compositions = compBundleFromMaterials(
             self.dep.burnable, tuple(self.dep.chain)
         )
         timestep = TimeStep(currentTime=startSeconds)
-        self.store.writeCompositions(timestep, compositions)
+        with self.timers.time("store"):
+            self.store.writeCompositions(timestep, compositions)
 
         # Run first solution to get information on micro xs
 
@@ -286,14 +415,19 @@ class Integrator(ABC):
             "Executing %s step 0 Time %.4E [d]",
             type(self.hf).__name__, startSeconds / SECONDS_PER_DAY,
         )
-        result = self.hf.bosSolve(compositions, timestep, self.dep.powers[0])
+        with self.timers.time("transport"):
+            result = self.hf.bosSolve(compositions, timestep, self.dep.powers[0])
         __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
-        self.store.postTransport(timestep, result)
+        with self.timers.time("store"):
+            self.store.postTransport(timestep, result)
         if numpy.less(result.flux, 0).any():
             raise FailedSolverError(f"Negative fluxes obtained at {timestep}")
-        self.ro.processBOS(result, timestep, self.dep.powers[0])
+        with self.timers.time("processBOS"):
+            self.ro.processBOS(result, timestep, self.dep.powers[0])
 
-        self._xs.push(startSeconds, result.microXS)
+        with self.timers.time("xsExtrapolation"):
+            self._xs.push(startSeconds, result.microXS)
+        self._writeTimings(timestep, result, "transport")
 
         fissionYields = result.fissionYields
 
@@ -312,12 +446,17 @@ class Integrator(ABC):
                 type(self.hf).__name__, coarseIndex,
                 timestep.currentTime / SECONDS_PER_DAY,
             )
-            result = self.hf.bosSolve(compositions, timestep, power)
+            with self.timers.time("transport"):
+                result = self.hf.bosSolve(compositions, timestep, power)
             __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
-            self.ro.processBOS(result, timestep, power)
-            self.store.postTransport(timestep, result)
+            with self.timers.time("processBOS"):
+                self.ro.processBOS(result, timestep, power)
+            with self.timers.time("store"):
+                self.store.postTransport(timestep, result)
 
-            self._xs.push(timestep.currentTime, result.microXS)
+            with self.timers.time("xsExtrapolation"):
+                self._xs.push(timestep.currentTime, result.microXS)
+            self._writeTimings(timestep, result, "transport")
 
             # Substeps
             # TODO Zip all three?
@@ -337,9 +476,12 @@ class Integrator(ABC):
             type(self.hf).__name__, timestep.coarse,
             timestep.currentTime / SECONDS_PER_DAY,
         )
-        result = self.hf.eolSolve(compositions, timestep, self.dep.powers[-1])
+        with self.timers.time("transport"):
+            result = self.hf.eolSolve(compositions, timestep, self.dep.powers[-1])
         __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
-        self.store.postTransport(timestep, result)
+        with self.timers.time("store"):
+            self.store.postTransport(timestep, result)
+        self._writeTimings(timestep, result, "transport")
         if numpy.less(result.flux, 0).any():
             raise FailedSolverError(f"Negative fluxes obtained at {timestep}")
 
@@ -388,32 +530,40 @@ class Integrator(ABC):
             if substepIndex and result.fissionYields is not None:
                 fissionYields = result.fissionYields
 
-            compositions = self(
-                timestep, substepDT, compositions, result.flux, fissionYields,
-            )
+            with self.timers.time("depletion"):
+                compositions = self(
+                    timestep, substepDT, compositions, result.flux, fissionYields,
+                )
 
             timestep += substepDT
-            self.store.writeCompositions(timestep, compositions)
-            microXS = xsmachine.at(timestep.currentTime)
+            with self.timers.time("store"):
+                self.store.writeCompositions(timestep, compositions)
+            with self.timers.time("xsExtrapolation"):
+                microXS = xsmachine.at(timestep.currentTime)
 
             __logger__.info(
                 "Executing %s for substep %d",
                 type(self.ro).__name__, substepIndex,
             )
-            result = self.ro.substepSolve(timestep, compositions, microXS)
+            with self.timers.time("reducedOrder"):
+                result = self.ro.substepSolve(timestep, compositions, microXS)
             if not numpy.isnan(result.keff).all():
                 __logger__.info("   k =  %.6f +/- %.6E", result.keff[0], result.keff[1])
-            self.store.postTransport(timestep, result)
+            with self.timers.time("store"):
+                self.store.postTransport(timestep, result)
+            self._writeTimings(timestep, result, "reducedOrder")
             if numpy.less(result.flux, 0).any():
                 raise FailedSolverError(
                     f"Negative fluxes obtained at {timestep}"
                 )
 
-        compositions = self(
-            timestep, substepDT, compositions, result.flux, fissionYields,
-        )
+        with self.timers.time("depletion"):
+            compositions = self(
+                timestep, substepDT, compositions, result.flux, fissionYields,
+            )
         timestep.increment(substepDT, coarse=True)
-        self.store.writeCompositions(timestep, compositions)
+        with self.timers.time("store"):
+            self.store.writeCompositions(timestep, compositions)
 
         return result, compositions
 
@@ -0,0 +1,254 @@
+"""
+Run several independent depletion cases concurrently
+
+Each case is built and integrated in a separate process with a
+dedicated directory, such that cases do not share global state, like
+the registry of isotopes or the ``OMP_NUM_THREADS`` environment
+variable. The threads available on the node are shared across the
+running cases.
+"""
+
+from collections import namedtuple
+import concurrent.futures
+import logging
+import numbers
+import os
+import pathlib
+import sys
+import time
+
+__all__ = ("BatchDriver", "BatchResult")
+
+__logger__ = logging.getLogger("hydep.batch")
+
+BatchResult = namedtuple("BatchResult", "name directory threads walltime error")
+BatchResult.__doc__ = """Outcome of a single case run by :class:`BatchDriver`
+
+Parameters
+----------
+name : str
+    Name of the case
+directory : pathlib.Path
+    Base and run directory of the case
+threads : int
+    Number of threads given to the case
+walltime : float or None
+    Walltime [s] spent building and integrating the case, or ``None``
+    if the case failed
+error : Exception or None
+    Exception raised by the case, or ``None`` if the case succeeded
+
+"""
+
+_Case = namedtuple("_Case", "name factory kwargs threads")
+
+
+def _runCase(factory, kwargs, directory, threads, initialDays):
+    """Build and integrate a single case in a worker process"""
+    start = time.perf_counter()
+    # Threads for OpenMP libraries and solvers started from this process
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    integrator = factory(**kwargs)
+    settings = integrator.settings
+    settings.basedir = directory
+    settings.rundir = directory
+    settings.serpent.omp = threads
+    settings.sfv.numThreads = threads
+    # Executor workers are daemonic prior to Python 3.9 and cannot
+    # start a pool of depletion workers
+    integrator.dep.numProcesses = threads if sys.version_info >= (3, 9) else 1
+
+    integrator.integrate(initialDays)
+    return time.perf_counter() - start
+
+
+class BatchDriver:
+    """Run several independent integrators concurrently
+
+    Cases are added with :meth:`add` through a factory that builds
+    an integrator, e.g. :class:`hydep.PredictorIntegrator`, for each
+    point in an enrichment and power sweep. Factories are called in
+    worker processes, so they and their arguments must be picklable,
+    e.g. functions defined at the top level of a module.
+
+    Each case is solved in ``directory / name``, which is used as both
+    :attr:`hydep.Settings.basedir` and :attr:`hydep.Settings.rundir`.
+    Cases are started strictly in the order they were added as threads
+    become available, such that at most :attr:`numThreads` threads are
+    in use at any time. A case waiting for threads is never overtaken
+    by a smaller case added after it. The number of threads given to a
+    case are passed to :attr:`hydep.SerpentSettings.omp`,
+    :attr:`hydep.SfvSettings.numThreads`, the ``OMP_NUM_THREADS``
+    environment variable of the worker process, and
+    :attr:`hydep.Manager.numProcesses`, overwriting values set by the
+    factory. Prior to Python 3.9, workers cannot start processes of
+    their own, and :attr:`hydep.Manager.numProcesses` is set to one.
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path
+        Directory containing the directories of all cases
+    numThreads : int, optional
+        Total number of threads to share across running cases.
+        Defaults to the number of processors
+    maxWorkers : int, optional
+        Maximum number of cases to run at once. Defaults to
+        :attr:`numThreads`
+
+    Attributes
+    ----------
+    directory : pathlib.Path
+        Directory containing the directories of all cases
+    numThreads : int
+        Total number of threads to share across running cases
+    maxWorkers : int
+        Maximum number of cases to run at once
+    names : tuple of str
+        Names of all cases, in the order they were added
+
+    Examples
+    --------
+    >>> def buildCase(enrichment, power):
+    ...     pass  # Build and return an integrator
+    >>> driver = BatchDriver("sweep", numThreads=32, maxWorkers=4)
+    >>> for enrichment in (3.1, 4.5):
+    ...     for power in (15e3, 20e3):
+    ...         driver.add(
+    ...             f"e{enrichment}-p{power:g}", buildCase,
+    ...             enrichment=enrichment, power=power)
+    >>> driver.names
+    ('e3.1-p15000', 'e3.1-p20000', 'e4.5-p15000', 'e4.5-p20000')
+    >>> results = driver.run()  # doctest: +SKIP
+
+    """
+
+    def __init__(self, directory, numThreads=None, maxWorkers=None):
+        self.directory = pathlib.Path(directory).resolve()
+        if numThreads is None:
+            numThreads = os.cpu_count() or 1
+        self.numThreads = self._checkPositive("numThreads", numThreads)
+        self.maxWorkers = self._checkPositive(
+            "maxWorkers", numThreads if maxWorkers is None else maxWorkers
+        )
+        self._cases = []
+
+    @staticmethod
+    def _checkPositive(name, value):
+        if not isinstance(value, numbers.Integral):
+            raise TypeError(f"{name} must be positive integer, not {value}")
+        if value < 1:
+            raise ValueError(f"{name} must be positive integer, not {value}")
+        return int(value)
+
+    @property
+    def names(self):
+        return tuple(case.name for case in self._cases)
+
+    def add(self, name, factory, threads=None, **kwargs):
+        """Add a case to be run
+
+        Parameters
+        ----------
+        name : str
+            Unique name of the case, also used for the directory of
+            the case
+        factory : callable
+            Function that returns an integrator when called with
+            ``kwargs``. Called in the worker process
+        threads : int, optional
+            Number of threads requested by this case. Defaults to an
+            equal share of :attr:`numThreads` across the cases that
+            can run at once. Requests larger than :attr:`numThreads`
+            are reduced to :attr:`numThreads`
+        kwargs :
+            Keyword arguments passed to ``factory``
+
+        Raises
+        ------
+        ValueError
+            If a case with ``name`` already exists
+
+        """
+        if not isinstance(name, str) or not name:
+            raise TypeError(f"Name must be a non-empty string, not {name!r}")
+        if name in self.names:
+            raise ValueError(f"Case {name} already exists")
+        if not callable(factory):
+            raise TypeError(f"Factory for case {name} is not callable: {factory}")
+        if threads is not None:
+            threads = self._checkPositive("threads", threads)
+        self._cases.append(_Case(name, factory, kwargs, threads))
+
+    def _threadsFor(self, case):
+        if case.threads is not None:
+            return min(case.threads, self.numThreads)
+        nconcurrent = min(self.maxWorkers, len(self._cases))
+        return max(1, self.numThreads // nconcurrent)
+
+    def run(self, initialDays=0):
+        """Run all cases and wait for them to complete
+
+        A failure in one case does not stop the remaining cases.
+        The exception is logged and returned in the corresponding
+        :class:`BatchResult`.
+
+        Parameters
+        ----------
+        initialDays : float, optional
+            Starting day passed to :meth:`hydep.PredictorIntegrator.integrate`
+
+        Returns
+        -------
+        list of BatchResult
+            Outcome of each case, in the order the cases were added
+
+        """
+        pending = list(self._cases)
+        running = {}
+        results = {}
+        free = self.numThreads
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(self.maxWorkers, max(1, len(pending)))
+        ) as executor:
+            while pending or running:
+                # Start waiting cases in the order they were added until
+                # the next case does not fit in the free threads
+                while pending and len(running) < self.maxWorkers:
+                    case = pending[0]
+                    threads = self._threadsFor(case)
+                    if threads > free:
+                        break
+                    pending.pop(0)
+                    free -= threads
+                    __logger__.info(
+                        "Starting case %s with %d threads", case.name, threads
+                    )
+                    future = executor.submit(
+                        _runCase, case.factory, case.kwargs,
+                        self.directory / case.name, threads, initialDays,
+                    )
+                    running[future] = (case, threads)
+
+                done, _pending = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    case, threads = running.pop(future)
+                    free += threads
+                    error = future.exception()
+                    if error is None:
+                        walltime = future.result()
+                        __logger__.info(
+                            "Case %s completed in %.4E [s]", case.name, walltime
+                        )
+                    else:
+                        walltime = None
+                        __logger__.error("Case %s failed: %s", case.name, error)
+                    results[case.name] = BatchResult(
+                        case.name, self.directory / case.name, threads, walltime, error
+                    )
+
+        return [results[name] for name in self.names]
@@ -13,13 +13,11 @@ https://github.com/openmc-dev/openmc
 
 import bisect
 import xml.etree.ElementTree as ET
-from collections import defaultdict
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
 import numbers
 import math
 
 import numpy
-from scipy.sparse import dok_matrix
 
 from hydep.internal import (
     getZaiFromName,
@@ -30,11 +28,15 @@ from hydep.internal import (
     Isotope,
     FissionYieldDistribution,
     XsIndex,
+    MatrixPattern,
 )
 from hydep.constants import FISSION_REACTIONS, REACTION_MT_MAP
 
 __all__ = ["DepletionChain"]
 
+# Maximum number of depletion matrix patterns cached on each chain
+_MAX_PATTERNS = 8
+
 
 class DepletionChain(tuple):
     """Representation of a depletion chain
@@ -68,6 +70,7 @@ class DepletionChain(tuple):
         self._indices = {isotope.zai: i for i, isotope in enumerate(self)}
         self._zaiOrder = tuple(isotope.zai for isotope in self)
         self._reactionIndex = self._getReactionIndex()
+        self._patterns = {}
 
     def __contains__(self, key):
         """Search for an isotope that matches the argument
@@ -103,6 +106,35 @@ class DepletionChain(tuple):
         return "<{} with {} isotopes at {}>".format(
             self.__class__.__name__, len(self), hex(id(self)))
 
+    def __reduce__(self):
+        """Support pickling without recursing through transmutation targets
+
+        Isotopes refer to one another through their reactions and decay
+        modes, which exceeds the recursion limit of :mod:`pickle` for
+        full chains. Targets are instead stored by their ZAI triplet and
+        isotopes are recovered through :func:`hydep.internal.getIsotope`
+        """
+        records = []
+        for isotope in self:
+            reactions = tuple(
+                (r.mt, None if r.target is None else r.target.triplet, r.branch, r.Q)
+                for r in isotope.reactions
+            )
+            decays = tuple(
+                (None if d.target is None else d.target.triplet, d.type, d.branch)
+                for d in isotope.decayModes
+            )
+            records.append(
+                (
+                    isotope.name,
+                    isotope.decayConstant,
+                    reactions,
+                    decays,
+                    isotope.fissionYields,
+                )
+            )
+        return _rebuildChain, (type(self), tuple(records))
+
     @classmethod
     def fromXml(cls, filePath):
         """Construct a chain from an OpenMC XML file
@@ -239,12 +271,57 @@ class DepletionChain(tuple):
         raise IndexError("Could not find isotope matching {} in {}".format(
             key, self.__class__.__name__))
 
+    def findReachable(self, zais):
+        """Find all isotopes that can be produced from a starting set
+
+        Isotopes are reachable if they are a product of any reaction,
+        decay, or fission event of a reachable isotope. The resulting
+        set is closed under transmutation, so isotopes outside the set
+        can never be produced from isotopes inside the set.
+
+        Parameters
+        ----------
+        zais : iterable of int
+            ZAI identifiers of the starting isotopes, e.g. isotopes
+            with non-zero densities. Isotopes not in the chain are
+            ignored
+
+        Returns
+        -------
+        tuple of int
+            ZAI identifiers of the starting isotopes in this chain and
+            all isotopes reachable from them, ordered as in
+            :attr:`zaiOrder`
+
+        """
+        reachable = {z for z in zais if z in self._indices}
+        frontier = list(reachable)
+
+        while frontier:
+            isotope = self[self._indices[frontier.pop()]]
+            products = [r.target.zai for r in isotope.reactions if r.target is not None]
+            products.extend(
+                d.target.zai for d in isotope.decayModes if d.target is not None
+            )
+            if isotope.fissionYields is not None:
+                products.extend(isotope.fissionYields.products)
+            for zai in products:
+                if zai not in reachable and zai in self._indices:
+                    reachable.add(zai)
+                    frontier.append(zai)
+
+        return tuple(z for z in self._zaiOrder if z in reachable)
+
     def formMatrix(self, reactionRates, fissionYields, ordering=None):
         """Construct a sparse depletion matrix
 
+        Values are filled into the fixed structure from
+        :meth:`getMatrixPattern`, which is only computed once for
+        each unique ``ordering``.
+
         Parameters
         ----------
-        reactionRates : hydep.internal.MaterialArray
+        reactionRates : hydep.internal.MaterialData
             Reaction rates [#/s] for isotopes of interest. Expected
             to be indexed according to :attr:`reactionIndex`, e.g.
             ``reactionRates[ix]`` corresponds to the isotope and
@@ -252,45 +329,166 @@ class DepletionChain(tuple):
         fissionYields : hydep.internal.FissionYield
             Fission yields mapping of the form
             ``{parentZAI: {productZAI: yield}}``
-        ordering : dict of int to int, optional
-            Map describing row and column indices for isotopes. If not
+        ordering : dict of int to int or tuple of int, optional
+            Map describing row and column indices for isotopes, or
+            ZAI of the isotope in each row and column. If not
             provided, will sort by increasing ZAI
 
         Returns
         -------
         scipy.sparse.csr_matrix
 
+        Raises
+        ------
+        ValueError
+            If the reaction rates are not ordered according to
+            :attr:`reactionIndex`
+
         """
+        if not (
+            reactionRates.index is self._reactionIndex
+            or reactionRates.index == self._reactionIndex
+        ):
+            raise ValueError("Reaction indices do not conform")
+
+        pattern = self.getMatrixPattern(ordering)
+        data = pattern.fill(
+            numpy.asarray(reactionRates.data, dtype=float), fissionYields
+        )
+        return pattern.toCsr(data)
+
+    def formMatrices(self, reactionRates, fissionYields, ordering=None):
+        """Compute depletion matrix values for many materials at once
+
+        All matrices share the structure given by
+        :meth:`getMatrixPattern` with the same ``ordering``, so only
+        the values are returned.
+
+        Parameters
+        ----------
+        reactionRates : hydep.internal.MaterialDataArray
+            Reaction rates [#/s] in all materials, indexed according
+            to :attr:`reactionIndex`
+        fissionYields : sequence of hydep.internal.FissionYield
+            Fission yields for each material of the form
+            ``{parentZAI: {productZAI: yield}}``
+        ordering : dict of int to int or tuple of int, optional
+            Map describing row and column indices for isotopes, or
+            ZAI of the isotope in each row and column. If not
+            provided, will sort by increasing ZAI
 
-        mtx = defaultdict(float)
-        indices = self._indices
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape ``(N_mats, nnz)`` where ``out[m]`` contains
+            the values of the depletion matrix for material ``m``
+
+        Raises
+        ------
+        ValueError
+            If the reaction rates are not ordered according to
+            :attr:`reactionIndex`
+
+        See Also
+        --------
+        * :meth:`hydep.internal.MatrixPattern.toCsr` - Build a sparse
+          matrix for a single material
+
+        """
+        if not (
+            reactionRates.index is self._reactionIndex
+            or reactionRates.index == self._reactionIndex
+        ):
+            raise ValueError("Reaction indices do not conform")
+
+        return self.getMatrixPattern(ordering).fillMany(
+            reactionRates.data, fissionYields
+        )
+
+    def getMatrixPattern(self, ordering=None):
+        """Return the fixed structure of depletion matrices
+
+        Patterns are cached, so subsequent calls with an equivalent
+        ``ordering`` return the same object. Only the most recent
+        patterns are retained.
+
+        Parameters
+        ----------
+        ordering : dict of int to int or tuple of int, optional
+            Map describing row and column indices for isotopes, or
+            ZAI of the isotope in each row and column. If not
+            provided, will sort by increasing ZAI
+
+        Returns
+        -------
+        hydep.internal.MatrixPattern
+            Structure of the depletion matrix, capable of filling
+            values given reaction rates ordered according to
+            :attr:`reactionIndex` and fission yields
+
+        """
         if ordering is None:
-            ordering = indices
+            ordering = self._indices
+            key = self._zaiOrder
+        elif not isinstance(ordering, Mapping):
+            key = tuple(ordering)
+        elif list(ordering.values()) == list(range(len(ordering))):
+            # Equivalent to the sequence of isotopes
+            key = tuple(ordering)
+        else:
+            key = tuple(ordering.items())
+        pattern = self._patterns.get(key)
+        if pattern is None:
+            if len(self._patterns) >= _MAX_PATTERNS:
+                self._patterns.pop(next(iter(self._patterns)))
+            if not isinstance(ordering, Mapping):
+                ordering = {zai: ix for ix, zai in enumerate(key)}
+            pattern = self._patterns[key] = self._buildMatrixPattern(dict(ordering))
+        return pattern
+
+    def _buildMatrixPattern(self, ordering):
+        rateTerms = []
+        constantTerms = []
+        fissionTerms = []
 
         for zai, columnIndex in ordering.items():
 
-            myIndex = indices.get(zai)
+            myIndex = self._indices.get(zai)
             if myIndex is None:
                 continue
 
-            rxns = reactionRates.getReactions(zai, {})
             isotope = self[myIndex]
+            try:
+                rxnIndices = self._reactionIndex.getReactions(zai)
+            except ValueError:
+                rxnIndices = {}
+            else:
+                rxnIndices = dict(rxnIndices)
 
             # process transmutations
 
             for reaction in isotope.reactions:
-                rate = rxns.get(reaction.mt)
-                if rate is None:
+                rateIndex = rxnIndices.get(reaction.mt)
+                if rateIndex is None:
                     continue
-                mtx[columnIndex, columnIndex] -= rate * reaction.branch
+                rateTerms.append((columnIndex, columnIndex, rateIndex, -reaction.branch))
 
                 if reaction.mt in FISSION_REACTIONS:
-                    yields = fissionYields.get(isotope.zai, {})
-                    for product, fyield in yields.items():
+                    if isotope.fissionYields is None:
+                        products = ()
+                    else:
+                        products = isotope.fissionYields.products
+                    select = []
+                    rows = []
+                    for productIndex, product in enumerate(products):
                         rowIndex = ordering.get(product)
                         if rowIndex is None:
                             continue
-                        mtx[rowIndex, columnIndex] += rate * fyield
+                        select.append(productIndex)
+                        rows.append(rowIndex)
+                    fissionTerms.append(
+                        (zai, columnIndex, rateIndex, products, select, rows)
+                    )
 
                 elif reaction.target is None:
                     continue
@@ -298,10 +496,10 @@ class DepletionChain(tuple):
                     rowIndex = ordering.get(reaction.target.zai)
                     if rowIndex is None:
                         continue
-                    mtx[rowIndex, columnIndex] += rate * reaction.branch
+                    rateTerms.append((rowIndex, columnIndex, rateIndex, reaction.branch))
 
             if isotope.decayConstant is not None:
-                mtx[columnIndex, columnIndex] -= isotope.decayConstant
+                constantTerms.append((columnIndex, columnIndex, -isotope.decayConstant))
 
             for decay in isotope.decayModes:
                 if decay.target is None:
@@ -309,11 +507,11 @@ class DepletionChain(tuple):
                 rowIndex = ordering.get(decay.target.zai)
                 if rowIndex is None:
                     continue
-                mtx[rowIndex, columnIndex] += isotope.decayConstant * decay.branch
+                constantTerms.append(
+                    (rowIndex, columnIndex, isotope.decayConstant * decay.branch)
+                )
 
-        dok = dok_matrix((len(ordering), ) * 2, dtype=reactionRates.data.dtype)
-        dict.update(dok, mtx)
-        return dok.tocsr()
+        return MatrixPattern.fromTerms(ordering, rateTerms, constantTerms, fissionTerms)
 
     @property
     def zaiOrder(self):
@@ -344,3 +542,27 @@ class DepletionChain(tuple):
             numpy.array(rxns, dtype=int),
             numpy.array(zptr, dtype=int),
         )
+
+
+def _rebuildChain(cls, records):
+    """Reconstruct a chain from :meth:`DepletionChain.__reduce__`"""
+    # Register all isotopes by name prior to resolving targets
+    isotopes = [getIsotope(name=record[0]) for record in records]
+
+    for isotope, (_name, lam, reactions, decays, fyields) in zip(
+        isotopes, records
+    ):
+        isotope.decayConstant = lam
+        isotope.reactions = {
+            ReactionTuple(
+                mt, None if target is None else getIsotope(zai=target), branch, Q
+            )
+            for mt, target, branch, Q in reactions
+        }
+        isotope.decayModes = {
+            DecayTuple(None if target is None else getIsotope(zai=target), dtype, branch)
+            for target, dtype, branch in decays
+        }
+        isotope.fissionYields = fyields
+
+    return cls(isotopes)
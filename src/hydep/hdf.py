@@ -62,6 +62,8 @@ class HdfStrings(HdfEnumKeys):
         Key to fission matrix group
     CALENDAR : enum member
         Key to time step group
+    TIMINGS : enum member
+        Key to timing group
 
     """
 
@@ -73,6 +75,7 @@ class HdfStrings(HdfEnumKeys):
     MATERIALS = "materials"
     FISSION_MATRIX = "fissionMatrix"
     CALENDAR = "time"
+    TIMINGS = "timings"
 
     def __truediv__(self, other) -> str:
         """Access subgroups with / separator
@@ -208,7 +211,9 @@ class Store(BaseStore):
     Parameters
     ----------
     filename : str, optional
-        Name of the file to be written. Default: ``"hydep-results.h5"``
+        Name of the file to be written. Relative paths are resolved
+        against the current working directory when the store is
+        created. Default: ``"hydep-results.h5"``
     libver : {"earliest", "latest"}, optional
         Which version of HDF file to write. Passing
         ``"earliest"`` helps with back compatability **with the
@@ -411,6 +416,38 @@ class Store(BaseStore):
         with h5py.File(self._fp, mode="a") as h5f:
             h5f[HdfStrings.COMPOSITIONS][timeStep.total] = compBundle.densities
 
+    def writeTimings(self, timeStep, timings) -> None:
+        """Write the time spent in each phase of the solution
+
+        Each named section is written to a dataset in the timings
+        group, created as needed and filled with ``nan`` for points
+        in time where the section was not timed.
+
+        Parameters
+        ----------
+        timeStep : hydep.internal.TimeStep
+            Point in calendar time that corresponds to the most recent
+            transport solution
+        timings : mapping of str to float
+            Walltime [s] spent in named sections of the solution since
+            the previous transport solution
+
+        """
+        if not timings:
+            return
+        with h5py.File(self._fp, mode="a") as h5f:
+            group = h5f.get(HdfStrings.TIMINGS)
+            if group is None:
+                group = h5f.create_group(HdfStrings.TIMINGS)
+            ntransport = h5f.attrs[HdfAttrs.N_TOTAL]
+            for name, seconds in timings.items():
+                dset = group.get(name)
+                if dset is None:
+                    dset = group.create_dataset(
+                        name, (ntransport, ), fillvalue=numpy.nan
+                    )
+                dset[timeStep.total] = seconds
+
 
 class Processor(Mapping):
     """Dictionary-like interface for HDF result files
@@ -584,6 +621,23 @@ class Processor(Mapping):
     def volumes(self) -> h5py.Dataset:
         return self._root[HdfStrings.MATERIALS / HdfSubStrings.MAT_VOLS]
 
+    def getTimings(self) -> typing.Dict[str, numpy.ndarray]:
+        """Fetch the walltime spent in each timed section
+
+        Returns
+        -------
+        dict of str to numpy.ndarray
+            Walltime [s] spent in each section, attributed to the
+            transport solution at each point in time. Sections that
+            were not timed at a point in time will be ``nan``. Empty
+            if no timings were written
+
+        """
+        group = self._root.get(HdfStrings.TIMINGS)
+        if group is None:
+            return {}
+        return {name: dset[:] for name, dset in group.items()}
+
     def getKeff(
         self, hfOnly: typing.Optional[bool] = True
     ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
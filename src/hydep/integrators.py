@@ -77,7 +77,7 @@ class PredictorIntegrator(Integrator):
         return self.dep.deplete(
             dt,
             compositions,
-            self._xs.getReactionRatesAt(timestep.currentTime, flux),
+            self._getReactionRates(timestep.currentTime, flux, "bos"),
             fissionYields,
         )
 
@@ -165,17 +165,17 @@ class CELIIntegrator(Integrator):
     ) -> "hydep.internal.CompBundle":
 
         # Predictor
-        bosRR = self._xs.getReactionRatesAt(timestep.currentTime, flux)
+        bosRR = self._getReactionRates(timestep.currentTime, flux, "bos")
         eosComp = self.dep.deplete(dt, compositions, bosRR, fissionYields)
 
-        eosFlux, _time = self.ro.intermediateSolve(
-            timestep, eosComp, self._xs.at(timestep.currentTime + dt)
+        eosFlux = self._intermediateSolve(
+            timestep, eosComp, timestep.currentTime + dt
         )
-        eosRR = self._xs.getReactionRatesAt(timestep.currentTime + dt, eosFlux)
+        eosRR = self._getReactionRates(timestep.currentTime + dt, eosFlux, "eos")
 
         # Get average reaction rates for corrector step
         avgRR = MaterialDataArray.fromLinearCombination(
-            (0.5, bosRR), (0.5, eosRR)
+            (0.5, bosRR), (0.5, eosRR), out=bosRR
         )
 
         return self.dep.deplete(
@@ -268,34 +268,28 @@ class RK4Integrator(Integrator):
         midpoint = timestep.currentTime + 0.5*dt
 
         # Deplete out to mid point
-        rr0 = self._xs.getReactionRatesAt(timestep.currentTime, flux0)
+        rr0 = self._getReactionRates(timestep.currentTime, flux0, 0)
         comp1 = self.dep.deplete(0.5 * dt, comp0, rr0, fissionYields)
 
-        flux1, t1 = self.ro.intermediateSolve(
-            timestep, comp1, self._xs.at(midpoint)
-        )
+        flux1 = self._intermediateSolve(timestep, comp1, midpoint)
         # Deplete to midpoint using predicted midpoint reaction rates
-        rr1 = self._xs.getReactionRatesAt(midpoint, flux1)
+        rr1 = self._getReactionRates(midpoint, flux1, 1)
         comp2 = self.dep.deplete(0.5*dt, comp0, rr1, fissionYields)
 
-        flux2, t2 = self.ro.intermediateSolve(
-            timestep, comp2, self._xs.at(midpoint)
-        )
+        flux2 = self._intermediateSolve(timestep, comp2, midpoint)
 
         # Deplete to EOS with corrected midpoint reaction rates
-        rr2 = self._xs.getReactionRatesAt(midpoint, flux2)
+        rr2 = self._getReactionRates(midpoint, flux2, 2)
         comp3 = self.dep.deplete(dt, comp0, rr2, fissionYields)
 
-        flux3, t3 = self.ro.intermediateSolve(
-            timestep, comp3, self._xs.at(timestep.currentTime + dt)
-        )
+        flux3 = self._intermediateSolve(timestep, comp3, timestep.currentTime + dt)
 
-        rr3 = self._xs.getReactionRatesAt(timestep.currentTime + dt, flux3)
+        rr3 = self._getReactionRates(timestep.currentTime + dt, flux3, 3)
 
         # Get average reaction rates to deplete across entire interval
 
         avgrr = MaterialDataArray.fromLinearCombination(
-            (1, rr0), (2, rr1), (2, rr2), (1, rr3)
+            (1, rr0), (2, rr1), (2, rr2), (1, rr3), out=rr0
         )
         avgrr /= 6
 
@@ -18,5 +18,12 @@ from .utils import (
     compBundleFromMaterials,
 )
 from .fissionyields import FissionYieldDistribution, FissionYield
-from .cram import Cram16Solver, Cram48Solver
+from .cram import (
+    Cram16Solver,
+    Cram48Solver,
+    BatchedCramSolver,
+    BatchedCram16Solver,
+    BatchedCram48Solver,
+)
 from .xs import XsIndex, MaterialDataArray, DataBank, MaterialData
+from .pattern import MatrixPattern
@@ -11,12 +11,343 @@ https://github.com/openmc-dev/openmc
 """
 
 import numbers
+import threading
+import weakref
 
 import numpy
 import scipy.sparse
-from scipy.sparse.linalg import spsolve
+from scipy.sparse.linalg import splu
 
-from hydep.typed import IterableOf, TypedAttr
+from hydep.typed import IterableOf, TypedAttr, BoundedTyped
+from .elimination import EliminationSchedule
+
+
+class ShiftedStructure:
+    """Structure of ``A - theta * I`` shared across poles and matrices
+
+    Depletion matrices built from a single chain share a sparsity
+    pattern. This class stores the compressed sparse column (CSC)
+    layout of the shifted system, including every diagonal entry,
+    and a column ordering chosen once when the structure is built.
+    Factorizations then only perform the numeric work, rather than
+    computing a fill-reducing ordering for every pole and every
+    material.
+
+    Parameters
+    ----------
+    A : scipy.sparse.csr_matrix
+        Square matrix in canonical format, i.e. sorted indices
+        without duplicates. Only the structure is stored
+    shift : complex, optional
+        Representative shift ``theta``. If given, the column ordering
+        is selected from trial factorizations of
+        ``scale * A - shift * I``. Otherwise the natural ordering
+        is used
+    scale : float, optional
+        Scaling applied to ``A`` for the trial factorizations, e.g.
+        the length of the depletion interval
+
+    Attributes
+    ----------
+    shape : tuple of int
+        Shape of the matrix
+    indptr : numpy.ndarray
+        CSC column pointer array of the shifted system
+    indices : numpy.ndarray
+        CSC row indices of the shifted system
+    diagonal : numpy.ndarray
+        Positions of the diagonal entries in the CSC layout, such
+        that ``data[diagonal[i]]`` corresponds to ``A[i, i]``
+    perm : numpy.ndarray or None
+        Column permutation applied to the system. ``None`` if the
+        natural ordering is used
+
+    """
+
+    # Candidate orderings, passed to SuperLU once per structure
+    ORDERINGS = ("NATURAL", "COLAMD")
+
+    def __init__(self, A, shift=None, scale=1.0):
+        n = A.shape[0]
+        if A.shape != (n, n):
+            raise ValueError(f"Matrix must be square, not {A.shape}")
+        self.shape = A.shape
+        self.perm = None
+        self._tiles = {}
+        self._build(A, numpy.arange(n))
+
+        if shift is not None:
+            self._selectOrdering(A, shift, scale)
+
+    def _build(self, A, colOrder):
+        n = self.shape[0]
+        coo = A.tocoo()
+        diag = numpy.arange(n)
+        # Store 1 + index into A.data so that entries only added to
+        # include the diagonal map to zero
+        markers = scipy.sparse.coo_matrix(
+            (
+                numpy.concatenate((numpy.arange(1, A.nnz + 1), numpy.zeros(n, int))),
+                (
+                    numpy.concatenate((coo.row, diag)),
+                    numpy.concatenate((colOrder[coo.col], colOrder)),
+                ),
+            ),
+            shape=self.shape,
+        ).tocsc()
+        markers.sort_indices()
+
+        self.indptr = markers.indptr
+        self.indices = markers.indices
+        source = markers.data - 1
+        self._missing = numpy.flatnonzero(source < 0)
+        source[self._missing] = 0
+        self._source = source
+
+        columns = numpy.repeat(diag, numpy.diff(self.indptr))
+        original = numpy.empty(n, dtype=int)
+        original[colOrder] = diag
+        positions = numpy.flatnonzero(self.indices == original[columns])
+        self.diagonal = numpy.empty(n, dtype=int)
+        self.diagonal[self.indices[positions]] = positions
+
+    def _selectOrdering(self, A, shift, scale):
+        """Choose the candidate ordering that introduces the least fill
+
+        Each candidate column permutation is applied to the structure
+        and factorized with the natural ordering, as done for every
+        subsequent solve.
+        """
+        natural = numpy.arange(self.shape[0])
+        candidates = []
+        for spec in self.ORDERINGS:
+            if spec == "NATURAL":
+                candidates.append(natural)
+            else:
+                lu = splu(self.wrap(self._sample(A, shift, scale)), permc_spec=spec)
+                candidates.append(lu.perm_c)
+
+        best = None
+        for permc in candidates:
+            self._build(A, permc)
+            lu = self.factorize(self._sample(A, shift, scale))
+            fill = lu.L.nnz + lu.U.nnz
+            if best is None or fill < best[0]:
+                best = (fill, permc)
+
+        permc = best[1]
+        self._build(A, permc)
+        # Column i of A is column permc[i] of the stored system
+        self.perm = None if (permc == natural).all() else permc
+
+    def _sample(self, A, shift, scale):
+        sample = self.gather(A.data).astype(numpy.complex128) * scale
+        sample[self.diagonal] -= shift
+        return sample
+
+    @property
+    def nnz(self):
+        return self.indices.size
+
+    def gather(self, data, out=None):
+        """Place the non-zero values of a matrix in the CSC layout
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            Non-zero values of a canonical CSR matrix with the same
+            structure used to build this object. Can be a 2D array
+            with values for several matrices along the rows
+        out : numpy.ndarray, optional
+            Array to be filled, with :attr:`nnz` entries along the
+            last axis
+
+        Returns
+        -------
+        numpy.ndarray
+            Values in the CSC layout. Diagonal entries not present
+            in the original structure are zero
+
+        """
+        out = numpy.take(data, self._source, axis=-1, out=out)
+        out[..., self._missing] = 0
+        return out
+
+    def wrap(self, data):
+        """Build a :class:`scipy.sparse.csc_matrix` around values"""
+        mtx = scipy.sparse.csc_matrix(
+            (data, self.indices, self.indptr), shape=self.shape, copy=False
+        )
+        mtx.has_sorted_indices = True
+        return mtx
+
+    def factorize(self, data):
+        """Numerically factorize the system with the stored ordering"""
+        return splu(self.wrap(data), permc_spec="NATURAL")
+
+    def tile(self, count):
+        """CSC layout of a block diagonal matrix with ``count`` copies
+
+        Parameters
+        ----------
+        count : int
+            Number of diagonal blocks
+
+        Returns
+        -------
+        indptr : numpy.ndarray
+            Column pointer array of the block diagonal matrix
+        indices : numpy.ndarray
+            Row indices of the block diagonal matrix, such that
+            the values of block ``b`` are stored at
+            ``[b * nnz, (b + 1) * nnz)``
+
+        """
+        tile = self._tiles.get(count)
+        if tile is not None:
+            return tile
+        offsets = numpy.arange(count)
+        indptr = numpy.empty(count * self.shape[0] + 1, dtype=self.indptr.dtype)
+        indptr[:-1] = (self.indptr[:-1] + self.nnz * offsets[:, None]).ravel()
+        indptr[-1] = count * self.nnz
+        indices = (self.indices + self.shape[0] * offsets[:, None]).ravel()
+        tile = self._tiles[count] = (
+            indptr, indices.astype(self.indices.dtype, copy=False)
+        )
+        return tile
+
+    def solve(self, lu, rhs):
+        """Solve the factorized system, undoing any column permutation"""
+        x = lu.solve(rhs)
+        if self.perm is None:
+            return x
+        return x[self.perm]
+
+
+class Workspace:
+    """Scratch arrays reused across depletion solves
+
+    Arrays are allocated on first request, and reallocated only
+    if a different shape or data type is requested. Contents are
+    not preserved between requests.
+    """
+
+    __slots__ = ("_arrays", "__weakref__")
+
+    def __init__(self):
+        self._arrays = {}
+
+    def get(self, name, shape, dtype=numpy.float64):
+        """Fetch the scratch array ``name`` with a given shape and type"""
+        array = self._arrays.get(name)
+        if array is None or array.shape != shape or array.dtype != dtype:
+            array = self._arrays[name] = numpy.empty(shape, dtype=dtype)
+        return array
+
+    @property
+    def nbytes(self):
+        """Total size of the scratch arrays"""
+        return sum(a.nbytes for a in self._arrays.values())
+
+
+_LOCAL = threading.local()
+
+
+def getWorkspace(owner):
+    """Fetch the :class:`Workspace` attached to a cached structure
+
+    Workspaces are local to each thread, and released once the
+    owning :class:`ShiftedStructure` or
+    :class:`hydep.internal.elimination.EliminationSchedule` is
+    removed from the cache.
+
+    Parameters
+    ----------
+    owner : object
+        Structure or schedule whose systems will be solved
+
+    Returns
+    -------
+    Workspace
+
+    """
+    spaces = getattr(_LOCAL, "workspaces", None)
+    if spaces is None:
+        spaces = _LOCAL.workspaces = weakref.WeakKeyDictionary()
+    space = spaces.get(owner)
+    if space is None:
+        space = spaces[owner] = Workspace()
+    return space
+
+
+_STRUCTURES = {}
+_SCHEDULES = {}
+_MAX_STRUCTURES = 8
+
+
+def _patternKey(A):
+    return (A.shape, A.indptr.tobytes(), A.indices.tobytes())
+
+
+def _cache(cache, key, value):
+    if len(cache) >= _MAX_STRUCTURES:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+    return value
+
+
+def getShiftedStructure(A, shift=None, scale=1.0):
+    """Fetch or build the :class:`ShiftedStructure` for a matrix
+
+    Structures are cached per process and keyed on the sparsity
+    pattern, so all poles and all materials depleted with a single
+    chain share one ordering.
+
+    Parameters
+    ----------
+    A : scipy.sparse.csr_matrix
+        Square matrix in canonical format
+    shift : complex, optional
+        Representative shift used to select the column ordering
+        if the structure must be built
+    scale : float, optional
+        Scaling applied to ``A`` when selecting the ordering
+
+    Returns
+    -------
+    ShiftedStructure
+
+    """
+    key = _patternKey(A)
+    structure = _STRUCTURES.get(key)
+    if structure is not None:
+        return structure
+    return _cache(_STRUCTURES, key, ShiftedStructure(A, shift, scale))
+
+
+def getEliminationSchedule(A):
+    """Fetch or build the elimination schedule for a matrix
+
+    Like :func:`getShiftedStructure`, schedules are cached per
+    process and keyed on the sparsity pattern.
+
+    Parameters
+    ----------
+    A : scipy.sparse.csr_matrix
+        Square matrix in canonical format
+
+    Returns
+    -------
+    hydep.internal.elimination.EliminationSchedule
+
+    """
+    key = _patternKey(A)
+    schedule = _SCHEDULES.get(key)
+    if schedule is not None:
+        return schedule
+    if A.shape[0] != A.shape[1]:
+        raise ValueError(f"Matrix must be square, not {A.shape}")
+    return _cache(_SCHEDULES, key, EliminationSchedule(A.indptr, A.indices))
 
 
 class IPFCramSolver:
@@ -37,6 +368,9 @@ class IPFCramSolver:
         Complex poles. Must have an equal size as ``alpha``.
     alpha0 : float
         Limit of the approximation at infinity
+    compiled : bool, optional
+        Replay a pattern specialized elimination schedule rather than
+        calling SuperLU. Defaults to False
 
     Attributes
     ----------
@@ -47,13 +381,21 @@ class IPFCramSolver:
         Complex poles :math:`\theta` of the rational approximation
     alpha0 : float
         Limit of the approximation at infinity
+    compiled : bool
+        If True, factorize all poles at once using an
+        :class:`hydep.internal.elimination.EliminationSchedule`
+        generated once per sparsity pattern. The schedule avoids
+        SciPy and pivoting entirely, and is most effective when
+        many materials are depleted together with a
+        :class:`BatchedCramSolver`
 
     """
     alpha = IterableOf("alpha", numbers.Complex)
     theta = IterableOf("theta", numbers.Complex)
     alpha0 = TypedAttr("alpha0", numbers.Real)
+    compiled = TypedAttr("compiled", bool)
 
-    def __init__(self, alpha, theta, alpha0):
+    def __init__(self, alpha, theta, alpha0, compiled=False):
         self.alpha = numpy.asarray(alpha)
         self.theta = numpy.asarray(theta)
         if self.alpha.size != self.theta.size:
@@ -61,6 +403,7 @@ class IPFCramSolver:
                 "Input vectors must be of same size. Alpha: {}. "
                 "Theta: {}".format(self.alpha.size, self.theta.size))
         self.alpha0 = alpha0
+        self.compiled = compiled
 
     def __call__(self, A, n0, dt):
         """Solve depletion equations using IPF CRAM
@@ -82,12 +425,251 @@ class IPFCramSolver:
             Final compositions after ``dt``
 
         """
-        A = scipy.sparse.csr_matrix(A * dt, dtype=numpy.float64)
-        y = numpy.asarray(n0, dtype=numpy.float64)
-        ident = scipy.sparse.eye(A.shape[0])
+        A = scipy.sparse.csr_matrix(A, dtype=numpy.float64)
+        if not A.has_canonical_format:
+            A = A.copy()
+            A.sum_duplicates()
+
+        if self.compiled:
+            schedule = getEliminationSchedule(A)
+            scaled = getWorkspace(schedule).get("scaled", A.data.shape)
+            numpy.multiply(A.data, dt, out=scaled)
+            return self._solveCompiled(schedule, scaled, n0)
+
+        structure = getShiftedStructure(A, self.theta[0], dt)
+        workspace = getWorkspace(structure)
+        data = structure.gather(A.data, out=workspace.get("data", (structure.nnz, )))
+        data *= dt
+
+        # Only the diagonal of A - theta * I is complex, and updated
+        # in-place for each pole
+        shifted = workspace.get("shifted", data.shape, numpy.complex128)
+        shifted[:] = data
+        diagonal = numpy.take(
+            data, structure.diagonal, out=workspace.get("diagonal", (A.shape[0], ))
+        )
+
+        y = numpy.array(n0, dtype=numpy.float64)
+        rhs = workspace.get("rhs", y.shape, numpy.complex128)
+        work = workspace.get("work", y.shape)
         for alpha, theta in zip(self.alpha, self.theta):
-            y += 2*numpy.real(alpha*spsolve(A - theta*ident, y))
-        return y * self.alpha0
+            shifted[structure.diagonal] = diagonal - theta
+            lu = structure.factorize(shifted)
+            rhs[:] = y
+            self._accumulate(y, alpha, structure.solve(lu, rhs), work)
+        y *= self.alpha0
+        return y
+
+    @staticmethod
+    def _accumulate(y, alpha, x, work):
+        """Add ``2 * Re(alpha * x)`` to ``y`` without complex temporaries"""
+        numpy.multiply(x.real, 2 * alpha.real, out=work)
+        y += work
+        numpy.multiply(x.imag, 2 * alpha.imag, out=work)
+        y -= work
+
+    def _solveCompiled(self, schedule, data, n0):
+        """Solve with an elimination schedule
+
+        Parameters
+        ----------
+        schedule : hydep.internal.elimination.EliminationSchedule
+            Schedule for the matrix structure
+        data : numpy.ndarray
+            Values of the scaled matrix ``A * dt``. If 2D,
+            ``data[:, m]`` are the values for material ``m``
+        n0 : numpy.ndarray
+            Initial compositions. If 2D, ``n0[:, m]`` are the
+            compositions of material ``m``
+
+        Returns
+        -------
+        numpy.ndarray
+            Final compositions with the same shape as ``n0``
+
+        """
+        workspace = getWorkspace(schedule)
+        y = numpy.array(n0, dtype=numpy.float64)
+        base = schedule.scatter(
+            data, out=workspace.get("base", (schedule.nnz, ) + data.shape[1:])
+        )
+        rhs = workspace.get("rhs", y.shape, numpy.complex128)
+        work = workspace.get("work", y.shape)
+
+        if base.ndim == 1:
+            # Factorize all poles at once, then solve them in sequence
+            lu = workspace.get(
+                "lu", (schedule.nnz, self.theta.size), numpy.complex128
+            )
+            lu[:] = base[:, None]
+            lu[schedule.diagonal] -= self.theta
+            factors = workspace.get("factors", lu.shape[::-1], numpy.complex128)
+            factors[:] = schedule.factorize(lu).T
+            for alpha, factor in zip(self.alpha, factors):
+                rhs[:] = y
+                self._accumulate(y, alpha, schedule.solve(factor, rhs), work)
+            y *= self.alpha0
+            return y
+
+        lu = workspace.get("lu", base.shape, numpy.complex128)
+        diagonal = numpy.take(
+            base, schedule.diagonal, axis=0,
+            out=workspace.get("diagonal", (schedule.size, ) + base.shape[1:]),
+        )
+        for alpha, theta in zip(self.alpha, self.theta):
+            lu[:] = base
+            lu[schedule.diagonal] = diagonal - theta
+            schedule.factorize(lu)
+            rhs[:] = y
+            self._accumulate(y, alpha, schedule.solve(lu, rhs), work)
+        y *= self.alpha0
+        return y
+
+
+class BatchedCramSolver:
+    """IPF CRAM solver that depletes several materials at once
+
+    Matrices are expected to share a single sparsity pattern, as is
+    the case for matrices produced from a single
+    :class:`hydep.DepletionChain`. For each pole, the systems of up
+    to :attr:`blockSize` materials are assembled into a single block
+    diagonal system and factorized together. This removes much of
+    the per-material overhead that dominates when depleting many
+    small systems.
+
+    Parameters
+    ----------
+    solver : IPFCramSolver
+        Solver providing the poles and residues
+    blockSize : int, optional
+        Maximum number of materials to include in a single
+        block diagonal system
+
+    Attributes
+    ----------
+    solver : IPFCramSolver
+        Solver providing the poles and residues
+    blockSize : int
+        Maximum number of materials to include in a single
+        block diagonal system. Larger values reduce overhead
+        at the cost of memory in the factorization
+
+    """
+    solver = TypedAttr("solver", IPFCramSolver)
+    blockSize = BoundedTyped("blockSize", numbers.Integral, gt=0)
+
+    def __init__(self, solver, blockSize=64):
+        self.solver = solver
+        self.blockSize = blockSize
+
+    def __call__(self, matrices, densities, dt):
+        """Solve the depletion equations for several materials
+
+        Parameters
+        ----------
+        matrices : sequence of scipy.sparse.csr_matrix
+            Depletion matrices for each material. All matrices
+            must share the same sparsity structure
+        densities : numpy.ndarray
+            2D array of initial compositions such that
+            ``densities[m]`` corresponds to ``matrices[m]``
+        dt : float
+            Time [s] of the specific interval to be solved
+
+        Returns
+        -------
+        numpy.ndarray
+            2D array of final compositions after ``dt``
+
+        Raises
+        ------
+        ValueError
+            If the number of matrices and compositions are
+            inconsistent, or the matrices do not share a structure
+
+        """
+        y = numpy.array(densities, dtype=numpy.float64, ndmin=2)
+        if len(matrices) != y.shape[0]:
+            raise ValueError(
+                f"Inconsistent number of matrices {len(matrices)} and "
+                f"compositions {y.shape[0]}"
+            )
+        if not len(matrices):
+            return y
+
+        values = []
+        first = None
+        for mtx in matrices:
+            mtx = scipy.sparse.csr_matrix(mtx, dtype=numpy.float64)
+            if not mtx.has_canonical_format:
+                mtx = mtx.copy()
+                mtx.sum_duplicates()
+            if first is None:
+                first = mtx
+            elif not (
+                (mtx.indices is first.indices and mtx.indptr is first.indptr)
+                or (
+                    numpy.array_equal(mtx.indptr, first.indptr)
+                    and numpy.array_equal(mtx.indices, first.indices)
+                )
+            ):
+                raise ValueError("Matrices do not share a sparsity structure")
+            values.append(mtx.data)
+
+        if self.solver.compiled:
+            schedule = getEliminationSchedule(first)
+            values = numpy.array(values) * dt
+            for start in range(0, y.shape[0], self.blockSize):
+                block = slice(start, start + self.blockSize)
+                y[block] = self.solver._solveCompiled(
+                    schedule, values[block].T, y[block].T
+                ).T
+            return y
+
+        structure = getShiftedStructure(first, self.solver.theta[0], dt)
+        values = structure.gather(numpy.array(values)) * dt
+
+        for start in range(0, y.shape[0], self.blockSize):
+            block = slice(start, start + self.blockSize)
+            y[block] = self._solveBlock(structure, values[block], y[block])
+        return y
+
+    def _solveBlock(self, structure, values, y):
+        count, n = y.shape
+        indptr, indices = structure.tile(count)
+        diagonal = (
+            structure.diagonal + structure.nnz * numpy.arange(count)[:, None]
+        ).ravel()
+        shape = (count * n, count * n)
+        y = numpy.array(y, dtype=numpy.float64)
+
+        # Allocate for a full block so a partial final block uses views
+        workspace = getWorkspace(structure)
+        shifted = workspace.get(
+            "blockShifted", (self.blockSize * structure.nnz, ), numpy.complex128
+        )[:values.size]
+        shifted.reshape(values.shape)[:] = values
+        mtx = scipy.sparse.csc_matrix(
+            (shifted, indices, indptr), shape=shape, copy=False
+        )
+        # Diagonal is shifted in place for each pole, but scipy copies
+        # views much smaller than their base, e.g. for a partial block
+        mtx.data = shifted
+        realDiagonal = shifted.real[diagonal]
+        mtx.has_sorted_indices = True
+        rhs = workspace.get("blockRhs", (self.blockSize, n), numpy.complex128)[:count]
+        work = workspace.get("blockWork", (self.blockSize, n))[:count]
+
+        for alpha, theta in zip(self.solver.alpha, self.solver.theta):
+            shifted[diagonal] = realDiagonal - theta
+            lu = splu(mtx, permc_spec="NATURAL")
+            rhs[:] = y
+            x = lu.solve(rhs.ravel()).reshape(count, n)
+            if structure.perm is not None:
+                x = x[:, structure.perm]
+            self.solver._accumulate(y, alpha, x, work)
+        y *= self.solver.alpha0
+        return y
 
 
 # Coefficients for IPF Cram 16
@@ -116,6 +698,8 @@ c16_theta = numpy.array([
 c16_alpha0 = 2.124853710495224e-16
 Cram16Solver = IPFCramSolver(c16_alpha, c16_theta, c16_alpha0)
 
+BatchedCram16Solver = BatchedCramSolver(Cram16Solver)
+
 del c16_alpha, c16_alpha0, c16_theta
 
 # Coefficients for 48th order IPF Cram
@@ -183,5 +767,6 @@ c48_alpha = numpy.array(alpha_r + alpha_i * 1j, dtype=numpy.complex128)
 c48_alpha0 = 2.258038182743983e-47
 
 Cram48Solver = IPFCramSolver(c48_alpha, c48_theta, c48_alpha0)
+BatchedCram48Solver = BatchedCramSolver(Cram48Solver)
 
 del c48_alpha, c48_alpha0, c48_theta, alpha_r, alpha_i, theta_r, theta_i
@@ -0,0 +1,166 @@
+"""
+Iterative eigenvalue solutions seeded with previous eigenvectors
+
+The fission matrix used by the SFV method changes slowly between
+coarse steps. Dominant eigenvectors from the previous step span a
+subspace very close to the current dominant subspace, so a few
+iterations of subspace iteration with Rayleigh-Ritz projection
+can replace a full eigenvalue decomposition.
+"""
+
+import numpy
+
+
+__all__ = ("subspaceEig", "warmAdjFwdEig")
+
+
+def subspaceEig(matrix, basis, nmodes, tol=1e-8, maxiter=100, guard=None):
+    r"""Dominant eigenpairs through subspace iteration
+
+    Parameters
+    ----------
+    matrix : numpy.ndarray or scipy.sparse.spmatrix
+        Square matrix supporting ``matrix @ x``
+    basis : numpy.ndarray
+        Initial guess for the dominant eigenvectors, with one vector
+        per column. At least ``nmodes`` columns are expected, but
+        missing columns are filled with random vectors
+    nmodes : int
+        Number of dominant eigenpairs to compute
+    tol : float, optional
+        Relative residual tolerance
+        :math:`\|Av - \lambda v\| \leq tol |\lambda| \|v\|`
+        that all requested eigenpairs must satisfy
+    maxiter : int, optional
+        Maximum number of iterations
+    guard : int, optional
+        Number of additional vectors carried in the subspace to
+        accelerate convergence of the last requested modes. Defaults
+        to ``max(2, nmodes // 4)``
+
+    Returns
+    -------
+    numpy.ndarray
+        Eigenvalues sorted by decreasing magnitude
+    numpy.ndarray
+        Eigenvectors with unit norm, one per column
+    int
+        Number of iterations performed
+    bool
+        True if all requested eigenpairs converged to real values
+
+    """
+    size = matrix.shape[0]
+    basis = numpy.asarray(basis, dtype=numpy.float64)
+    if basis.ndim == 1:
+        basis = basis[:, numpy.newaxis]
+    if guard is None:
+        guard = max(2, nmodes // 4)
+    width = min(size, max(nmodes + guard, basis.shape[1]))
+
+    if basis.shape[1] < width:
+        # Seeded for reproducible iterations
+        rng = numpy.random.RandomState(width)
+        basis = numpy.hstack(
+            (basis, rng.random_sample((size, width - basis.shape[1])))
+        )
+
+    subspace = numpy.linalg.qr(basis[:, :width])[0]
+
+    for iteration in range(1, maxiter + 1):
+        image = numpy.asarray(matrix @ subspace)
+        values, ritz = numpy.linalg.eig(subspace.T @ image)
+        order = numpy.argsort(-numpy.abs(values), kind="stable")
+        values = values[order]
+        ritz = ritz[:, order]
+
+        if numpy.iscomplexobj(values):
+            scale = numpy.abs(values[:nmodes])
+            if (numpy.abs(values[:nmodes].imag) > tol * scale).any():
+                # Complex pairs among the requested modes, keep iterating
+                # and fail if they persist
+                subspace = numpy.linalg.qr(image)[0]
+                continue
+            values = values.real
+            ritz = ritz.real
+
+        vectors = subspace @ ritz[:, :nmodes]
+        residual = image @ ritz[:, :nmodes] - vectors * values[:nmodes]
+        norms = numpy.linalg.norm(vectors, axis=0)
+        error = numpy.linalg.norm(residual, axis=0) / (
+            numpy.abs(values[:nmodes]) * norms
+        )
+        if (error <= tol).all():
+            return values[:nmodes], vectors / norms, iteration, True
+
+        subspace = numpy.linalg.qr(image @ ritz)[0]
+
+    vectors = subspace[:, :nmodes]
+    return values[:nmodes].real, vectors, maxiter, False
+
+
+def warmAdjFwdEig(fmtx, nmodes, adjoint, forward, tol=1e-8, maxiter=100):
+    """Adjoint and forward eigenvectors starting from previous vectors
+
+    Forward vectors are scaled to the norm and sign of the
+    corresponding starting vectors. Adjoint vectors are then scaled
+    such that ``adj[:, i] @ fwd[:, i] == 1``, consistent with
+    :func:`sfv.getAdjFwdEig`.
+
+    Parameters
+    ----------
+    fmtx : numpy.ndarray or scipy.sparse.spmatrix
+        Square fission matrix
+    nmodes : int
+        Number of dominant modes to compute
+    adjoint : numpy.ndarray
+        Previous adjoint eigenvectors, one per column
+    forward : numpy.ndarray
+        Previous forward eigenvectors, one per column
+    tol : float, optional
+        Relative residual tolerance for each eigenpair
+    maxiter : int, optional
+        Maximum number of iterations for each of the adjoint and
+        forward problems
+
+    Returns
+    -------
+    numpy.ndarray
+        Adjoint eigenvectors, one per column
+    numpy.ndarray
+        Forward eigenvectors, one per column
+    numpy.ndarray
+        Eigenvalues in decreasing magnitude
+    int
+        Total number of iterations
+    bool
+        True if both problems converged with consistent eigenvalues.
+        Otherwise the previous outputs should not be used
+
+    """
+    fwdValues, fwd, fwdIters, fwdOk = subspaceEig(
+        fmtx, forward[:, :nmodes], nmodes, tol, maxiter
+    )
+    adjValues, adj, adjIters, adjOk = subspaceEig(
+        fmtx.T, adjoint[:, :nmodes], nmodes, tol, maxiter
+    )
+    iterations = fwdIters + adjIters
+    converged = (
+        fwdOk and adjOk
+        and numpy.allclose(fwdValues, adjValues, rtol=max(tol, 1e-10) * 1e2, atol=0)
+    )
+    if not converged:
+        return adj, fwd, fwdValues, iterations, False
+
+    scale = numpy.linalg.norm(forward[:, :nmodes], axis=0)
+    sign = numpy.sign(numpy.einsum("ij,ij->j", fwd, forward[:, :nmodes]))
+    sign[sign == 0] = 1
+    fwd *= scale * sign
+
+    pairing = numpy.einsum("ij,ij->j", adj, fwd)
+    if (numpy.abs(pairing) <= tol * numpy.linalg.norm(fwd, axis=0)).any():
+        # Adjoint and forward vectors are nearly orthogonal, cannot pair
+        return adj, fwd, fwdValues, iterations, False
+    adj /= pairing
+
+    return adj, fwd, fwdValues, iterations, True
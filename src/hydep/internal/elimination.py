@@ -0,0 +1,323 @@
+"""
+Pattern specialized sparse LU factorization
+
+The sparsity pattern of the depletion matrix is fixed by the
+depletion chain. An :class:`EliminationSchedule` performs the
+symbolic analysis of the shifted system once, and records every
+operation of the numeric factorization and triangular solves as
+arrays of indices. These operations are grouped into levels of
+mutually independent operations, so replaying the schedule only
+requires a handful of vectorized NumPy calls per level, with
+no SciPy sparse objects involved. Values for many systems, e.g.
+several poles or several materials, are processed simultaneously
+by storing them as columns of a 2D array.
+"""
+
+import heapq
+
+import numpy
+
+
+__all__ = ("EliminationSchedule", )
+
+
+class _ReducedOps:
+    """Gather, multiply, and sum products into unique targets
+
+    Operations are sorted by target, such that the products
+    ``values[left] * values[right]`` can be summed with
+    :func:`numpy.add.reduceat` into each entry of ``targets``.
+    """
+
+    __slots__ = ("targets", "left", "right", "starts")
+
+    def __init__(self, targets, left, right):
+        order = numpy.argsort(targets, kind="stable")
+        targets = numpy.asarray(targets)[order]
+        self.left = numpy.asarray(left)[order]
+        self.right = numpy.asarray(right)[order]
+        self.targets, self.starts = numpy.unique(targets, return_index=True)
+
+    def reduce(self, left, right):
+        """Sum of products for each target given gathered operands"""
+        return numpy.add.reduceat(left[self.left] * right[self.right], self.starts)
+
+
+class EliminationSchedule:
+    r"""Straight-line LU factorization for a fixed sparsity pattern
+
+    The factorization is performed without pivoting, in the natural
+    ordering of the matrix. This is stable for the shifted systems
+    :math:`A - \theta I` that appear in CRAM, as discussed in M. Pusa,
+    "`Higher-Order Chebyshev Rational Approximation Method and
+    Application to Burnup Equations <https://doi.org/10.13182/NSE15-26>`_,"
+    Nucl. Sci. Eng., 182:3, 297-318. Isotopes sorted by ZAI, as
+    in :class:`hydep.DepletionChain`, also produce little fill.
+
+    Parameters
+    ----------
+    indptr : numpy.ndarray
+        Row pointer array of a square CSR matrix
+    indices : numpy.ndarray
+        Sorted column indices of a square CSR matrix. Diagonal
+        entries need not be present.
+
+    Attributes
+    ----------
+    size : int
+        Number of rows and columns in the matrix
+    nnz : int
+        Number of non-zero entries in the LU factors, including
+        fill-in
+    indptr : numpy.ndarray
+        Row pointer array of the combined LU factors
+    indices : numpy.ndarray
+        Column indices of the combined LU factors
+    source : numpy.ndarray
+        Positions of the original matrix entries in the LU storage,
+        such that ``lu[source] = A.data``
+    diagonal : numpy.ndarray
+        Positions of the diagonal entries in the LU storage
+
+    """
+
+    def __init__(self, indptr, indices):
+        self.size = len(indptr) - 1
+        rows = self._symbolic(indptr, indices, self.size)
+
+        self.indptr = numpy.zeros(self.size + 1, dtype=int)
+        numpy.cumsum([r.size for r in rows], out=self.indptr[1:])
+        self.indices = numpy.concatenate(rows) if rows else numpy.empty(0, int)
+        # Row-major keys of each entry, sorted by construction
+        rowIndex = numpy.repeat(
+            numpy.arange(self.size, dtype=numpy.int64), numpy.diff(self.indptr)
+        )
+        self._keys = rowIndex * self.size + self.indices
+
+        original = numpy.repeat(numpy.arange(self.size), numpy.diff(indptr))
+        self.source = self.position(original, indices)
+        self.diagonal = self.position(numpy.arange(self.size), numpy.arange(self.size))
+
+        self._buildFactorization()
+        self._buildLowerSolve()
+        self._buildUpperSolve()
+
+    @property
+    def nnz(self):
+        return self.indices.size
+
+    @property
+    def numLevels(self):
+        """Number of sequential steps in factorization and solves"""
+        return len(self._factorLevels) + len(self._lowerLevels) + len(self._upperLevels)
+
+    def position(self, rows, columns):
+        """Positions of entries in the LU storage
+
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            Row indices of entries
+        columns : numpy.ndarray
+            Column indices of entries. Entries must be present in
+            the LU pattern
+
+        Returns
+        -------
+        numpy.ndarray
+            Positions such that ``lu[pos]`` holds entry
+            ``(rows[i], columns[i])``
+
+        """
+        keys = numpy.asarray(rows, dtype=numpy.int64) * self.size + columns
+        return numpy.searchsorted(self._keys, keys)
+
+    @staticmethod
+    def _symbolic(indptr, indices, n):
+        """Row-wise symbolic LU factorization without pivoting"""
+        rows = []
+        for i in range(n):
+            pattern = set(indices[indptr[i]:indptr[i + 1]].tolist())
+            pattern.add(i)
+            heap = [k for k in pattern if k < i]
+            heapq.heapify(heap)
+            while heap:
+                k = heapq.heappop(heap)
+                for j in rows[k][rows[k] > k].tolist():
+                    if j not in pattern:
+                        pattern.add(j)
+                        if j < i:
+                            heapq.heappush(heap, j)
+            rows.append(numpy.array(sorted(pattern), dtype=int))
+        return rows
+
+    def _rowSlices(self):
+        for row in range(self.size):
+            start, stop = self.indptr[row], self.indptr[row + 1]
+            yield row, numpy.arange(start, stop), self.indices[start:stop]
+
+    def _buildFactorization(self):
+        """Right-looking elimination grouped into independent levels"""
+        n = self.size
+        lowerCols = [[] for _ in range(n)]  # (row, position) below diagonal
+        upperRows = []  # (columns, positions) right of diagonal
+        for row, positions, cols in self._rowSlices():
+            for pos, col in zip(positions[cols < row], cols[cols < row]):
+                lowerCols[col].append((row, pos))
+            upperRows.append((cols[cols > row], positions[cols > row]))
+
+        # Pivot k must follow pivots that update row k or column k
+        level = numpy.zeros(n, dtype=int)
+        for k in range(n):
+            lower = lowerCols[k]
+            if not lower:
+                continue
+            last = max(row for row, _pos in lower)
+            for col, _pos in zip(*upperRows[k]):
+                # Updates to column col, rows (k, last] affect pivot col
+                # if col is between k and the last row updated
+                if col < last:
+                    level[col] = max(level[col], level[k] + 1)
+            for row, _pos in lower:
+                level[row] = max(level[row], level[k] + 1)
+
+        levels = {}
+        for k in range(n):
+            lower = lowerCols[k]
+            if not lower:
+                continue
+            rows, lpos = map(numpy.array, zip(*lower))
+            ucols, upos = upperRows[k]
+            divide = (lpos, numpy.full(lpos.size, self.diagonal[k]))
+            targets = self.position(
+                numpy.repeat(rows, ucols.size), numpy.tile(ucols, rows.size)
+            )
+            update = (
+                targets, numpy.repeat(lpos, ucols.size), numpy.tile(upos, rows.size)
+            )
+            levels.setdefault(level[k], []).append((divide, update))
+
+        self._factorLevels = []
+        for key in sorted(levels):
+            divTargets, divPivots = (
+                numpy.concatenate(x) for x in zip(*(d for d, _u in levels[key]))
+            )
+            targets, left, right = (
+                numpy.concatenate(x) for x in zip(*(u for _d, u in levels[key]))
+            )
+            self._factorLevels.append(
+                (
+                    divTargets,
+                    divPivots,
+                    _ReducedOps(targets, left, right) if targets.size else None,
+                )
+            )
+
+    def _buildLowerSolve(self):
+        level = numpy.zeros(self.size, dtype=int)
+        ops = []
+        for row, positions, cols in self._rowSlices():
+            lower = cols < row
+            if lower.any():
+                level[row] = level[cols[lower]].max() + 1
+                ops.append((row, positions[lower], cols[lower]))
+        self._lowerLevels = self._groupSolveOps(ops, level)
+
+    def _buildUpperSolve(self):
+        level = numpy.zeros(self.size, dtype=int)
+        ops = []
+        for row, positions, cols in reversed(list(self._rowSlices())):
+            upper = cols > row
+            if upper.any():
+                level[row] = level[cols[upper]].max() + 1
+                ops.append((row, positions[upper], cols[upper]))
+        self._upperLevels = self._groupSolveOps(ops, level)
+        self._upperLeaves = numpy.flatnonzero(level == 0)
+
+    @staticmethod
+    def _groupSolveOps(ops, level):
+        grouped = {}
+        for row, positions, cols in ops:
+            grouped.setdefault(level[row], []).append(
+                (numpy.full(positions.size, row), positions, cols)
+            )
+        return [
+            _ReducedOps(*(numpy.concatenate(x) for x in zip(*grouped[key])))
+            for key in sorted(grouped)
+        ]
+
+    def scatter(self, data, out=None):
+        """Place matrix values into the LU storage
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            Values of the CSR matrix used to build this schedule.
+            Can be 2D with ``data[:, j]`` the values of system ``j``
+        out : numpy.ndarray, optional
+            Array with :attr:`nnz` rows to be filled
+
+        Returns
+        -------
+        numpy.ndarray
+            LU storage with fill-in entries set to zero
+
+        """
+        data = numpy.asarray(data)
+        if out is None:
+            out = numpy.zeros((self.nnz, ) + data.shape[1:], dtype=data.dtype)
+        else:
+            out.fill(0)
+        out[self.source] = data
+        return out
+
+    def factorize(self, lu):
+        """Factorize in-place
+
+        Parameters
+        ----------
+        lu : numpy.ndarray
+            Values of one or more systems in LU storage, e.g. from
+            :meth:`scatter`, with :attr:`nnz` rows. Overwritten with
+            the unit lower triangular and upper triangular factors
+
+        Returns
+        -------
+        numpy.ndarray
+            ``lu``
+
+        """
+        for divTargets, divPivots, update in self._factorLevels:
+            lu[divTargets] /= lu[divPivots]
+            if update is not None:
+                lu[update.targets] -= update.reduce(lu, lu)
+        return lu
+
+    def solve(self, lu, rhs):
+        """Solve the factorized system in-place
+
+        Parameters
+        ----------
+        lu : numpy.ndarray
+            Factorized values from :meth:`factorize`
+        rhs : numpy.ndarray
+            Right hand side vectors with :attr:`size` rows and a
+            column for each column in ``lu``. Overwritten with the
+            solution
+
+        Returns
+        -------
+        numpy.ndarray
+            ``rhs``
+
+        """
+        for ops in self._lowerLevels:
+            rhs[ops.targets] -= ops.reduce(lu, rhs)
+
+        diagonal = lu[self.diagonal]
+        rhs[self._upperLeaves] /= diagonal[self._upperLeaves]
+        for ops in self._upperLevels:
+            rows = ops.targets
+            rhs[rows] -= ops.reduce(lu, rhs)
+            rhs[rows] /= diagonal[rows]
+        return rhs
@@ -0,0 +1,419 @@
+"""
+Fixed sparsity structure for depletion matrices
+
+The non-zero structure of a depletion matrix depends only on the
+depletion chain and the ordering of isotopes. Values change with
+reaction rates and fission yields. Precomputing the structure once
+allows matrices to be formed by filling a single data vector
+"""
+
+from collections import namedtuple
+import typing
+
+import numpy
+import scipy.sparse
+
+from .fissionyields import FissionYield
+
+__all__ = ["MatrixPattern"]
+
+
+FissionTerm = namedtuple(
+    "FissionTerm", "parent rateIndex products select positions"
+)
+FissionTerm.__doc__ = """Contributions from a single fission reaction
+
+Parameters
+----------
+parent : int
+    ZAI of the fissioning isotope
+rateIndex : int
+    Position of the fission reaction rate in the reaction rate vector
+products : tuple of int
+    Products of the fission yield distribution in the chain
+select : numpy.ndarray
+    Indices into ``products`` for products present in the ordering
+positions : numpy.ndarray
+    Positions in the data vector for each selected product
+"""
+
+
+class MatrixPattern:
+    """Compressed sparse row structure for a depletion matrix
+
+    Rather than create one directly, use
+    :meth:`hydep.DepletionChain.getMatrixPattern`. All entries on the
+    diagonal are included, even if they are structurally zero.
+
+    Parameters
+    ----------
+    ordering : mapping of int to int
+        Row and column index for each isotope ZAI
+    indptr : numpy.ndarray
+        Row pointer vector, ``indices[indptr[i]:indptr[i+1]]`` are
+        the columns of non-zero entries in row ``i``
+    indices : numpy.ndarray
+        Column indices for each non-zero entry
+    ratePositions : numpy.ndarray
+        Position in the data vector for each reaction rate term
+    rateIndices : numpy.ndarray
+        Position in the reaction rate vector for each reaction rate term
+    rateCoefficients : numpy.ndarray
+        Branching ratio applied to each reaction rate term. Losses
+        are negative
+    constant : numpy.ndarray
+        Contributions independent of reaction rates, e.g. decay
+    fissionTerms : iterable of FissionTerm
+        Fission product contributions for each fission reaction
+
+    Attributes
+    ----------
+    ordering : mapping of int to int
+        Row and column index for each isotope ZAI
+    shape : tuple of int
+        Shape of the matrix
+    nnz : int
+        Number of stored entries
+    indptr : numpy.ndarray
+        Row pointer vector
+    indices : numpy.ndarray
+        Column indices of each stored entry
+    diagonal : numpy.ndarray
+        Position in the data vector for each entry on the diagonal
+
+    """
+
+    def __init__(
+        self,
+        ordering: typing.Mapping[int, int],
+        indptr: numpy.ndarray,
+        indices: numpy.ndarray,
+        ratePositions: numpy.ndarray,
+        rateIndices: numpy.ndarray,
+        rateCoefficients: numpy.ndarray,
+        constant: numpy.ndarray,
+        fissionTerms: typing.Iterable[FissionTerm],
+    ):
+        size = len(ordering)
+        self.ordering = ordering
+        self.shape = (size, size)
+        self.indptr = indptr
+        self.indices = indices
+        self._ratePositions = ratePositions
+        self._rateIndices = rateIndices
+        self._rateCoefficients = rateCoefficients
+        self._constant = constant
+        self._fissionTerms = tuple(fissionTerms)
+        self._rateScatter = None
+
+        rows = numpy.repeat(numpy.arange(size), numpy.diff(indptr))
+        self.diagonal = numpy.flatnonzero(rows == indices)
+        if self.diagonal.size != size:
+            raise ValueError("Pattern must contain all diagonal entries")
+
+    @classmethod
+    def fromTerms(
+        cls,
+        ordering: typing.Mapping[int, int],
+        rateTerms: typing.Iterable[typing.Tuple[int, int, int, float]],
+        constantTerms: typing.Iterable[typing.Tuple[int, int, float]],
+        fissionTerms: typing.Iterable[
+            typing.Tuple[int, int, int, typing.Tuple[int, ...],
+                         typing.Sequence[int], typing.Sequence[int]]
+        ],
+    ) -> "MatrixPattern":
+        """Construct the pattern from individual contributions
+
+        Parameters
+        ----------
+        ordering : mapping of int to int
+            Row and column index for each isotope ZAI
+        rateTerms : iterable of (int, int, int, float)
+            Items ``(row, column, rateIndex, coefficient)`` such that
+            ``A[row, column] += rates[rateIndex] * coefficient``
+        constantTerms : iterable of (int, int, float)
+            Items ``(row, column, value)`` such that
+            ``A[row, column] += value``
+        fissionTerms : iterable
+            Items ``(parent, column, rateIndex, products, select, rows)``
+            such that ``A[rows[j], column] += rates[rateIndex] * y[select[j]]``
+            for fission yields ``y`` of ``parent`` ordered by ``products``
+
+        Returns
+        -------
+        MatrixPattern
+
+        """
+        size = len(ordering)
+        rateTerms = tuple(rateTerms)
+        constantTerms = tuple(constantTerms)
+        fissionTerms = tuple(fissionTerms)
+
+        keys = {(ix, ix) for ix in range(size)}
+        keys.update((row, col) for row, col, _r, _c in rateTerms)
+        keys.update((row, col) for row, col, _v in constantTerms)
+        for _parent, col, _r, _p, _s, rows in fissionTerms:
+            keys.update((row, col) for row in rows)
+
+        keys = sorted(keys)
+        positions = {key: ix for ix, key in enumerate(keys)}
+        keyArray = numpy.array(keys, dtype=numpy.int32).reshape(len(keys), 2)
+
+        indptr = numpy.zeros(size + 1, dtype=numpy.int32)
+        numpy.cumsum(
+            numpy.bincount(keyArray[:, 0], minlength=size), out=indptr[1:]
+        )
+
+        constant = numpy.zeros(len(keys))
+        if constantTerms:
+            numpy.add.at(
+                constant,
+                [positions[row, col] for row, col, _v in constantTerms],
+                [value for _r, _c, value in constantTerms],
+            )
+
+        compiledFission = []
+        for parent, col, rateIndex, products, select, rows in fissionTerms:
+            compiledFission.append(
+                FissionTerm(
+                    parent,
+                    rateIndex,
+                    products,
+                    numpy.array(select, dtype=int),
+                    numpy.array([positions[r, col] for r in rows], dtype=int),
+                )
+            )
+
+        ratePositions = numpy.empty(len(rateTerms), dtype=int)
+        rateIndices = numpy.empty(len(rateTerms), dtype=int)
+        rateCoefficients = numpy.empty(len(rateTerms))
+        for ix, (row, col, rateIndex, coeff) in enumerate(rateTerms):
+            ratePositions[ix] = positions[row, col]
+            rateIndices[ix] = rateIndex
+            rateCoefficients[ix] = coeff
+
+        return cls(
+            ordering,
+            indptr,
+            keyArray[:, 1].copy(),
+            ratePositions,
+            rateIndices,
+            rateCoefficients,
+            constant,
+            compiledFission,
+        )
+
+    @property
+    def nnz(self) -> int:
+        return self.indices.size
+
+    def fill(
+        self,
+        rates: numpy.ndarray,
+        fissionYields: typing.Mapping[int, typing.Mapping[int, float]],
+        out: typing.Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """Compute the values of the matrix for a single material
+
+        Parameters
+        ----------
+        rates : numpy.ndarray
+            Reaction rates ordered according to the reaction index
+            used to construct this pattern
+        fissionYields : mapping of int to hydep.internal.FissionYield
+            Fission yields for each parent isotope
+        out : numpy.ndarray, optional
+            Vector of length :attr:`nnz` to be filled
+
+        Returns
+        -------
+        numpy.ndarray
+            Values of the non-zero entries consistent with
+            :attr:`indices` and :attr:`indptr`
+
+        Raises
+        ------
+        ValueError
+            If a fission product in the isotope ordering is not
+            included in the pattern
+
+        """
+        values = rates[self._rateIndices] * self._rateCoefficients
+        if out is None:
+            out = numpy.bincount(
+                self._ratePositions, weights=values, minlength=self.nnz
+            )
+        else:
+            out[:] = numpy.bincount(
+                self._ratePositions, weights=values, minlength=self.nnz
+            )
+        out += self._constant
+
+        for term in self._fissionTerms:
+            fyield = fissionYields.get(term.parent)
+            if fyield is None:
+                continue
+            out[term.positions] += rates[term.rateIndex] * self._getYields(
+                term, fyield
+            )
+        return out
+
+    def fillMany(
+        self,
+        rates: numpy.ndarray,
+        fissionYields: typing.Sequence[typing.Mapping[int, typing.Mapping[int, float]]],
+        out: typing.Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """Compute the values of the matrices for several materials
+
+        Materials that share the same fission yield mapping, e.g.
+        through :class:`hydep.internal.FakeSequence`, are
+        processed together.
+
+        Parameters
+        ----------
+        rates : numpy.ndarray
+            2D array of reaction rates such that ``rates[m]`` are the
+            reaction rates in material ``m``, ordered according to the
+            reaction index used to construct this pattern
+        fissionYields : sequence of mapping
+            Fission yields for each parent isotope in each material
+        out : numpy.ndarray, optional
+            Array of shape ``(N_mats, nnz)`` to be filled
+
+        Returns
+        -------
+        numpy.ndarray
+            Values of the non-zero entries such that ``out[m]`` is
+            the data vector for material ``m``, consistent with
+            :attr:`indices` and :attr:`indptr`
+
+        Raises
+        ------
+        ValueError
+            If the number of materials is inconsistent, or a fission
+            product in the isotope ordering is not included in the pattern
+
+        """
+        rates = numpy.asarray(rates, dtype=float)
+        if len(rates.shape) != 2:
+            raise ValueError(f"Expected 2D array of rates, got {rates.shape}")
+        nmats = rates.shape[0]
+        if len(fissionYields) != nmats:
+            raise ValueError(
+                f"Inconsistent number of reaction rates {nmats} and fission "
+                f"yields {len(fissionYields)}"
+            )
+        if out is None:
+            out = numpy.empty((nmats, self.nnz))
+        elif out.shape != (nmats, self.nnz):
+            raise ValueError(
+                f"Output array should have shape {(nmats, self.nnz)}, not {out.shape}"
+            )
+
+        # Each material is a single sparse matrix-vector product
+        # against an operator that maps reaction rates and fission
+        # rates onto the non-zero entries. Fission yields are folded
+        # into the operator, so it is shared across materials with
+        # identical yields
+        nrates = rates.shape[1]
+        rates = numpy.hstack(
+            (rates, rates[:, [term.rateIndex for term in self._fissionTerms]])
+        )
+
+        # Entries keep the yields alive and are checked by identity, so
+        # a reused id never selects the operator of other yields
+        operators = {}
+        for matIndex, matYields in enumerate(fissionYields):
+            entry = operators.get(id(matYields))
+            if entry is None or entry[0] is not matYields:
+                entry = operators[id(matYields)] = (
+                    matYields, self._getOperator(nrates, matYields)
+                )
+            out[matIndex] = entry[1] @ rates[matIndex]
+
+        out += self._constant
+        return out
+
+    def _getOperator(self, nrates, fissionYields):
+        """Sparse operator mapping rates to matrix entries
+
+        Columns ``[0, nrates)`` correspond to the reaction rates,
+        while the remaining columns correspond to the reaction
+        rates of each fission term. Fission yields are included in
+        the latter block.
+        """
+        if self._rateScatter is None or self._rateScatter[0] != nrates:
+            self._rateScatter = (
+                nrates,
+                scipy.sparse.coo_matrix(
+                    (
+                        self._rateCoefficients,
+                        (self._ratePositions, self._rateIndices),
+                    ),
+                    shape=(self.nnz, nrates),
+                ),
+            )
+
+        rows = []
+        columns = []
+        values = []
+        for termIndex, term in enumerate(self._fissionTerms, start=nrates):
+            fyield = fissionYields.get(term.parent)
+            if fyield is None:
+                continue
+            rows.append(term.positions)
+            columns.append(numpy.full(term.positions.size, termIndex))
+            values.append(self._getYields(term, fyield))
+
+        rateScatter = self._rateScatter[1]
+        return scipy.sparse.csr_matrix(
+            (
+                numpy.concatenate([rateScatter.data] + values),
+                (
+                    numpy.concatenate([rateScatter.row] + rows),
+                    numpy.concatenate([rateScatter.col] + columns),
+                ),
+            ),
+            shape=(self.nnz, nrates + len(self._fissionTerms)),
+        )
+
+    def _getYields(self, term, fyield):
+        if isinstance(fyield, FissionYield) and (
+            fyield.products is term.products or fyield.products == term.products
+        ):
+            return fyield.yields[term.select]
+
+        expected = {term.products[ix]: jx for jx, ix in enumerate(term.select)}
+        yields = numpy.zeros(term.select.size)
+        for product, value in fyield.items():
+            jx = expected.get(product)
+            if jx is not None:
+                yields[jx] = value
+            elif product in self.ordering:
+                raise ValueError(
+                    f"Fission product {product} of {term.parent} not found in "
+                    "the depletion chain"
+                )
+        return yields
+
+    def toCsr(self, data: numpy.ndarray) -> scipy.sparse.csr_matrix:
+        """Create a sparse matrix with this structure
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            Values of the non-zero entries, e.g. from :meth:`fill`
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            Sparse matrix that shares :attr:`indices` and
+            :attr:`indptr` with this pattern
+
+        """
+        mtx = scipy.sparse.csr_matrix(
+            (data, self.indices, self.indptr), shape=self.shape, copy=False
+        )
+        mtx.has_sorted_indices = True
+        return mtx
@@ -38,6 +38,10 @@ class TransportResult:
         If given, pass to :attr:`fmtx`
     microXS : Optional[Sequence]
         If given, pass to :attr:microXS`
+    fissionYields : Optional[Sequence]
+        If given, pass to :attr:`fissionYields`
+    timings : Optional[Mapping[str, float]]
+        If given, pass to :attr:`timings`
 
     Attributes
     ----------
@@ -62,6 +66,10 @@ class TransportResult:
         ``i``
     microXS : hydep.internal.MaterialDataArray or None
         Microscopic cross sections in each burnable region.
+    timings : Mapping[str, float] or None
+        Walltime [s] spent in individual phases of the solution,
+        e.g. ``{"macroxs": 0.1, "prediction": 0.5}``. Provides a
+        breakdown of :attr:`runTime`
 
     """
 
@@ -73,6 +81,7 @@ class TransportResult:
         "_fmtx",
         "_microXS",
         "_fissionYields",
+        "_timings",
     )
 
     def __init__(
@@ -84,6 +93,7 @@ class TransportResult:
         fmtx=None,
         microXS=None,
         fissionYields=None,
+        timings=None,
     ):
         self.flux = flux
         self.keff = keff
@@ -92,6 +102,7 @@ class TransportResult:
         self.fmtx = fmtx
         self.microXS = microXS
         self.fissionYields = fissionYields
+        self.timings = timings
 
     @property
     def flux(self):
@@ -132,6 +143,26 @@ class TransportResult:
             raise TypeError("Runtime must be real, not {}".format(type(t)))
         self._runTime = t
 
+    @property
+    def timings(self):
+        return self._timings
+
+    @timings.setter
+    def timings(self, value):
+        if value is None:
+            self._timings = None
+            return
+        if not isinstance(value, Mapping):
+            raise TypeError(
+                f"Timings must be mapping of str: float, not {type(value)}"
+            )
+        timings = {}
+        for key, t in value.items():
+            if not isinstance(t, numbers.Real):
+                raise TypeError(f"Timing for {key} must be real, not {type(t)}")
+            timings[str(key)] = t
+        self._timings = timings
+
     @property
     def macroXS(self):
         return self._macroXS
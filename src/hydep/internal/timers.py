@@ -0,0 +1,168 @@
+"""
+Named wall-clock timers for instrumenting the main sequence
+
+Timers are accumulated by name between calls to
+:meth:`Timers.pop`, such that the time spent in each phase of the
+solution can be attributed to individual time steps. Optionally,
+every timed interval is recorded so the full sequence can be
+inspected as a Chrome trace, e.g. with ``chrome://tracing`` or
+`Perfetto <https://ui.perfetto.dev>`_.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+
+__all__ = ("Timers", )
+
+
+class Timers:
+    """Accumulate walltime spent in named sections
+
+    Parameters
+    ----------
+    recordEvents : bool, optional
+        Record the start and duration of every timed section for
+        :meth:`writeChromeTrace`. Default is False
+
+    Attributes
+    ----------
+    recordEvents : bool
+        Flag indicating every timed section will be recorded
+    current : dict of str to float
+        Read-only copy of the walltime [s] spent in each section since
+        the last call to :meth:`pop`
+    totals : dict of str to float
+        Read-only copy of the walltime [s] spent in each section since
+        construction or :meth:`reset`
+
+    Examples
+    --------
+    >>> timers = Timers()
+    >>> with timers.time("transport"):
+    ...     pass
+    >>> timers.add("transport", 1.0)
+    >>> timers.pop()["transport"] >= 1.0
+    True
+    >>> timers.current
+    {}
+
+    """
+
+    def __init__(self, recordEvents=False):
+        self.recordEvents = bool(recordEvents)
+        self.reset()
+
+    def reset(self):
+        """Remove all timing data and recorded events"""
+        self._origin = time.perf_counter()
+        self._current = defaultdict(float)
+        self._totals = defaultdict(float)
+        self._events = []
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        return dict(self._current)
+
+    @property
+    def totals(self):
+        return dict(self._totals)
+
+    @contextmanager
+    def time(self, name):
+        """Context manager that adds the time spent inside to ``name``
+
+        Sections can be nested, in which case the time spent in the
+        inner section also counts towards the outer section.
+
+        Parameters
+        ----------
+        name : str
+            Name of the section
+
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add(name, elapsed, start=start)
+
+    def add(self, name, seconds, start=None):
+        """Add time to a section that was timed externally
+
+        Parameters
+        ----------
+        name : str
+            Name of the section
+        seconds : float
+            Walltime [s] to be added
+        start : float, optional
+            Value of :func:`time.perf_counter` when the section started.
+            If not given, the section is assumed to have just ended.
+            Only used when recording events
+
+        """
+        with self._lock:
+            self._current[name] += seconds
+            self._totals[name] += seconds
+            if self.recordEvents:
+                if start is None:
+                    start = time.perf_counter() - seconds
+                self._events.append(
+                    (name, start - self._origin, seconds, threading.get_ident())
+                )
+
+    def pop(self):
+        """Return the time spent in each section and restart the count
+
+        Returns
+        -------
+        dict of str to float
+            Walltime [s] spent in each section since the previous
+            call
+
+        """
+        with self._lock:
+            current = dict(self._current)
+            self._current.clear()
+        return current
+
+    def writeChromeTrace(self, path):
+        """Write recorded sections in the Chrome trace event format
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Destination of the JSON file
+
+        Raises
+        ------
+        AttributeError
+            If events were not recorded
+
+        """
+        if not self.recordEvents:
+            raise AttributeError(
+                f"{self.__class__.__name__} was not configured to record events"
+            )
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": name,
+                    "cat": "hydep",
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, start, duration, tid in self._events
+            ]
+        with open(path, "w") as stream:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, stream)
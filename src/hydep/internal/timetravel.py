@@ -2,18 +2,24 @@
 Classes for extrapolating / interpolating quantities through time
 """
 
-import math
-from collections import deque
+from collections import deque, OrderedDict
 import typing
 
 
 import numpy
-from numpy.polynomial import polynomial
 
 
 class TimeTraveler:
     """Store and project time-dependent array data
 
+    Projections are linear combinations of the stored arrays. The
+    weights of the polynomial fit are computed for each requested
+    time from the few stored time points, rather than fitting
+    coefficients for every element in the stored arrays. The most
+    recent projections are retained until the next call to
+    :meth:`push`, so repeated requests at the same point in time
+    are not recomputed.
+
     Parameters
     ----------
     nsteps : int
@@ -24,16 +30,23 @@ class TimeTraveler:
         Polynomial order for projection. Will use up to this order,
         depending on the number of points provided through
         :meth:`push`
+    dtype : numpy.dtype, optional
+        Floating point type of the stored data. Projections are
+        always computed and returned in double precision. Default
+        is :class:`numpy.float64`
 
     """
 
-    def __init__(self, nsteps, shape, order):
-        self._data = numpy.empty(
-            (nsteps,) + tuple(shape), dtype=numpy.float64,
-        )
+    # Number of projected arrays to retain between pushes
+    _MEMO_SIZE = 2
+
+    def __init__(self, nsteps, shape, order, dtype=numpy.float64):
+        # Zero fill so unused slots do not contribute to weighted sums
+        self._data = numpy.zeros((nsteps,) + tuple(shape), dtype=dtype)
         self._times = numpy.empty(nsteps)
         self._timeIndex = deque(maxlen=nsteps)
-        self._coeffs = None
+        self._stored = numpy.empty(0, dtype=int)
+        self._memo = OrderedDict()
         self._order = order
 
     @property
@@ -44,6 +57,15 @@ class TimeTraveler:
     def stacklen(self) -> int:
         return len(self._timeIndex)
 
+    @property
+    def dtype(self) -> numpy.dtype:
+        return self._data.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by stored data and retained projections"""
+        return self._data.nbytes + sum(v.nbytes for v in self._memo.values())
+
     def push(self, t, data):
         """Push another set of data to be extrapolated
 
@@ -72,7 +94,8 @@ class TimeTraveler:
         self._data[index] = data
         self._timeIndex.append(index)
         self._times[index] = t
-        self._coeffs = None
+        self._stored = numpy.array(self._timeIndex, dtype=int)
+        self._memo.clear()
 
     def at(
         self, t: float, atol: typing.Optional[float] = 1e-12,
@@ -100,7 +123,9 @@ class TimeTraveler:
         Returns
         -------
         numpy.ndarray
-            Cross sections at the requested point in time
+            Cross sections at the requested point in time. Projected
+            values are shared with subsequent requests at ``t``
+            and are not writeable
 
         Raises
         ------
@@ -113,21 +138,68 @@ class TimeTraveler:
         if not self._timeIndex:
             raise AttributeError("No data points loaded")
 
-        # Sequential search because we should only be storing
-        # a few time points, and time vector is not sorted
-        for ix in self._timeIndex:
-            if math.fabs(self._times[ix] - t) <= atol:
-                vals = self._data[ix]
-                break
+        delta = numpy.fabs(self._times[self._stored] - t)
+        closest = delta.argmin()
+        exact = delta[closest] <= atol
+        if exact and self._data.dtype == numpy.float64:
+            return self._data[self._stored[closest]]
+
+        vals = self._memo.get(t)
+        if vals is not None:
+            self._memo.move_to_end(t)
+            return vals
+
+        weights = numpy.zeros(self._data.shape[0])
+        if exact:
+            weights[self._stored[closest]] = 1
         else:
-            if self._coeffs is None:
-                self._coeffs = polynomial.polyfit(
-                    self._times[self._timeIndex],
-                    self._data[self._timeIndex].reshape(
-                        self.stacklen, numpy.prod(self.shape[1:])
-                    ),
-                    deg=min(self.stacklen - 1, self._order),
-                )
+            weights[self._stored] = self._fitWeights(t)
+        vals = self._project(weights)
+        vals.flags.writeable = False
+
+        self._memo[t] = vals
+        if len(self._memo) > self._MEMO_SIZE:
+            self._memo.popitem(last=False)
+        return vals
 
-            vals = polynomial.polyval(t, self._coeffs).reshape(self.shape[1:])
+    def _project(self, weights):
+        """Weighted sum of stored slabs in double precision"""
+        if self._data.dtype == numpy.float64:
+            return weights.dot(
+                self._data.reshape(self._data.shape[0], -1)
+            ).reshape(self._data.shape[1:])
+        # Upcast one slab at a time rather than the entire stack
+        vals = numpy.zeros(self._data.shape[1:])
+        scratch = numpy.empty_like(vals)
+        for slot in numpy.flatnonzero(weights):
+            scratch[...] = self._data[slot]
+            scratch *= weights[slot]
+            vals += scratch
         return vals
+
+    def _fitWeights(self, t):
+        """Weights of each stored point in the projection to ``t``
+
+        Lagrange weights are used if the polynomial passes through
+        every stored point. Otherwise the weights come from the
+        least squares fit, which is linear in the stored data.
+        Times are shifted and scaled for conditioning.
+        """
+        times = self._times[self._stored]
+        origin = times[-1]
+        scale = numpy.fabs(times - origin).max() or 1.0
+        x = (times - origin) / scale
+        target = (t - origin) / scale
+        degree = min(self.stacklen - 1, self._order)
+
+        if degree == x.size - 1:
+            weights = numpy.ones(x.size)
+            for j, xj in enumerate(x):
+                for k, xk in enumerate(x):
+                    if k != j:
+                        weights[j] *= (target - xk) / (xj - xk)
+            return weights
+
+        powers = numpy.arange(degree + 1)
+        vandermonde = x[:, numpy.newaxis] ** powers
+        return numpy.linalg.pinv(vandermonde).T.dot(target ** powers)
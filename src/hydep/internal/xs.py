@@ -8,6 +8,7 @@ import bisect
 import numbers
 
 import numpy
+from scipy.linalg.blas import daxpy
 
 from hydep.internal.timetravel import TimeTraveler
 
@@ -39,6 +40,12 @@ class XsIndex:
         Reaction MT numbers
     zptr : tuple of int
         Pointer vector
+    zaiArray : numpy.ndarray
+        Read-only integer array of :attr:`zais`
+    rxnArray : numpy.ndarray
+        Read-only integer array of :attr:`rxns`
+    zptrArray : numpy.ndarray
+        Read-only integer array of :attr:`zptr`
 
     Examples
     --------
@@ -62,6 +69,11 @@ class XsIndex:
     ...     print(rxn, index)
     18 1
     102 2
+    >>> xs.indices([922380, 80160], [18, 102])
+    array([4, 0])
+    >>> starts, stops = xs.getSlices([922380, 10010, 922350])
+    >>> starts, stops
+    (array([3, 0, 1]), array([5, 0, 3]))
 
     """
 
@@ -85,6 +97,25 @@ class XsIndex:
         self._zptr = tuple(zptr)
         self._rxns = tuple(rxns)
 
+        self._zaiArray = self._frozenArray(self._zais)
+        self._zptrArray = self._frozenArray(self._zptr)
+        self._rxnArray = self._frozenArray(self._rxns)
+        self._zaiLookup = {z: ix for ix, z in enumerate(self._zais)}
+        # Sorted (zai, rxn) keys for bulk searches
+        self._rxnSpan = int(self._rxnArray.max()) + 1 if self._rxns else 1
+        keys = (
+            numpy.repeat(self._zaiArray, numpy.diff(self._zptrArray)) * self._rxnSpan
+            + self._rxnArray
+        )
+        self._keyOrder = numpy.argsort(keys, kind="stable")
+        self._sortedKeys = keys[self._keyOrder]
+
+    @staticmethod
+    def _frozenArray(values):
+        array = numpy.array(values, dtype=numpy.int64)
+        array.flags.writeable = False
+        return array
+
     def __len__(self) -> int:
         """Number of stored reactions"""
         return len(self._rxns)
@@ -128,9 +159,7 @@ class XsIndex:
         if ix < 0:
             ix = len(self._rxns) + ix
         rxn = self._rxns[ix]
-        place = bisect.bisect_left(self._zptr, ix)
-        if self._zptr[place] == ix:
-            return self._zais[place], rxn
+        place = bisect.bisect_right(self._zptr, ix)
         return self._zais[place - 1], rxn
 
     def __call__(self, zai: int, rxn: int) -> int:
@@ -160,6 +189,12 @@ class XsIndex:
                 return ix
         raise ValueError(f"Reaction {rxn} of isotope {zai} not found")
 
+    def __getstate__(self):
+        return self._zais, self._rxns, self._zptr
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
     @property
     def zais(self):
         return self._zais
@@ -172,6 +207,18 @@ class XsIndex:
     def zptr(self):
         return self._zptr
 
+    @property
+    def zaiArray(self):
+        return self._zaiArray
+
+    @property
+    def rxnArray(self):
+        return self._rxnArray
+
+    @property
+    def zptrArray(self):
+        return self._zptrArray
+
     def findZai(self, zai: int) -> int:
         """Return the index in :attr:`zais` for a given ZAI
 
@@ -192,11 +239,129 @@ class XsIndex:
             If ``zai`` is not found
 
         """
-        zix = bisect.bisect_left(self._zais, zai)
-        if zix == len(self._zais) or self._zais[zix] != zai:
+        zix = self._zaiLookup.get(zai)
+        if zix is None:
             raise ValueError(f"{zai} not found")
         return zix
 
+    def findZais(
+        self, zais: typing.Iterable[int], default: typing.Optional[int] = None
+    ) -> numpy.ndarray:
+        """Return the index in :attr:`zais` for several isotopes
+
+        Parameters
+        ----------
+        zais : iterable of int
+            Isotope ZAIs of interest
+        default : int, optional
+            Value to use for isotopes that are not found. If not
+            provided, missing isotopes raise an error
+
+        Returns
+        -------
+        numpy.ndarray
+            Integer array such that ``x.zaiArray[x.findZais(z)]``
+            is equal to ``z`` for all found isotopes
+
+        Raises
+        ------
+        ValueError
+            If an isotope is not found and ``default`` was not given
+
+        """
+        zais = numpy.asarray(zais, dtype=numpy.int64)
+        places = numpy.searchsorted(self._zaiArray, zais)
+        found = places < self._zaiArray.size
+        found[found] = self._zaiArray[places[found]] == zais[found]
+        return self._applyDefault(places, found, default, "Isotopes", zais)
+
+    def indices(
+        self,
+        zais: typing.Iterable[int],
+        rxns: typing.Iterable[int],
+        default: typing.Optional[int] = None,
+    ) -> numpy.ndarray:
+        """Return the index for several isotope and reaction pairs
+
+        Vectorized form of :meth:`__call__`
+
+        Parameters
+        ----------
+        zais : iterable of int
+            Isotope ZAIs
+        rxns : iterable of int
+            Reaction MT for each isotope in ``zais``
+        default : int, optional
+            Value to use for pairs that are not found, e.g. ``-1``.
+            If not provided, missing pairs raise an error
+
+        Returns
+        -------
+        numpy.ndarray
+            Integer array such that ``x[ix[i]] == (zais[i], rxns[i])``
+            for all found pairs
+
+        Raises
+        ------
+        ValueError
+            If a pair is not found and ``default`` was not given
+
+        """
+        zais, rxns = numpy.broadcast_arrays(
+            numpy.asarray(zais, dtype=numpy.int64),
+            numpy.asarray(rxns, dtype=numpy.int64),
+        )
+        keys = zais * self._rxnSpan + rxns
+        places = numpy.searchsorted(self._sortedKeys, keys)
+        found = (places < self._sortedKeys.size) & (rxns >= 0) & (rxns < self._rxnSpan)
+        found[found] = self._sortedKeys[places[found]] == keys[found]
+        places[found] = self._keyOrder[places[found]]
+        return self._applyDefault(places, found, default, "Reactions", zais, rxns)
+
+    def getSlices(
+        self, zais: typing.Iterable[int]
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the positions of reactions for several isotopes
+
+        Parameters
+        ----------
+        zais : iterable of int
+            Isotope ZAIs in some ordering, e.g. of a
+            :class:`hydep.internal.CompBundle`
+
+        Returns
+        -------
+        numpy.ndarray
+            Start of the reactions for each isotope
+        numpy.ndarray
+            End of the reactions for each isotope, such that
+            ``x.rxnArray[starts[i]:stops[i]]`` are the reactions of
+            ``zais[i]``. Isotopes that are not found have empty slices
+
+        """
+        places = self.findZais(zais, default=-1)
+        found = places >= 0
+        starts = numpy.zeros(places.shape, dtype=numpy.int64)
+        stops = numpy.zeros(places.shape, dtype=numpy.int64)
+        starts[found] = self._zptrArray[places[found]]
+        stops[found] = self._zptrArray[places[found] + 1]
+        return starts, stops
+
+    @staticmethod
+    def _applyDefault(places, found, default, label, *queries):
+        if found.all():
+            return places
+        if default is None:
+            # Only build the offending queries when reporting the error
+            missing = numpy.flatnonzero(~found.ravel())[:5].tolist()
+            if len(queries) == 1:
+                items = [int(queries[0].flat[ix]) for ix in missing]
+            else:
+                items = [tuple(int(q.flat[ix]) for q in queries) for ix in missing]
+            raise ValueError(f"{label} not found: {items}")
+        places[~found] = default
+        return places
+
     def getReactions(
         self, zai: int
     ) -> typing.Generator[typing.Tuple[int, int], None, None]:
@@ -220,7 +385,7 @@ class XsIndex:
 
         """
         zix = self.findZai(zai)
-        start, end = self._zptr[zix : zix + 2]
+        start, end = self._zptr[zix:zix + 2]
         return (
             (rxn, start + ix) for ix, rxn in enumerate(self.rxns[start:end])
         )
@@ -278,10 +443,11 @@ class MaterialData(_IndexedData):
 
         """
         try:
-            reactionIndices = self.index.getReactions(zai)
+            zix = self.index.findZai(zai)
         except ValueError:
             return default
-        return {rxn: self.data[ix] for rxn, ix in reactionIndices}
+        start, end = self.index.zptr[zix:zix + 2]
+        return dict(zip(self.index.rxns[start:end], self.data[start:end].tolist()))
 
 
 class MaterialDataArray(_IndexedData):
@@ -370,9 +536,62 @@ class MaterialDataArray(_IndexedData):
             return self
         return NotImplemented
 
+    def getRow(self, pos: int) -> numpy.ndarray:
+        """Obtain a view into the data for a single material
+
+        Unlike :meth:`__getitem__`, no :class:`MaterialData` is created
+
+        Parameters
+        ----------
+        pos : int
+            Material index
+
+        Returns
+        -------
+        numpy.ndarray
+            1D view into :attr:`data`, ordered according to
+            :attr:`index`
+
+        """
+        return self.data[pos]
+
+    def getReactions(
+        self, zai: int, default: typing.Optional[typing.Any] = None
+    ):
+        """Obtain data for all reactions of an isotope in all materials
+
+        Parameters
+        ----------
+        zai : int
+            Isotope ZAI of interest
+        default : object, optional
+            Object to return if ``zai`` is not found
+
+        Returns
+        -------
+        object
+            If ``zai`` is found, will be a dictionary mapping
+            ``{int: numpy.ndarray}`` where each ``int`` is a reaction
+            MT mapped to a view into :attr:`data` with the cross
+            sections or reaction rates in each material
+
+        """
+        try:
+            zix = self.index.findZai(zai)
+        except ValueError:
+            return default
+        start, end = self.index.zptr[zix:zix + 2]
+        return {
+            rxn: self.data[:, ix] for ix, rxn in enumerate(
+                self.index.rxns[start:end], start=start
+            )
+        }
+
     @classmethod
     def fromLinearCombination(
-        cls, *pairs: typing.Iterator[typing.Tuple[float, "MaterialDataArray"]]
+        cls,
+        *pairs: typing.Iterator[typing.Tuple[float, "MaterialDataArray"]],
+        out: typing.Optional["MaterialDataArray"] = None,
     ):
         r"""Use a weighted linear combination to compute a new material array
 
@@ -380,7 +599,8 @@ class MaterialDataArray(_IndexedData):
         :meth:`__mul__` and :meth:`__add__` that avoids creating
         intermediate classes and works solely on the stored arrays.
         Each :class:`MaterialDataArray` must have a consistent
-        :attr:`index`.
+        :attr:`index`. The result is accumulated in place, without
+        forming a temporary array for each term.
 
         The new data array will be computed as :math:`M=\sum_i w_i M_i`,
         where each :math:`w_i` is a scalar weight for each material
@@ -390,21 +610,54 @@ class MaterialDataArray(_IndexedData):
         ----------
         pairs : iterable of (float, MaterialDataArray)
             Pairs of ``w_i, mdata_i`` to be used in the update
+        out : MaterialDataArray, optional
+            Array to be overwritten with the combination. May be the
+            first array in ``pairs``, but no other arrays
 
         Returns
         -------
         MaterialDataArray
+            ``out`` if provided, otherwise a new array
 
         """
-        consume = iter(pairs)
-        alpha, mat = next(consume)
-        data = alpha * mat.data
+        pairs = list(pairs)
+        alpha, mat = pairs[0]
         index = mat.index
-        for alpha, mat in consume:
-            if mat.index != index:
+        for _alpha, other in pairs[1:]:
+            if other.index != index:
+                raise ValueError("Reaction indices do not conform")
+
+        if out is None:
+            out = cls(index, numpy.multiply(mat.data, alpha))
+        else:
+            if out.index != index:
                 raise ValueError("Reaction indices do not conform")
-            data += alpha * mat.data
-        return cls(index, data)
+            if out.data.shape != mat.data.shape:
+                raise ValueError(
+                    f"Output has shape {out.data.shape}, expected {mat.data.shape}"
+                )
+            if any(numpy.shares_memory(out.data, m.data) for _a, m in pairs[1:]):
+                raise ValueError(
+                    "Output may only share memory with the first array"
+                )
+            numpy.multiply(mat.data, alpha, out=out.data)
+
+        for alpha, mat in pairs[1:]:
+            _accumulate(alpha, mat.data, out.data)
+        return out
+
+
+def _accumulate(alpha, x, y):
+    """Compute ``y += alpha * x`` in place without temporary arrays"""
+    if (
+        x.dtype == y.dtype == numpy.float64
+        and x.flags.c_contiguous
+        and y.flags.c_contiguous
+        and x.shape == y.shape
+    ):
+        daxpy(x.ravel(), y.ravel(), a=alpha)
+    else:
+        y += alpha * x
 
 
 class DataBank(TimeTraveler):
@@ -420,6 +673,16 @@ class DataBank(TimeTraveler):
         Indexer that describes the ordering of cross section data
     order : int, optional
         Maximum polynomial fitting order. Default is one (linear)
+    dtype : numpy.dtype, optional
+        Floating point type used to store the cross section history.
+        Passing :class:`numpy.float32` halves the storage, while
+        projections are still computed in double precision. Default
+        is :class:`numpy.float64`
+    sparse : bool, optional
+        Store only reactions that have been non-zero in some
+        material. Reactions that are not tallied, e.g. by Serpent,
+        are zero in all materials and do not take up space.
+        Default is False
 
     """
 
@@ -429,9 +692,47 @@ class DataBank(TimeTraveler):
         nmaterials: int,
         rxnIndex: XsIndex,
         order: typing.Optional[int] = 1,
+        dtype: typing.Optional[numpy.dtype] = numpy.float64,
+        sparse: typing.Optional[bool] = False,
     ):
-        super().__init__(nsteps, (nmaterials, len(rxnIndex)), order)
+        # Start with no columns if sparse, and add them as needed in push
+        super().__init__(
+            nsteps, (nmaterials, 0 if sparse else len(rxnIndex)), order, dtype
+        )
         self._reactionIndex = rxnIndex
+        self._columns = numpy.empty(0, dtype=int) if sparse else None
+
+    @property
+    def shape(self) -> typing.Tuple[int, int, int]:
+        return self._data.shape[:2] + (len(self._reactionIndex), )
+
+    @property
+    def sparse(self) -> bool:
+        """True if only non-zero reactions are stored"""
+        return self._columns is not None
+
+    @property
+    def storedColumns(self) -> typing.Optional[numpy.ndarray]:
+        """Positions in :attr:`reactionIndex` that are stored if sparse"""
+        return self._columns
+
+    def memoryUsage(self) -> typing.Dict[str, int]:
+        """Report the memory used to store the cross section history
+
+        Returns
+        -------
+        dict of str to int
+            Number of bytes for ``"stored"`` history data, ``"cached"``
+            projections, and the ``"dense"`` history that would be
+            required for full double precision storage
+
+        """
+        stored = self._data.nbytes
+        return {
+            "stored": stored,
+            "cached": self.nbytes - stored,
+            "dense": numpy.dtype(numpy.float64).itemsize * int(numpy.prod(self.shape)),
+        }
 
     @property
     def reactionIndex(self) -> XsIndex:
@@ -450,8 +751,8 @@ class DataBank(TimeTraveler):
 
     @property
     def nreactions(self) -> int:
-        """Number of reactions stored"""
-        return self._data.shape[2]
+        """Number of reactions in :attr:`reactionIndex`"""
+        return len(self._reactionIndex)
 
     def push(self, t: float, materialData: MaterialDataArray):
         """Push another set of data to be extrapolated
@@ -472,7 +773,23 @@ class DataBank(TimeTraveler):
         """
         if materialData.index != self._reactionIndex:
             raise ValueError("Reaction indices do not conform")
-        super().push(t, materialData.data)
+        if self._columns is None:
+            super().push(t, materialData.data)
+            return
+        nonzero = numpy.flatnonzero(materialData.data.any(axis=0))
+        if not numpy.isin(nonzero, self._columns, assume_unique=True).all():
+            self._addColumns(numpy.union1d(self._columns, nonzero))
+        super().push(t, materialData.data[:, self._columns])
+
+    def _addColumns(self, columns):
+        """Expand sparse storage, previous data are zero in new columns"""
+        data = numpy.zeros(
+            self._data.shape[:2] + (columns.size, ), dtype=self._data.dtype
+        )
+        data[..., numpy.searchsorted(columns, self._columns)] = self._data
+        self._data = data
+        self._columns = columns
+        self._memo.clear()
 
     def at(
         self, t: float, atol: typing.Optional[float] = 1e-12
@@ -510,6 +827,12 @@ class DataBank(TimeTraveler):
 
         """
         data = super().at(t, atol=atol)
+        if self._columns is not None:
+            full = numpy.zeros((self.nmaterials, self.nreactions))
+            full[:, self._columns] = data
+            data = full
+        elif data.dtype != numpy.float64:
+            data = data.astype(numpy.float64)
         return MaterialDataArray(self._reactionIndex, data)
 
     def getReactionRatesAt(
@@ -517,9 +840,14 @@ class DataBank(TimeTraveler):
         t: float,
         fluxes: numpy.ndarray,
         atol: typing.Optional[float] = 1e-12,
+        out: typing.Optional[MaterialDataArray] = None,
     ) -> MaterialDataArray:
         """Project cross sections and then compute reaction rates
 
+        Cross sections are projected once for each point in time,
+        and scaled by the flux in each material without forming
+        intermediate arrays.
+
         Parameters
         ----------
         t : float
@@ -527,17 +855,22 @@ class DataBank(TimeTraveler):
             requested. Units should be consistent with units
             from :attr:`push`
         fluxes : iterable of float
-            1-D vector of one-group scalar flux [n/cm2/s] in each
-            burnable material
+            One-group scalar flux [n/cm2/s] in each burnable material.
+            Either a vector or a single column for each material
         atol : float, optional
             Absolute tolerance used when determining if ``t``
             corresponds to a previously computed point
+        out : MaterialDataArray, optional
+            Reaction rates to be overwritten, e.g. from a previous
+            call. Must have a consistent index with
+            :attr:`reactionIndex` and data of shape
+            ``(nmaterials, nreactions)``
 
         Returns
         -------
         MaterialDataArray
             Reaction rates in each material with an index to determine
-            how the reactions are ordered
+            how the reactions are ordered. Will be ``out`` if provided
 
         """
         if not isinstance(fluxes, Iterable):
@@ -549,16 +882,31 @@ class DataBank(TimeTraveler):
                 f"Was given {len(fluxes)} fluxes for {self.nmaterials} "
                 "burnable materials"
             )
-        try:
-            upcast = numpy.broadcast_to(
-                fluxes, (self.nmaterials, len(self._reactionIndex)),
-            )
-        except ValueError as ve:
+        fluxes = numpy.asarray(fluxes, dtype=numpy.float64)
+        if fluxes.ndim == 1:
+            fluxes = fluxes[:, numpy.newaxis]
+        target = (self.nmaterials, len(self._reactionIndex))
+        # One flux per material, or one per material and reaction
+        if fluxes.shape not in {(self.nmaterials, 1), target}:
             raise ValueError(
-                f"Failed to coerce fluxes of shape {numpy.shape(fluxes)} to shape "
+                f"Failed to coerce fluxes of shape {fluxes.shape} to shape "
                 f"({self.nmaterials}, {len(self._reactionIndex)})"
-            ) from ve
+            )
+
+        if out is None:
+            out = MaterialDataArray(self._reactionIndex, numpy.empty(target))
+        elif out.index != self._reactionIndex:
+            raise ValueError("Reaction indices do not conform")
+        elif out.data.shape != target:
+            raise ValueError(
+                f"Output reaction rates have shape {out.data.shape}, "
+                f"expected {target}"
+            )
 
-        mxs = self.at(t, atol=atol)
-        mxs.data = mxs.data * upcast
-        return mxs
+        xs = super().at(t, atol=atol)
+        if self._columns is None:
+            numpy.multiply(xs, fluxes, out=out.data)
+        else:
+            out.data.fill(0.0)
+            out.data[:, self._columns] = xs * fluxes
+        return out
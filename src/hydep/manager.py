@@ -4,10 +4,12 @@ Depletion manager
 Control time-steps, material divisions, depletion, etc
 """
 
+import os
+import time
 import warnings
 import numbers
 from collections.abc import Sequence, Callable
-from itertools import repeat, starmap
+from itertools import repeat
 import multiprocessing
 
 import numpy
@@ -16,14 +18,51 @@ from .chain import DepletionChain
 from .materials import BurnableMaterial
 from .exceptions import NegativeDensityWarning, NegativeDensityError
 from hydep.constants import SECONDS_PER_DAY
-from hydep.typed import TypedAttr, IterableOf
-from hydep.internal import Cram16Solver, Cram48Solver, CompBundle
+from hydep.typed import TypedAttr, IterableOf, BoundedTyped
+from hydep.internal import (
+    Cram16Solver,
+    Cram48Solver,
+    BatchedCramSolver,
+    BatchedCram16Solver,
+    BatchedCram48Solver,
+    CompBundle,
+    MaterialData,
+    MaterialDataArray,
+)
+from hydep.internal.timers import Timers
 from hydep.internal.features import FeatureCollection, MICRO_REACTION_XS, FISSION_YIELDS
 from hydep.internal.utils import FakeSequence
 
 
 __all__ = ["Manager"]
 
+# Depletion chain held by each worker process. Set by _initWorker
+_WORKER_CHAIN = None
+
+
+def _initWorker(chain):
+    global _WORKER_CHAIN
+    _WORKER_CHAIN = chain
+
+
+def _formAndDeplete(solver, rates, fissionYields, densities, dt, ordering):
+    """Build and solve a single depletion system in a worker process"""
+    chain = _WORKER_CHAIN
+    matrix = chain.formMatrix(
+        MaterialData(chain.reactionIndex, rates), fissionYields, ordering
+    )
+    return solver(matrix, densities, dt)
+
+
+def _formAndDepleteMany(solver, rates, fissionYields, densities, dt, ordering):
+    """Build and solve several depletion systems with a batched solver"""
+    chain = _WORKER_CHAIN
+    pattern = chain.getMatrixPattern(ordering)
+    data = chain.formMatrices(
+        MaterialDataArray(chain.reactionIndex, rates), fissionYields, ordering
+    )
+    return solver([pattern.toCsr(d) for d in data], densities, dt)
+
 
 class Manager:
     """Primary depletion manager
@@ -60,6 +99,23 @@ class Manager:
     negativeDensityErrorPercent : float, optional
         Threshold for raising an error on negative densities. Treated
         as a percentage of positive densities, range [0, 1]. Defaults to 1.
+    numProcesses : int, optional
+        Number of worker processes used to deplete materials. Defaults
+        to the number of available CPUs
+    startMethod : str, optional
+        Start method for the worker processes, e.g. ``"fork"`` or
+        ``"spawn"``. Defaults to the :mod:`multiprocessing` default
+    buildMatricesInWorkers : bool, optional
+        Form depletion matrices in the worker processes rather than
+        in the calling process. Default is False
+    reductionThreshold : float, optional
+        Density [#/b/cm] above which an isotope is considered present
+        when reducing the chain. Default of ``None`` always depletes
+        the full chain
+    adaptiveReduction : bool, optional
+        Recompute the reduced set of isotopes for every depletion
+        event, rather than once for the initial compositions.
+        Default is False
 
     Attributes
     ----------
@@ -92,11 +148,54 @@ class Manager:
         Percentage threshold for raising and error on negative
         densities, range [0, 1]. Must be greater than
         :attr:`negativeDensityWarnPercent`
+    numProcesses : int or None
+        Number of worker processes used to deplete materials. A value
+        of ``None`` uses all available CPUs. The pool of workers is
+        started in :meth:`beforeMain` and persists until
+        :meth:`finalize`. Depletion is performed in the calling
+        process if only one worker would be used.
+    startMethod : str or None
+        Start method for the worker processes. A value of ``None``
+        uses the :mod:`multiprocessing` default
+    buildMatricesInWorkers : bool
+        If True, each worker holds a copy of :attr:`chain` and forms
+        depletion matrices from the reaction rates, fission yields,
+        and compositions of a single material. Otherwise, matrices are
+        formed in the calling process and passed to the workers
+    reductionThreshold : float or None
+        If given, only isotopes with a density above this value in
+        any burnable material, and isotopes reachable from them
+        through :meth:`hydep.DepletionChain.findReachable`, are
+        depleted. Other isotopes are left unchanged, and the full
+        isotope ordering is kept in the compositions returned by
+        :meth:`deplete`
+    adaptiveReduction : bool
+        If True, the reduced set of isotopes is recomputed from
+        the incoming compositions in every call to :meth:`deplete`.
+        Otherwise the set found in the first call is reused until
+        :meth:`beforeMain` is called again
+    reducedIsotopes : tuple of int or None
+        ZAI identifiers of the isotopes depleted in the most recent
+        reduced depletion. Not writable
+    timers : hydep.internal.timers.Timers
+        Timers that accumulate the time spent building depletion
+        matrices (``"matrices"``) and solving them (``"cram"``).
+        Replaced by the timers of the :class:`hydep.Integrator`
+        during a simulation
 
     """
 
     chain = TypedAttr("chain", DepletionChain)
     _burnable = IterableOf("burnable", BurnableMaterial, allowNone=True)
+    numProcesses = BoundedTyped(
+        "_numProcesses", numbers.Integral, gt=0, allowNone=True
+    )
+    buildMatricesInWorkers = TypedAttr("buildMatricesInWorkers", bool)
+    reductionThreshold = BoundedTyped(
+        "reductionThreshold", numbers.Real, ge=0, allowNone=True
+    )
+    adaptiveReduction = TypedAttr("adaptiveReduction", bool)
+    timers = TypedAttr("timers", Timers)
 
     def __init__(
         self,
@@ -108,6 +207,11 @@ class Manager:
         depletionSolver=None,
         negativeDensityWarnPercent=1E-4,
         negativeDensityErrorPercent=1,
+        numProcesses=None,
+        startMethod=None,
+        buildMatricesInWorkers=False,
+        reductionThreshold=None,
+        adaptiveReduction=False,
     ):
         self.chain = chain
 
@@ -143,6 +247,16 @@ class Manager:
         self.negativeDensityWarnPercent = negativeDensityWarnPercent
         self.negativeDensityErrorPercent = negativeDensityErrorPercent
 
+        self.numProcesses = numProcesses
+        self.startMethod = startMethod
+        self.buildMatricesInWorkers = buildMatricesInWorkers
+        self._pool = None
+        self.reductionThreshold = reductionThreshold
+        self.adaptiveReduction = adaptiveReduction
+        self._reducedIndex = None
+        self._reducedIsotopes = None
+        self.timers = Timers()
+
     def _validatePowers(self, power):
         if isinstance(power, numbers.Real):
             if power <= 0:
@@ -207,7 +321,8 @@ class Manager:
         """Configure the depletion solver
 
         Solver can either be a string, e.g. ``"cram16"``,
-        integer, ``16``, or a callable function. Callable functions
+        integer, ``16``, a :class:`hydep.internal.BatchedCramSolver`,
+        or a callable function. Callable functions
         should fulfill the following requirements:
 
         1. Be importable / pickle-able in order to be dispatched via
@@ -222,7 +337,10 @@ class Manager:
         For the time being, no introspection is performed to ensure
         that the correct signature is used. String values are
         case-insensitive, and integers indicate the order of CRAM
-        to be used.
+        to be used. The strings ``"batchcram16"`` and ``"batchcram48"``
+        select solvers that deplete many materials in a single call,
+        which is beneficial for problems with many burnable materials
+        and small chains.
 
         Parameters
         ----------
@@ -237,6 +355,8 @@ class Manager:
 
         """
 
+        self._batchedSolver = False
+
         if solver is None:
             self._depsolver = Cram16Solver.__call__
             return
@@ -251,10 +371,16 @@ class Manager:
             48: Cram48Solver,
             "16": Cram16Solver,
             "48": Cram48Solver,
+            "batchcram16": BatchedCram16Solver,
+            "batchcram48": BatchedCram48Solver,
         }.get(solver)
 
+        if candidate is None and isinstance(solver, BatchedCramSolver):
+            candidate = solver
+
         if candidate is not None:
             self._depsolver = candidate.__call__
+            self._batchedSolver = isinstance(candidate, BatchedCramSolver)
             return
 
         if isinstance(solver, Callable):
@@ -263,6 +389,23 @@ class Manager:
 
         raise TypeError(f"Could not decipher {solver} of type {type(solver)}")
 
+    @property
+    def startMethod(self):
+        return self._startMethod
+
+    @startMethod.setter
+    def startMethod(self, value):
+        if value is not None:
+            if not isinstance(value, str):
+                raise TypeError(f"Start method must be string, not {type(value)}")
+            allowed = multiprocessing.get_all_start_methods()
+            if value not in allowed:
+                raise ValueError(
+                    f"Start method must be one of {', '.join(allowed)}, "
+                    f"not {value}"
+                )
+        self._startMethod = value
+
     @property
     def burnable(self):
         return self._burnable
@@ -375,6 +518,46 @@ class Manager:
             mat.index = ix
 
         self._burnable = burnable
+        self._reducedIndex = None
+        self._reducedIsotopes = None
+
+        self._startPool()
+
+    def finalize(self, success):
+        """Shut down the pool of depletion workers, if present
+
+        Parameters
+        ----------
+        success : bool
+            Flag indicating the success of the current solution.
+            Workers are terminated without waiting on pending
+            tasks if False
+
+        """
+        if self._pool is None:
+            return
+        if success:
+            self._pool.close()
+        else:
+            self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+
+    def _getNumWorkers(self, nmaterials):
+        nprocs = self.numProcesses or os.cpu_count() or 1
+        return min(nprocs, nmaterials)
+
+    def _startPool(self):
+        if self._pool is not None:
+            self.finalize(True)
+        nworkers = self._getNumWorkers(len(self._burnable))
+        if nworkers < 2:
+            return
+        self._pool = self._makePool(nworkers)
+
+    def _makePool(self, nworkers):
+        context = multiprocessing.get_context(self.startMethod)
+        return context.Pool(nworkers, initializer=_initWorker, initargs=(self.chain,))
 
     def deplete(self, dtSeconds, concentrations, reactionRates, fissionYields):
         """Deplete all burnable materials
@@ -422,23 +605,178 @@ class Manager:
                 "materials {} and fission yields {}".format(nr, nm, nf)
             )
 
-        zaiOrder = {iso.zai: ix for ix, iso in enumerate(concentrations.isotopes)}
+        keep = self._getReducedIndex(concentrations)
+        if keep is None:
+            densities = numpy.asarray(
+                self._depleteDensities(
+                    dtSeconds, concentrations, reactionRates, fissionYields
+                )
+            )
+        else:
+            # Isotopes outside the reduced set are carried over unchanged
+            densities = numpy.array(concentrations.densities, dtype=float)
+            reduced = CompBundle(
+                tuple(concentrations.isotopes[ix] for ix in keep), densities[:, keep]
+            )
+            densities[:, keep] = self._depleteDensities(
+                dtSeconds, reduced, reactionRates, fissionYields
+            )
 
-        matrices = starmap(
-            self.chain.formMatrix,
-            zip(reactionRates, fissionYields, repeat(zaiOrder, nm)),
-        )
+        self._checkFixNegativeDensities(densities)
 
-        inputs = zip(matrices, concentrations.densities, repeat(dtSeconds, nm))
+        return CompBundle(concentrations.isotopes, densities)
 
-        with multiprocessing.Pool() as p:
-            out = p.starmap(self._depsolver, inputs)
+    @property
+    def reducedIsotopes(self):
+        return self._reducedIsotopes
+
+    def _getReducedIndex(self, concentrations):
+        """Indices of isotopes to be depleted, or None for all isotopes"""
+        if self.reductionThreshold is None:
+            return None
+        if self._reducedIndex is None or self.adaptiveReduction:
+            isotopes = concentrations.isotopes
+            present = (
+                numpy.asarray(concentrations.densities) > self.reductionThreshold
+            ).any(axis=0)
+            reachable = set(self.chain.findReachable(
+                iso.zai for iso, flag in zip(isotopes, present) if flag
+            ))
+            self._reducedIndex = numpy.array(
+                [ix for ix, iso in enumerate(isotopes) if iso.zai in reachable],
+                dtype=int,
+            )
+            self._reducedIsotopes = tuple(
+                isotopes[ix].zai for ix in self._reducedIndex
+            )
+        if self._reducedIndex.size == len(concentrations.isotopes):
+            return None
+        return self._reducedIndex
 
-        densities = numpy.asarray(out)
+    def _depleteDensities(
+        self, dtSeconds, concentrations, reactionRates, fissionYields
+    ):
+        """Dispatch depletion to the configured solver and workers"""
+        nm = len(concentrations.densities)
+        if self._pool is not None:
+            return self._depleteWithPool(
+                self._pool, dtSeconds, concentrations, reactionRates, fissionYields
+            )
+        elif self._getNumWorkers(nm) < 2:
+            # Matrix data are assembled eagerly, only the conversion to
+            # CSR is deferred and timed in _depleteSerial
+            with self.timers.time("matrices"):
+                matrices = self._formMatrices(
+                    concentrations, reactionRates, fissionYields
+                )
+                if self._batchedSolver:
+                    matrices = list(matrices)
+            if self._batchedSolver:
+                with self.timers.time("cram"):
+                    return self._depsolver(
+                        matrices, concentrations.densities, dtSeconds
+                    )
+            return self._depleteSerial(matrices, concentrations.densities, dtSeconds)
+        # Not started through beforeMain, use a short-lived pool
+        with self._makePool(self._getNumWorkers(nm)) as p:
+            return self._depleteWithPool(
+                p, dtSeconds, concentrations, reactionRates, fissionYields
+            )
 
-        self._checkFixNegativeDensities(densities)
+    def _depleteSerial(self, matrices, densities, dtSeconds):
+        """Build and deplete one material at a time"""
+        result = []
+        buildTime = solveTime = 0.0
+        buildStart = time.perf_counter()
+        for density in densities:
+            start = time.perf_counter()
+            matrix = next(matrices)
+            middle = time.perf_counter()
+            result.append(self._depsolver(matrix, density, dtSeconds))
+            buildTime += middle - start
+            solveTime += time.perf_counter() - middle
+        # Building and solving are interleaved, report them back to back
+        self.timers.add("matrices", buildTime, start=buildStart)
+        self.timers.add("cram", solveTime, start=buildStart + buildTime)
+        return result
+
+    def _depleteWithPool(
+        self, pool, dtSeconds, concentrations, reactionRates, fissionYields
+    ):
+        nm = len(concentrations.densities)
 
-        return CompBundle(concentrations.isotopes, densities)
+        if self._batchedSolver:
+            densities = numpy.asarray(concentrations.densities)
+            # One contiguous chunk of materials per worker
+            chunks = [
+                c for c in numpy.array_split(
+                    numpy.arange(nm), self._getNumWorkers(nm)
+                ) if c.size
+            ]
+        else:
+            chunks = None
+
+        if self.buildMatricesInWorkers:
+            if reactionRates.index != self.chain.reactionIndex:
+                raise ValueError("Reaction indices do not conform")
+            # Workers default to the chain ordering, skip sending it if possible
+            zaiOrder = tuple(iso.zai for iso in concentrations.isotopes)
+            if zaiOrder == self.chain.zaiOrder:
+                zaiOrder = None
+
+            if chunks is not None:
+                inputs = (
+                    (
+                        self._depsolver,
+                        reactionRates.data[c],
+                        [fissionYields[ix] for ix in c],
+                        densities[c],
+                        dtSeconds,
+                        zaiOrder,
+                    )
+                    for c in chunks
+                )
+                with self.timers.time("cram"):
+                    return numpy.concatenate(
+                        pool.starmap(_formAndDepleteMany, inputs)
+                    )
+
+            inputs = zip(
+                repeat(self._depsolver, nm),
+                reactionRates.data,
+                fissionYields,
+                concentrations.densities,
+                repeat(dtSeconds, nm),
+                repeat(zaiOrder, nm),
+            )
+            with self.timers.time("cram"):
+                return pool.starmap(_formAndDeplete, inputs)
+
+        with self.timers.time("matrices"):
+            matrices = list(
+                self._formMatrices(concentrations, reactionRates, fissionYields)
+            )
+        if chunks is not None:
+            inputs = (
+                (
+                    [matrices[ix] for ix in c],
+                    densities[c],
+                    dtSeconds,
+                )
+                for c in chunks
+            )
+            with self.timers.time("cram"):
+                return numpy.concatenate(pool.starmap(self._depsolver, inputs))
+
+        inputs = zip(matrices, concentrations.densities, repeat(dtSeconds, nm))
+        with self.timers.time("cram"):
+            return pool.starmap(self._depsolver, inputs)
+
+    def _formMatrices(self, concentrations, reactionRates, fissionYields):
+        zaiOrder = tuple(iso.zai for iso in concentrations.isotopes)
+        pattern = self.chain.getMatrixPattern(zaiOrder)
+        data = self.chain.formMatrices(reactionRates, fissionYields, zaiOrder)
+        return map(pattern.toCsr, data)
 
     def _checkFixNegativeDensities(self, densities):
         """Replace negatives in-place, warning or erroring as appropriate"""
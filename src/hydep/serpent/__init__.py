@@ -9,6 +9,6 @@ except ImportError:
         "with pip install <options> hydep[serpent]")
 
 from .writer import SerpentWriter, ExtDepWriter
-from .runner import SerpentRunner, ExtDepRunner
+from .runner import SerpentRunner, ExtDepRunner, AsyncSerpentRunner
 from .processor import SerpentProcessor
 from .solver import SerpentSolver, CoupledSerpentSolver
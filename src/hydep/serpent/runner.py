@@ -1,12 +1,16 @@
 """Serpent runner"""
 
+import asyncio
 import pathlib
-import time
 import logging
+import logging.handlers
 import subprocess
 import numbers
 import os
 import re
+import select
+import threading
+from collections import deque, namedtuple
 from enum import Enum, auto
 import signal
 
@@ -222,6 +226,9 @@ class SerpentRunner(BaseRunner):
     def __call__(self, inputpath):
         """Run Serpent given this input file
 
+        Serpent is run from the directory containing the input file,
+        rather than the current working directory.
+
         Parameters
         ----------
         inputfile : pathlib.Path
@@ -237,12 +244,262 @@ class SerpentRunner(BaseRunner):
         if not inputpath.is_file():
             raise IOError("Input file {} does not exist".format(inputpath))
 
+        inputpath = inputpath.resolve()
         cmd = self.makeCommand() + [inputpath]
-        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        proc = subprocess.run(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=inputpath.parent
+        )
         if proc.returncode:
             self._reportFailure(proc.stdout[-500:])
 
 
+SerpentProgress = namedtuple("SerpentProgress", "active cycle cycles keff keffStd")
+SerpentProgress.__doc__ = """Progress of a Serpent transport solution
+
+Parameters
+----------
+active : bool
+    True if the cycle is an active cycle, False for inactive cycles
+cycle : int
+    Index of the current cycle, starting at one
+cycles : int
+    Number of active or inactive cycles
+keff : float or None
+    Most recent analog multiplication factor, if reported
+keffStd : float or None
+    Absolute uncertainty on :attr:`keff`, if reported
+
+"""
+
+# Patterns used to parse progress from the Serpent output stream
+CYCLE_PATTERN = re.compile(rb"^\s*(Inactive|Active) cycle\s+(\d+)\s*/\s*(\d+)")
+KEFF_PATTERN = re.compile(
+    rb"^\s*k-eff \(analog\)\s*=\s*([-+.\deE]+)(?:\s*\+/-\s*([-+.\deE]+))?"
+)
+
+
+class AsyncSerpentRunner(BaseRunner):
+    """Run Serpent as an :mod:`asyncio` subprocess
+
+    Output from Serpent is streamed line by line, rather than held in
+    memory until the process exits. Each line is parsed for the
+    current cycle and multiplication factor, and written to a rotating
+    log file. Only the last few lines are retained to report
+    failures.
+
+    The :meth:`run` coroutine allows the caller to perform other work,
+    e.g. writing the next input file or flushing results to disk,
+    while Serpent is running::
+
+        async def step(runner, inputpath, store):
+            task = asyncio.ensure_future(runner.run(inputpath))
+            store.flush()
+            return await task
+
+    Calling the runner directly blocks until Serpent is complete, so
+    it can be used in place of a :class:`SerpentRunner`. This sets
+    and then clears the current event loop, like :func:`asyncio.run`,
+    and cannot be done from a running event loop. Prior to Python
+    3.8, subprocesses can only be started from the main thread.
+
+    Parameters
+    ----------
+    executable : str, optional
+        Serpent executable. Can either be the command name
+        or a path to the executable
+    omp : int, optional
+        Number of OMP threads to use. Will pass to the
+        ``-omp`` command line argument. Use a value of ``None``
+        if this should be determined by Serpent using the
+        ``OMP_NUM_THREADS`` environment variable
+    mpi : int, optional
+        Number of MPI tasks to use when running Serpent. If provided,
+        Serpent will be run using ``mpirun -np <N>``
+    maxBytes : int, optional
+        Size [bytes] of the log file before it is rotated. Default
+        is 10 MiB
+    backupCount : int, optional
+        Number of rotated log files to keep. Default is 2
+
+    Attributes
+    ----------
+    executable : str or None
+        Serpent executable. Can either be the command name
+        or a path to the executable. Must be provided prior
+        to :meth:`run`
+    omp : int or None
+        Number of OMP threads to use
+    mpi : int or None
+        Number of MPI tasks to use
+    maxBytes : int
+        Size [bytes] of the log file before it is rotated. A value of
+        zero disables rotation
+    backupCount : int
+        Number of rotated log files to keep
+    progress : hydep.serpent.runner.SerpentProgress or None
+        Most recent progress parsed from the output of the current
+        or previous run
+
+    """
+
+    TAIL_LINES = 50
+
+    def __init__(self, executable=None, omp=None, mpi=None, maxBytes=10 * 1024 ** 2,
+                 backupCount=2):
+        super().__init__(executable, omp, mpi)
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self.progress = None
+
+    def __call__(self, inputpath, logfile=None, callback=None):
+        """Run Serpent and wait for it to complete
+
+        Parameters
+        ----------
+        inputpath : pathlib.Path
+            Path to existing input file
+        logfile : str or pathlib.Path, optional
+            Destination of the output stream. Defaults to the input
+            file with a ``.log`` suffix
+        callback : callable, optional
+            Called with the updated :attr:`progress` every time
+            progress is reported by Serpent
+
+        Returns
+        -------
+        hydep.serpent.runner.SerpentProgress or None
+            Final progress reported by Serpent, or ``None`` if no
+            progress was found in the output
+
+        Raises
+        ------
+        hydep.FailedSolverError
+            Error message contains the tail end of the Serpent
+            output
+
+        """
+        loop = asyncio.new_event_loop()
+        # The child watcher used for subprocesses on Unix prior to
+        # Python 3.8 is only attached to the current event loop
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(self.run(inputpath, logfile, callback))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    async def run(self, inputpath, logfile=None, callback=None):
+        """Coroutine that runs Serpent and streams the output
+
+        Serpent is run from the directory containing the input file,
+        rather than the current working directory.
+
+        Parameters
+        ----------
+        inputpath : pathlib.Path
+            Path to existing input file
+        logfile : str or pathlib.Path, optional
+            Destination of the output stream. Defaults to the input
+            file with a ``.log`` suffix
+        callback : callable, optional
+            Called with the updated :attr:`progress` every time
+            progress is reported by Serpent
+
+        Returns
+        -------
+        hydep.serpent.runner.SerpentProgress or None
+            Final progress reported by Serpent, or ``None`` if no
+            progress was found in the output
+
+        Raises
+        ------
+        hydep.FailedSolverError
+            Error message contains the tail end of the Serpent
+            output
+
+        Serpent is killed if the coroutine is cancelled, or if
+        ``callback`` or writing the log file raises an exception.
+
+        """
+        inputpath = pathlib.Path(inputpath).resolve()
+        if not inputpath.is_file():
+            raise IOError("Input file {} does not exist".format(inputpath))
+        if logfile is None:
+            logfile = inputpath.with_suffix(".log")
+
+        cmd = self.makeCommand() + [str(inputpath)]
+        self.progress = None
+        tail = deque(maxlen=self.TAIL_LINES)
+
+        handler = logging.handlers.RotatingFileHandler(
+            logfile, maxBytes=self.maxBytes, backupCount=self.backupCount
+        )
+        handler.terminator = ""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                cwd=str(inputpath.parent),
+            )
+            try:
+                while True:
+                    line = await proc.stdout.readline()
+                    if not line:
+                        break
+                    tail.append(line)
+                    handler.emit(logging.makeLogRecord(
+                        {"msg": line.decode(errors="replace")}
+                    ))
+                    if self._parseLine(line) and callback is not None:
+                        callback(self.progress)
+                returncode = await proc.wait()
+            except BaseException:
+                # Cancelled, or failed handling output. Do not leave
+                # Serpent running without a parent
+                if proc.returncode is None:
+                    try:
+                        proc.kill()
+                    except ProcessLookupError:
+                        pass
+                    await proc.wait()
+                raise
+        finally:
+            handler.close()
+
+        if returncode:
+            self._reportFailure(b"".join(tail)[-500:])
+        return self.progress
+
+    def _parseLine(self, line):
+        """Update :attr:`progress` from a line of output
+
+        Returns
+        -------
+        bool
+            True if the progress was updated
+
+        """
+        match = CYCLE_PATTERN.match(line)
+        if match is not None:
+            self.progress = SerpentProgress(
+                match.group(1) == b"Active",
+                int(match.group(2)),
+                int(match.group(3)),
+                None,
+                None,
+            )
+            return True
+
+        match = KEFF_PATTERN.match(line)
+        if match is None or self.progress is None:
+            return False
+        std = match.group(2)
+        self.progress = self.progress._replace(
+            keff=float(match.group(1)),
+            keffStd=float(std) if std is not None else None,
+        )
+        return True
+
+
 class STATE(Enum):
     """Enumerations of various states for the external coupling"""
     INACTIVE = auto()  #: State prior to starting the coupling
@@ -254,18 +511,57 @@ class STATE(Enum):
 
 
 class ExtDepRunner(BaseRunner):
-    """Class for running Serpent via the external depletion interface"""
+    """Class for running Serpent via the external depletion interface
+
+    Serpent signals transitions between stages with ``SIGUSR1``,
+    ``SIGUSR2``, and ``SIGTERM``. Rather than periodically checking
+    the state, the runner sleeps until a signal is received through
+    :func:`signal.set_wakeup_fd`. ``SIGCHLD`` is also watched, so the
+    runner wakes immediately if Serpent dies. Must be used from the
+    main thread, as required by :mod:`signal`.
+
+    Parameters
+    ----------
+    executable : str, optional
+        Serpent executable. Can either be the command name
+        or a path to the executable
+    omp : int, optional
+        Number of OMP threads to use. Will pass to the
+        ``-omp`` command line argument. Use a value of ``None``
+        if this should be determined by Serpent using the
+        ``OMP_NUM_THREADS`` environment variable
+    mpi : int, optional
+        Number of MPI tasks to use when running Serpent. If provided,
+        Serpent will be run using ``mpirun -np <N>``
+
+    Attributes
+    ----------
+    state : STATE
+        Current state of the coupling
+    pollInterval : float
+        Maximum time [s] to sleep before checking the state of the
+        coupling without receiving a signal. Serves as a safety net,
+        as transitions are detected as soon as signals arrive
+
+    """
+
     def __init__(self, executable=None, omp=None, mpi=None):
         super().__init__(executable, omp, mpi)
         self._proc = None
         self._state = STATE.INACTIVE
         self._output = None
+        self._outputPath = None
+        self._wakeup = None
+        self._previousHandlers = None
+        self._previousWakeup = -1
+        self.pollInterval = 5.0
 
     @property
     def state(self):
         return self._state
 
     def _signalHandler(self, insig, stack):
+        # SIGCHLD only needs to wake the runner through the wakeup fd
         if insig == signal.SIGUSR1:
             self._state = STATE.WAIT_IFC
         elif insig == signal.SIGUSR2:
@@ -273,6 +569,37 @@ class ExtDepRunner(BaseRunner):
         elif insig == signal.SIGTERM:
             self._state = STATE.TERM
 
+    def _installSignals(self):
+        """Install signal handlers and the self-pipe used for waking"""
+        if self._wakeup is not None:
+            return
+        read, write = os.pipe()
+        os.set_blocking(read, False)
+        os.set_blocking(write, False)
+        self._previousHandlers = {
+            sig: signal.signal(sig, self._signalHandler)
+            for sig in (signal.SIGUSR1, signal.SIGUSR2, signal.SIGTERM, signal.SIGCHLD)
+        }
+        self._previousWakeup = signal.set_wakeup_fd(write)
+        self._wakeup = read, write
+
+    def _restoreSignals(self):
+        """Restore previous signal handlers and close the self-pipe"""
+        if self._wakeup is None:
+            return
+        # Handlers can only be modified from the main thread. Leave them
+        # in place, e.g. if the runner is garbage collected elsewhere
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.set_wakeup_fd(self._previousWakeup)
+        for sig, handler in self._previousHandlers.items():
+            signal.signal(sig, handler if handler is not None else signal.SIG_DFL)
+        for fd in self._wakeup:
+            os.close(fd)
+        self._wakeup = None
+        self._previousHandlers = None
+        self._previousWakeup = -1
+
     def terminate(self):
         """Terminate the Serpent process and any output pipes"""
         if self._proc is not None:
@@ -281,6 +608,7 @@ class ExtDepRunner(BaseRunner):
         if self._output is not None:
             self._output.close()
             self._output = None
+        self._restoreSignals()
 
     def __del__(self):
         """Ensure the runner and connections are tidied up"""
@@ -289,6 +617,9 @@ class ExtDepRunner(BaseRunner):
     def start(self, inputfile, output=None):
         """Start coupled Serpent and run the first transport step
 
+        Serpent is run from the directory containing the input file,
+        rather than the current working directory.
+
         Parameters
         ----------
         inputfile : str or pathlib.Path
@@ -301,40 +632,65 @@ class ExtDepRunner(BaseRunner):
             to this location
 
         """
+        inputfile = pathlib.Path(inputfile).resolve()
         cmd = self.makeCommand() + [inputfile]
 
         if output is None:
             output = subprocess.PIPE
         elif isinstance(output, (str, pathlib.Path)):
+            self._outputPath = pathlib.Path(output)
             output = self._output = open(output, "w")
         else:
             assert hasattr(output, "write")
 
-        signal.signal(signal.SIGUSR1, self._signalHandler)
-        signal.signal(signal.SIGUSR2, self._signalHandler)
-        signal.signal(signal.SIGTERM, self._signalHandler)
+        self._installSignals()
 
-        self._proc = subprocess.Popen(cmd, stdout=output, stderr=subprocess.STDOUT)
         self._state = STATE.RUNNING
+        self._proc = subprocess.Popen(
+            cmd, stdout=output, stderr=subprocess.STDOUT,
+            cwd=inputfile.parent,
+        )
         self._wait(STATE.WAIT_IFC)
 
     def _wait(self, desiredState):
-        stat = self._proc.poll()
-        while stat is None:
-            if self.state == desiredState:
+        while self.state != desiredState:
+            if self._proc.poll() is not None:
                 break
-            time.sleep(1)
-            stat = self._proc.poll()
+            # Any signal, including the death of Serpent, writes to the pipe
+            ready, _w, _x = select.select([self._wakeup[0]], [], [], self.pollInterval)
+            if ready:
+                self._drainWakeup()
         else:
-            self._state = STATE.DEAD
-            # Avoid a race-condition where Serpent has told us it is
-            # terminating, and did so before we could check
-            # the state from the signal handler. If we wanted Serpent
-            # to terminate, then this should be okay
-            if desiredState == STATE.TERM:
-                return
-            # All is lost
-            self._reportFailure(self._proc.stdout[-500:])
+            return
+
+        self._state = STATE.DEAD
+        # Avoid a race-condition where Serpent has told us it is
+        # terminating, and did so before we could check
+        # the state from the signal handler. If we wanted Serpent
+        # to terminate, then this should be okay
+        if desiredState == STATE.TERM:
+            return
+        # All is lost
+        self._reportFailure(self._outputTail())
+
+    def _drainWakeup(self):
+        try:
+            while os.read(self._wakeup[0], 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _outputTail(self, nbytes=500):
+        """Last portion of the output written by Serpent"""
+        if self._proc.stdout is not None:
+            return self._proc.stdout.read()[-nbytes:]
+        if self._outputPath is not None and self._outputPath.is_file():
+            if self._output is not None:
+                self._output.flush()
+            with self._outputPath.open("rb") as stream:
+                stream.seek(max(0, self._outputPath.stat().st_size - nbytes))
+                return stream.read()
+        return b""
 
     def solveNext(self):
         """Tell Serpent to solve the next transport step
@@ -357,8 +713,10 @@ class ExtDepRunner(BaseRunner):
         self._proc.send_signal(signal.SIGUSR2)
         self._wait(STATE.WAIT_NEXT_STEP)
 
-        self._proc.send_signal(signal.SIGUSR1)
+        # Update the state first, as the reply may be handled before
+        # send_signal returns
         self._state = STATE.RUNNING
+        self._proc.send_signal(signal.SIGUSR1)
         self._wait(STATE.WAIT_IFC)
 
     def solveEOL(self):
@@ -81,6 +81,11 @@ class BaseSolver(HighFidelitySolver):
     basedir : pathlib.Path or None
         Path where results will be saved and auxillary files may be saved.
         Configured in :meth:`self.beforeMain`
+    rundir : pathlib.Path or None
+        Path where Serpent inputs are written and Serpent is run.
+        Configured in :meth:`self.beforeMain` using
+        :attr:`hydep.Settings.rundir`, falling back to
+        :attr:`basedir`
 
     """
 
@@ -91,6 +96,7 @@ class BaseSolver(HighFidelitySolver):
         self._hooks = None
         self._volumes = None
         self._basedir = None
+        self._rundir = None
 
     @property
     def features(self):
@@ -125,6 +131,10 @@ class BaseSolver(HighFidelitySolver):
     def basedir(self):
         return self._basedir
 
+    @property
+    def rundir(self):
+        return self._rundir
+
     @property
     def writer(self) -> BaseWriter:
         return self._writer
@@ -184,6 +194,7 @@ class BaseSolver(HighFidelitySolver):
         """
         self.runner.configure(settings.serpent)
         self._basedir = settings.basedir
+        self._rundir = settings.rundir or settings.basedir
 
         assert manager.burnable is not None
         orderedBumat = manager.burnable
@@ -323,7 +334,9 @@ class SerpentSolver(BaseSolver):
 
     def _solve(self, compositions, timestep, power, final=False):
         curfile = self.writer.writeSteadyStateFile(
-            f"./serpent-s{timestep.coarse}", compositions, timestep, power, final=final)
+            self.rundir / f"serpent-s{timestep.coarse}", compositions, timestep, power,
+            final=final,
+        )
 
         start = time.time()
         self.runner(curfile)
@@ -334,7 +347,7 @@ class SerpentSolver(BaseSolver):
         return res
 
     def _writeMainFile(self, model, manager, settings):
-        basefile = pathlib.Path.cwd() / "serpent-base.sss"
+        basefile = self.rundir / "serpent-base.sss"
         self.writer.writeBaseFile(basefile, settings, manager.chain)
         return basefile
 
@@ -369,7 +382,7 @@ class CoupledSerpentSolver(BaseSolver):
         self._fp = None
 
     def _writeMainFile(self, model, manager, settings):
-        self._fp = basefile = pathlib.Path.cwd() / "serpent-extdep"
+        self._fp = basefile = self.rundir / "serpent-extdep"
         self.writer.writeCouplingFile(
             basefile,
             settings,
@@ -2,6 +2,7 @@
 Serpent writer
 """
 
+import functools
 import os
 import pathlib
 import warnings
@@ -27,6 +28,17 @@ from .utils import findLibraries, findProblemIsotopes, ProblematicIsotopes
 _ROOT_UNIVERSE_ID = 0
 
 
+@functools.lru_cache(maxsize=8)
+def _scanProblemIsotopes(xsfile, _mtime, _size, zais):
+    """Cached search of a cross section library for problem isotopes
+
+    Modification time and size of the file are included so the
+    cache is refreshed if the library changes.
+    """
+    with xsfile.open("r") as stream:
+        return findProblemIsotopes(stream, zais)
+
+
 class BaseWriter:
     """Parent class for writing basic information
 
@@ -58,6 +70,8 @@ class BaseWriter:
         self.datafiles = None
         self._buleads = {}
         self._problemIsotopes = ProblematicIsotopes(missing=set(), replacements={})
+        self._prefixes = {}
+        self._prefixZais = None
         self._textwrapper = TextWrapper(width=75)
         self._commenter = TextWrapper(
             width=75, initial_indent=" * ", subsequent_indent=" * ",
@@ -182,11 +196,17 @@ class BaseWriter:
             the library, or found under a different ZA number
 
         """
-        with xsfile.open("r") as s:
-            p = findProblemIsotopes(s, zais)
+        xsfile = pathlib.Path(xsfile).resolve()
+        stat = xsfile.stat()
+        # Shared across writers, e.g. several studies in one process
+        found = _scanProblemIsotopes(
+            xsfile, stat.st_mtime_ns, stat.st_size, frozenset(map(tuple, zais))
+        )
+        p = ProblematicIsotopes(set(found.missing), dict(found.replacements))
 
         self._problemIsotopes.missing.update(p.missing)
         self._problemIsotopes.replacements.update(p.replacements)
+        self._prefixes.clear()
 
         return p
 
@@ -317,23 +337,100 @@ set nfg {self._eneGridName}
           cross section library used
 
         """
-        missing = 0
-        lines = []
-        for (z, a, i), adens in pairs:
-            if adens < threshold:
-                missing += adens
-                continue
-            # Check missing
-            if (z, a, i) in self._problemIsotopes.missing:
-                missing += adens
-                continue
-            # Get Z, A for isotope that may be listed under a different
-            # name, e.g. metastable isotopes
-            z, a = self._problemIsotopes.replacements.get((z, a, i), (z, a))
-            lines.append(f"{z}{a:03}.{tlib} {adens:13.9E}")
-        stream.write("\n".join(lines))
+        zais = []
+        densities = []
+        for zai, adens in pairs:
+            zais.append(tuple(zai))
+            densities.append(adens)
+        prefixes, skip = self._makeIsotopePrefixes(zais, tlib)
+        block, missing = self._formatMatIsoDef(
+            prefixes, skip, numpy.array(densities, dtype=float), threshold
+        )
+        stream.write(block)
         return missing
 
+    def _makeIsotopePrefixes(self, zais, tlib):
+        """Isotope names for a library and a mask of missing isotopes
+
+        Isotopes that are listed under different names, e.g.
+        metastable isotopes, are written with their replacement names.
+
+        Parameters
+        ----------
+        zais : sequence of (int, int, int)
+            Isotope ZAI triplets
+        tlib : str
+            Temperature-specific cross section library, e.g. ``"09c"``
+
+        Returns
+        -------
+        numpy.ndarray of str
+            Name of each isotope with the library and a trailing
+            space, e.g. ``"92235.09c "``
+        numpy.ndarray of bool
+            Flag indicating the isotope is missing from the library
+
+        """
+        replacements = self._problemIsotopes.replacements
+        prefixes = numpy.empty(len(zais), dtype=object)
+        for ix, (z, a, i) in enumerate(zais):
+            z, a = replacements.get((z, a, i), (z, a))
+            prefixes[ix] = f"{z}{a:03}.{tlib} "
+        missing = self._problemIsotopes.missing
+        skip = numpy.fromiter((zai in missing for zai in zais), bool, len(zais))
+        return prefixes, skip
+
+    def _getIsotopePrefixes(self, zais, tlib):
+        """Cached :meth:`_makeIsotopePrefixes` for burnable materials
+
+        Burnable materials share the same isotopes across time steps,
+        so the names are only rebuilt if the isotopes or the
+        problematic isotopes change.
+        """
+        if zais is not self._prefixZais and zais != self._prefixZais:
+            self._prefixes.clear()
+            self._prefixZais = zais
+        cached = self._prefixes.get(tlib)
+        if cached is None:
+            cached = self._prefixes[tlib] = self._makeIsotopePrefixes(zais, tlib)
+        return cached
+
+    @staticmethod
+    def _formatMatIsoDef(prefixes, skip, densities, threshold):
+        """Format the isotope block of a material using masks
+
+        Parameters
+        ----------
+        prefixes : numpy.ndarray of str
+            Isotope names from :meth:`_makeIsotopePrefixes`
+        skip : numpy.ndarray of bool
+            Flags for isotopes that are not to be written
+        densities : numpy.ndarray of float
+            Atom densities [#/b/cm] for each isotope
+        threshold : float
+            Isotopes with densities under this value are not written
+
+        Returns
+        -------
+        str
+            Lines of isotope names and densities, without a trailing
+            new line
+        float
+            Sum of atom densities not written
+
+        """
+        skip = skip | (densities < threshold)
+        missing = densities[skip].sum()
+        keep = ~skip
+        count = int(keep.sum())
+        if not count:
+            return "", missing
+        # Interleave names and densities for a single formatting call
+        items = numpy.empty(2 * count, dtype=object)
+        items[0::2] = prefixes[keep]
+        items[1::2] = densities[keep].tolist()
+        return ("%s%13.9E\n" * count % tuple(items))[:-1], missing
+
     def _getmatlib(self, mat):
         """Return the continuous energy library, "03c", given material"""
         if mat.temperature is not None:
@@ -823,9 +920,9 @@ of depletion. Add a single one day step here. Maybe hack something later""",
             raise AttributeError(f"Base file to be included not found on {self}")
 
         steadystate = self._setupfile(path)
-        with steadystate.open("w") as stream:
-            stream.write(
-                f"""/*
+        # Collect the full file and write it at once
+        chunks = [
+            f"""/*
  * Steady state input file
  * Time step : {timestep.coarse}
  * Time [d] : {timestep.currentTime/SECONDS_PER_DAY:.2f}
@@ -833,32 +930,36 @@ of depletion. Add a single one day step here. Maybe hack something later""",
  */
 include "{self.base.resolve()}"
 set power {power:.7E}\n"""
-            )
+        ]
+
+        zais = tuple((iso.triplet for iso in compositions.isotopes))
+        densities = numpy.asarray(compositions.densities, dtype=float)
+
+        for ix, matdens in enumerate(densities):
+            matprops = self._buleads.get(ix)
+            if matprops is None:
+                try:
+                    mat = self.burnable[ix]
+                except IndexError as ie:
+                    raise KeyError(f"Cannot find burnable material {ix}") from ie
+                matdef = " ".join(self._getMaterialOptions(mat))
+                tlib = self._getmatlib(mat)
+                self._buleads[ix] = matdef, tlib
+            else:
+                matdef, tlib = matprops
 
-            zais = tuple((iso.triplet for iso in compositions.isotopes))
-
-            for ix, densities in enumerate(compositions.densities):
-                matprops = self._buleads.get(ix)
-                if matprops is None:
-                    try:
-                        mat = self.burnable[ix]
-                    except IndexError as ie:
-                        raise KeyError(f"Cannot find burnable material {ix}") from ie
-                    matdef = " ".join(self._getMaterialOptions(mat))
-                    tlib = self._getmatlib(mat)
-                    self._buleads[ix] = matdef, tlib
-                else:
-                    matdef, tlib = matprops
+            if final:
+                # TODO Turn off all hooks except flux for final step
+                # TODO Only load decay, nfy for non-final steps
+                # META do we need decay, nfy libraries at all?
+                matdef = matdef.replace(" burn 1", "")
 
-                if final:
-                    # TODO Turn off all hooks except flux for final step
-                    # TODO Only load decay, nfy for non-final steps
-                    # META do we need decay, nfy libraries at all?
-                    matdef = matdef.replace(" burn 1", "")
+            prefixes, skip = self._getIsotopePrefixes(zais, tlib)
+            block, _missing = self._formatMatIsoDef(prefixes, skip, matdens, 1e-20)
+            chunks.append(f"{matdef}\n{block}\n")
 
-                stream.write(f"{matdef}\n")
-                self.writeMatIsoDef(stream, zip(zais, densities), tlib)
-                stream.write("\n")
+        with steadystate.open("w") as stream:
+            stream.write("".join(chunks))
 
         return steadystate
 
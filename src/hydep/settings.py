@@ -253,7 +253,8 @@ class Settings:
     ----------
     depletionSolver : str, optional
         Initial value for :attr:`depletionSolver`. Package supports
-        ``"cram16"`` and ``"cram48"`` string names.
+        ``"cram16"``, ``"cram48"``, ``"batchcram16"``, and
+        ``"batchcram48"`` string names.
         More detailed configuration can be done via
         :meth:`hydep.Manager.setDepletionSolver`
     boundaryConditions : str or iterable of str, optional
@@ -275,6 +276,18 @@ class Settings:
     useTempDir : bool, optional
         Use a temporary directory in place of :attr:`rundir` when running
         simulations. Default is False.
+    sparseXsHistory : bool, optional
+        Store only non-zero reactions in the history of microscopic
+        cross sections used for fitting. Default is False
+    singlePrecisionXsHistory : bool, optional
+        Store the history of microscopic cross sections in single
+        precision. Fits are still performed in double precision.
+        Default is False
+    profile : bool, optional
+        Profile the simulation with :mod:`cProfile`. Default is False
+    timingTrace : bool, optional
+        Record every timed section of the simulation for a Chrome
+        trace. Default is False
 
     Attributes
     ----------
@@ -307,6 +320,21 @@ class Settings:
     useTempDir : bool
         Flag signalling to use a temporary directory in :attr:`rundir`
         is ``None``
+    sparseXsHistory : bool
+        Flag signalling to only store reactions that are non-zero in
+        some material in the cross section history. Reduces memory for
+        reactions not tallied by the high fidelity solver
+    singlePrecisionXsHistory : bool
+        Flag signalling to store the cross section history as single
+        precision floats, halving the memory required
+    profile : bool
+        Flag signalling to profile the simulation with :mod:`cProfile`
+        and write the statistics to ``hydep-profile.pstats`` in
+        :attr:`basedir`. The file can be inspected with :mod:`pstats`
+    timingTrace : bool
+        Flag signalling to write the timed sections of the simulation
+        to ``hydep-trace.json`` in :attr:`basedir` using the Chrome
+        trace event format
 
     Examples
     --------
@@ -345,6 +373,10 @@ class Settings:
     _ALLOWED_BC = frozenset({"reflective", "periodic", "vacuum"})
     numFittingPoints = BoundedTyped("_numFittingPoints", int, gt=0)
     useTempDir = TypedAttr("_useTempDir", bool)
+    sparseXsHistory = TypedAttr("_sparseXsHistory", bool)
+    singlePrecisionXsHistory = TypedAttr("_singlePrecisionXsHistory", bool)
+    profile = TypedAttr("_profile", bool)
+    timingTrace = TypedAttr("_timingTrace", bool)
 
     def __init__(
         self,
@@ -355,6 +387,10 @@ class Settings:
         basedir: OptFile = None,
         rundir: OptFile = None,
         useTempDir: typing.Optional[bool] = False,
+        sparseXsHistory: typing.Optional[bool] = False,
+        singlePrecisionXsHistory: typing.Optional[bool] = False,
+        profile: typing.Optional[bool] = False,
+        timingTrace: typing.Optional[bool] = False,
     ):
         self.depletionSolver = depletionSolver
         if boundaryConditions is None:
@@ -366,6 +402,10 @@ class Settings:
         self.basedir = basedir or pathlib.Path.cwd()
         self.rundir = rundir
         self.useTempDir = useTempDir
+        self.sparseXsHistory = sparseXsHistory
+        self.singlePrecisionXsHistory = singlePrecisionXsHistory
+        self.profile = profile
+        self.timingTrace = timingTrace
 
     def __getattr__(self, name):
         klass = _CONFIG_CLASSES.get(name)
@@ -524,6 +564,12 @@ class Settings:
         * ``"basedir"`` : path-like - update :attr:`basedir`
         * ``"rundir"`` : path-like - update :attr:`rundir`
         * ``"use temp dir"`` : boolean - update :attr:`useTempDir`
+        * ``"sparse xs history"`` : boolean - update
+          :attr:`sparseXsHistory`
+        * ``"single precision xs history"`` : boolean - update
+          :attr:`singlePrecisionXsHistory`
+        * ``"profile"`` : boolean - update :attr:`profile`
+        * ``"timing trace"`` : boolean - update :attr:`timingTrace`
 
         Parameters
         ----------
@@ -550,6 +596,14 @@ class Settings:
         rundir = options.pop("rundir", False)
         tempdir = options.pop("use temp dir", None)
 
+        # Cross section history storage
+        sparseXs = options.pop("sparse xs history", None)
+        singleXs = options.pop("single precision xs history", None)
+
+        # Instrumentation
+        profile = options.pop("profile", None)
+        trace = options.pop("timing trace", None)
+
         if options:
             raise ValueError(
                 f"Not all {self.name} setting processed. The following did not "
@@ -584,6 +638,18 @@ class Settings:
         if tempdir is not None:
             self.useTempDir = asBool("use temp dir", tempdir)
 
+        if sparseXs is not None:
+            self.sparseXsHistory = asBool("sparse xs history", sparseXs)
+        if singleXs is not None:
+            self.singlePrecisionXsHistory = asBool(
+                "single precision xs history", singleXs
+            )
+
+        if profile is not None:
+            self.profile = asBool("profile", profile)
+        if trace is not None:
+            self.timingTrace = asBool("timing trace", trace)
+
     def validate(self):
         """Validate settings"""
         if self.fittingOrder > self.numFittingPoints:
@@ -1165,6 +1231,15 @@ class SfvSettings(SubSetting, sectionName="sfv"):
         Threshold density [#/b/cm] that isotopes must exceed
         in order to contribute when rebuilding macroscopic cross
         sections. Defaults to zero
+    warmStart : bool, optional
+        Start the fission matrix eigenvalue solution from the
+        eigenvectors of the previous step. Default is False
+    eigenTolerance : float, optional
+        Relative residual tolerance for warm started eigenvalue
+        solutions. Default is ``1e-8``
+    numThreads : int, optional
+        Number of threads used to process burnable materials during
+        the substep solution. Default is one
 
     Attributes
     ----------
@@ -1177,16 +1252,43 @@ class SfvSettings(SubSetting, sectionName="sfv"):
         Threshold density [#/b/cm] that isotopes must exceed
         in order to contribute when rebuilding macroscopic cross
         sections
+    warmStart : bool
+        If True, the eigenvalue solution of the fission matrix at
+        each coarse step after the first uses the previous adjoint
+        and forward eigenvectors as the starting point of a subspace
+        iteration. Falls back to the full solution if the iteration
+        does not converge
+    eigenTolerance : float
+        Relative residual tolerance used for warm started eigenvalue
+        solutions
+    numThreads : int
+        Number of threads used to rebuild macroscopic cross sections
+        during the substep solution. Burnable materials are split
+        into contiguous blocks that are processed concurrently
 
     """
 
     modes = BoundedTyped("_modes", numbers.Integral, gt=0, allowNone=True)
     densityCutoff = BoundedTyped("_densityCutoff", numbers.Real, ge=0.0)
+    warmStart = TypedAttr("_warmStart", bool)
+    eigenTolerance = BoundedTyped("_eigenTolerance", numbers.Real, gt=0.0)
+    numThreads = BoundedTyped("_numThreads", numbers.Integral, gt=0)
 
-    def __init__(self, modes=None, modeFraction=1.0, densityCutoff=0):
+    def __init__(
+        self,
+        modes=None,
+        modeFraction=1.0,
+        densityCutoff=0,
+        warmStart=False,
+        eigenTolerance=1e-8,
+        numThreads=1,
+    ):
         self.modes = modes
         self.modeFraction = modeFraction
         self.densityCutoff = densityCutoff
+        self.warmStart = warmStart
+        self.eigenTolerance = eigenTolerance
+        self.numThreads = numThreads
 
     @property
     def modeFraction(self):
@@ -1211,6 +1313,10 @@ class SfvSettings(SubSetting, sectionName="sfv"):
         * ``"mode fraction"`` - :attr:`modeFraction` (float)
         * ``"density cutoff"`` - :attr:`densityCutoff` (non-negative
           float)
+        * ``"warm start"`` - :attr:`warmStart` (boolean)
+        * ``"eigen tolerance"`` - :attr:`eigenTolerance` (positive
+          float)
+        * ``"threads"`` - :attr:`numThreads` (positive integer)
 
         Parameters
         ----------
@@ -1228,6 +1334,9 @@ class SfvSettings(SubSetting, sectionName="sfv"):
         modes = options.pop("modes", False)
         fraction = options.pop("mode fraction", None)
         densityCutoff = options.pop("density cutoff", None)
+        warmStart = options.pop("warm start", None)
+        eigenTolerance = options.pop("eigen tolerance", None)
+        numThreads = options.pop("threads", None)
 
         if options:
             remain = ", ".join(sorted(options))
@@ -1259,3 +1368,18 @@ class SfvSettings(SubSetting, sectionName="sfv"):
                     f"Failed to coerce density cutoff={densityCutoff} to float"
                 ) from ve
             self.densityCutoff = value
+
+        if warmStart is not None:
+            self.warmStart = asBool("warm start", warmStart)
+
+        if eigenTolerance is not None:
+            try:
+                value = float(eigenTolerance)
+            except ValueError as ve:
+                raise TypeError(
+                    f"Failed to coerce eigen tolerance={eigenTolerance} to float"
+                ) from ve
+            self.eigenTolerance = value
+
+        if numThreads is not None:
+            self.numThreads = asPositiveInt("threads", numThreads)
@@ -2,6 +2,7 @@ import math
 import logging
 import numbers
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import time
 from enum import IntEnum, auto
 
@@ -19,6 +20,7 @@ from hydep.constants import (
 )
 from hydep.lib import ReducedOrderSolver
 from hydep.internal import TransportResult, TimeTraveler
+from hydep.internal.eigen import warmAdjFwdEig
 import hydep.internal.features as hdfeat
 from .lib import predict_spatial_flux, getAdjFwdEig
 
@@ -117,6 +119,13 @@ class SfvSolver(ReducedOrderSolver):
         self._currentPower = None
         self._isotopeFissionQs = None
         self._nubar = None
+        self._macroGather = None
+        self._warmStart = False
+        self._eigenTolerance = None
+        self._eigenBasis = None
+        self._coldEigTime = None
+        self._executor = None
+        self._blocks = None
 
     @property
     def numModes(self):
@@ -238,6 +247,10 @@ class SfvSolver(ReducedOrderSolver):
                 f"Expected non-negative real for density cutoff, got {densityCutoff}"
             )
         self._densityCutoff = densityCutoff
+        self._warmStart = sfvSettings.warmStart
+        self._eigenTolerance = sfvSettings.eigenTolerance
+        self._eigenBasis = None
+        self._configureThreads(sfvSettings.numThreads, nvols)
 
         # Nubar extrapolation
         fittingOrder = settings.fittingOrder
@@ -256,6 +269,39 @@ class SfvSolver(ReducedOrderSolver):
         self._macroData[:, DataIndexes.VOLUMES] = vols
         self._processIsotopeFissionQ(manager.chain)
 
+    def _configureThreads(self, numThreads, nvols):
+        self._shutdownExecutor()
+        numThreads = min(numThreads, nvols)
+        bounds = numpy.linspace(0, nvols, numThreads + 1).round().astype(int)
+        self._blocks = tuple(
+            slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])
+        )
+        if numThreads > 1:
+            self._executor = ThreadPoolExecutor(
+                numThreads, thread_name_prefix="hydep-sfv"
+            )
+            __logger__.debug(
+                "Processing %d burnable materials with %d threads",
+                nvols,
+                numThreads,
+            )
+
+    def _shutdownExecutor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def finalize(self, _success):
+        """Release the thread pool used for substep solutions
+
+        Parameters
+        ----------
+        _success : bool
+            Flag indicating the success of the simulation. Not used
+
+        """
+        self._shutdownExecutor()
+
     def _processIsotopeFissionQ(self, isotopes):
         qvalues = defaultdict(float)
         for isotope in isotopes:
@@ -303,10 +349,41 @@ class SfvSolver(ReducedOrderSolver):
         self._nubar.push(timestep.currentTime, nubar)
 
     def _bosProcessFmtx(self, txresult, timestep):
-        try:
-            adj, fwd, eig = getAdjFwdEig(txresult.fmtx, self.numModes)
-        except LinAlgError as le:
-            raise FailedSolverError(f"{self!s} at {timestep}\n{le!s}") from le
+        start = time.perf_counter()
+        if self._warmStart and self._eigenBasis is not None:
+            adj, fwd, eig, iterations, converged = warmAdjFwdEig(
+                txresult.fmtx, self.numModes, *self._eigenBasis,
+                tol=self._eigenTolerance,
+            )
+            elapsed = time.perf_counter() - start
+            if converged:
+                __logger__.info(
+                    "Warm started eigenvalue solution converged in %d iterations, "
+                    "%.4f s. Previous full solution took %.4f s",
+                    iterations, elapsed, self._coldEigTime,
+                )
+            else:
+                __logger__.info(
+                    "Warm started eigenvalue solution did not converge in %d "
+                    "iterations, %.4f s. Performing full solution",
+                    iterations, elapsed,
+                )
+                start = time.perf_counter()
+        else:
+            converged = False
+
+        if not converged:
+            try:
+                adj, fwd, eig = getAdjFwdEig(txresult.fmtx, self.numModes)
+            except LinAlgError as le:
+                raise FailedSolverError(f"{self!s} at {timestep}\n{le!s}") from le
+            self._coldEigTime = time.perf_counter() - start
+            __logger__.debug(
+                "Full eigenvalue solution took %.4f s", self._coldEigTime
+            )
+
+        if self._warmStart:
+            self._eigenBasis = (numpy.asarray(adj), numpy.asarray(fwd))
         self._adjointMoments = numpy.asfortranarray(adj)
         self._forwardMoments = numpy.asfortranarray(adj)
         self._eigenvalues = 1 / eig[: self.numModes]
@@ -355,10 +432,13 @@ class SfvSolver(ReducedOrderSolver):
             meaningless multiplication factor
 
         """
+        timings = {}
+        start = time.perf_counter()
         self._updateMacroFromMicroXs(compositions, microxs)
         self._macroData[:, DataIndexes.NUBAR] = self._nubar.at(timestep.currentTime)
+        timings["macroxs"] = time.perf_counter() - start
 
-        start = time.time()
+        start = time.perf_counter()
         data = self._macroData
 
         normPrediction = predict_spatial_flux(
@@ -373,55 +453,114 @@ class SfvSolver(ReducedOrderSolver):
             data[:, DataIndexes.PHI_0],
             overwrite_flux=False,
         )
+        timings["prediction"] = time.perf_counter() - start
 
+        start = time.perf_counter()
         substepFlux = (
             normPrediction
             * self._currentPower
             / (normPrediction * self._macroData[:, DataIndexes.VOL_K_FIS]).sum()
         )
+        timings["normalization"] = time.perf_counter() - start
 
-        end = time.time()
-
-        return TransportResult(substepFlux, [numpy.nan, numpy.nan], runTime=end - start)
+        return TransportResult(
+            substepFlux,
+            [numpy.nan, numpy.nan],
+            runTime=sum(timings.values()),
+            timings=timings,
+        )
 
     def _updateMacroFromMicroXs(self, compositions, microxs):
         assert len(microxs) == self._macroData.shape[0]
         zais = tuple(iso.zai for iso in compositions.isotopes)
-        cutoff = self._densityCutoff
-
-        # TODO Subprocess??
-        for matix, (comps, matxs) in enumerate(zip(compositions.densities, microxs)):
-            macroSigA = 0
-            macroSigF = 0
-            qSigmaF = 0
-            for isox, z in enumerate(zais):
-                if comps[isox] < cutoff:
-                    continue
-                isorxns = matxs.getReactions(z)
-                if isorxns is None:
-                    continue
-
-                siga = 0
-                for mt in self._NON_FISS_ABS_MT:
-                    siga += isorxns.get(mt, 0.0)
-                macroSigA += siga * comps[isox]
-
-                sigf = sum(isorxns.get(mt, 0) for mt in FISSION_REACTIONS)
-
-                if sigf:
-                    prod = sigf * comps[isox]
-                    macroSigA += prod
-                    macroSigF += prod
-                    qSigmaF += prod * self._isotopeFissionQs[z]
-
-            self._macroData[matix, DataIndexes.ABS_1] = macroSigA
-            self._macroData[matix, DataIndexes.FIS_1] = macroSigF
-            self._macroData[matix, DataIndexes.VOL_K_FIS] = qSigmaF
-
-        self._macroData[:, (DataIndexes.ABS_1, DataIndexes.FIS_1)] *= BARN_PER_CM2
-
-        self._macroData[:, DataIndexes.VOL_K_FIS] *= (
-            BARN_PER_CM2 * self._macroData[:, DataIndexes.VOLUMES])
+        gather = self._getMacroGather(zais, microxs.index)
+        densities = numpy.asarray(compositions.densities)
+
+        if self._executor is None:
+            self._updateMacroBlock(
+                slice(None), microxs.data, densities, *gather
+            )
+            return
+
+        futures = [
+            self._executor.submit(
+                self._updateMacroBlock, block, microxs.data, densities, *gather
+            )
+            for block in self._blocks
+        ]
+        for future in futures:
+            future.result()
+
+    def _updateMacroBlock(self, rows, micro, densities, columns, isotopes, weights):
+        """Rebuild macroscopic cross sections for a block of materials
+
+        Blocks are disjoint, so concurrent calls write to separate
+        rows of the macroscopic data.
+        """
+        dens = densities[rows][:, isotopes]
+        # Isotopes below the cutoff do not contribute
+        dens[dens < self._densityCutoff] = 0.0
+
+        macro = (micro[rows][:, columns] * dens).dot(weights)
+
+        data = self._macroData[rows]
+        data[:, DataIndexes.ABS_1] = macro[:, 0] * BARN_PER_CM2
+        data[:, DataIndexes.FIS_1] = macro[:, 1] * BARN_PER_CM2
+        data[:, DataIndexes.VOL_K_FIS] = (
+            macro[:, 2] * BARN_PER_CM2 * data[:, DataIndexes.VOLUMES]
+        )
+
+    def _getMacroGather(self, zais, reactionIndex):
+        """Locate reactions that contribute to macroscopic cross sections
+
+        Parameters
+        ----------
+        zais : tuple of int
+            Isotope ordering of the compositions
+        reactionIndex : hydep.internal.XsIndex
+            Ordering of the microscopic cross sections
+
+        Returns
+        -------
+        numpy.ndarray
+            Columns in the microscopic cross sections of all absorption
+            and fission reactions
+        numpy.ndarray
+            Position of the isotope in ``zais`` for each column
+        numpy.ndarray
+            Weights of shape ``(N, 3)`` such that summing products of
+            density and cross section with these weights produces
+            absorption, fission, and kappa fission cross sections
+
+        """
+        key = (zais, reactionIndex)
+        if self._macroGather is not None and self._macroGather[0] == key:
+            return self._macroGather[1]
+
+        starts, stops = reactionIndex.getSlices(zais)
+        counts = stops - starts
+        isotopes = numpy.repeat(numpy.arange(len(zais)), counts)
+        columns = (
+            numpy.arange(counts.sum())
+            + numpy.repeat(starts - numpy.cumsum(counts) + counts, counts)
+        )
+
+        mts = reactionIndex.rxnArray[columns]
+        fission = numpy.isin(mts, list(FISSION_REACTIONS))
+        keep = fission | numpy.isin(mts, list(self._NON_FISS_ABS_MT))
+        columns = columns[keep]
+        isotopes = isotopes[keep]
+        fission = fission[keep]
+
+        qvalues = numpy.array([self._isotopeFissionQs.get(z, 0.0) for z in zais])
+        weights = numpy.zeros((columns.size, 3))
+        weights[:, 0] = 1.0
+        weights[fission, 1] = 1.0
+        weights[fission, 2] = qvalues[isotopes[fission]]
+
+        gather = columns, isotopes, weights
+        self._macroGather = key, gather
+        return gather
 
 
 class MixedRK4Integrator(RK4Integrator):
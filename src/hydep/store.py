@@ -74,3 +74,21 @@ class BaseStore(ABC):
             :meth:`beforeMain`
 
         """
+
+    def writeTimings(self, timeStep, timings) -> None:
+        """Write the time spent in each phase of the solution
+
+        Not required to be implemented, and performs no actions
+        by default.
+
+        Parameters
+        ----------
+        timeStep : hydep.internal.TimeStep
+            Point in calendar time that corresponds to the most recent
+            transport solution
+        timings : mapping of str to float
+            Walltime [s] spent in named sections of the solution since
+            the previous transport solution, including that transport
+            solution
+
+        """
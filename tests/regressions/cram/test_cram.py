@@ -5,13 +5,14 @@ Use full (~1000) isotope matrices provided from Serpent
 """
 
 import pathlib
+import time
 from warnings import warn
 
 import numpy
 from scipy.sparse import dok_matrix
 import pytest
 
-from hydep.internal.cram import Cram16Solver, Cram48Solver
+from hydep.internal.cram import IPFCramSolver, Cram16Solver, Cram48Solver
 from tests.regressions import config
 
 
@@ -93,3 +94,31 @@ def cramharness():
 def test_cram(cramharness, key):
     solver = cramharness.SOLVERS[key]
     assert cramharness.execute(solver, config.get("update", False))
+
+
+@pytest.mark.parametrize("compiled", (False, True))
+@pytest.mark.parametrize("key", ("Cram16Solver", "Cram48Solver"))
+def test_cramAccuracy(cramharness, key, compiled, record_property):
+    """Time the solvers and compare against the reference compositions"""
+    base = cramharness.SOLVERS[key]
+    solver = IPFCramSolver(base.alpha, base.theta, base.alpha0, compiled=compiled)
+    # Exclude building the orderings and schedules from the timing
+    solver(cramharness.depmtx, cramharness.n0, cramharness.deltaT)
+
+    start = time.perf_counter()
+    n1 = solver(cramharness.depmtx, cramharness.n0, cramharness.deltaT)
+    elapsed = time.perf_counter() - start
+
+    _dt, _zai, expected, _abs = cramharness.readIsotopicsFile(
+        cramharness._getsolverfile(base, True)
+    )
+    # Trace isotopes are below round-off of the largest densities
+    significant = expected > 1e-10 * expected.max()
+    relative = (
+        numpy.abs(n1[significant] - expected[significant]) / expected[significant]
+    )
+
+    record_property("seconds", elapsed)
+    record_property("maxRelativeError", relative.max())
+    assert relative.max() < 1e-8
+    assert numpy.allclose(expected, n1)
@@ -120,15 +120,23 @@ def depletionHarness(endfChain, depletionModel):
     timestep = 50
     power = 6e6
     divisions = 1
-    manager = hydep.Manager(endfChain, [timestep], [power], divisions)
+    manager = hydep.Manager(
+        endfChain, [timestep], [power], divisions, numProcesses=2
+    )
     manager.beforeMain(depletionModel)
 
     yield DepBundle(manager, microxs, fissionYields)
 
+    manager.finalize(True)
+
 
 @pytest.mark.flaky
-def test_2x2deplete(depletionHarness):
+@pytest.mark.parametrize("solver", (None, "batchcram16"))
+@pytest.mark.parametrize("inWorkers", (False, True))
+def test_2x2deplete(depletionHarness, inWorkers, solver):
     manager = depletionHarness.manager
+    manager.buildMatricesInWorkers = inWorkers
+    manager.setDepletionSolver(solver)
 
     concentrations = hydep.internal.compBundleFromMaterials(
         manager.burnable, tuple(manager.chain)
@@ -143,3 +151,26 @@ def test_2x2deplete(depletionHarness):
 
     compare = DepletionComparator(pathlib.Path(__file__).parent)
     compare.main(out)
+
+
+@pytest.mark.flaky
+@pytest.mark.parametrize("adaptive", (False, True))
+def test_2x2reduced(depletionHarness, adaptive):
+    manager = depletionHarness.manager
+    manager.reductionThreshold = 0.0
+    manager.adaptiveReduction = adaptive
+
+    isotopes = tuple(manager.chain)
+    concentrations = hydep.internal.compBundleFromMaterials(manager.burnable, isotopes)
+
+    out = manager.deplete(
+        manager.timesteps[0],
+        concentrations,
+        depletionHarness.reactionRates,
+        depletionHarness.fissionYields,
+    )
+    assert out.isotopes == isotopes
+    assert 0 < len(manager.reducedIsotopes) < len(isotopes)
+
+    compare = DepletionComparator(pathlib.Path(__file__).parent)
+    compare.main(out)
@@ -1,7 +1,15 @@
+import asyncio
+import os
+import signal
+import sys
+import time
 from unittest.mock import patch
+
 import pytest
+from hydep import FailedSolverError
 from hydep.settings import SerpentSettings
-from hydep.serpent import SerpentRunner
+from hydep.serpent import SerpentRunner, ExtDepRunner, AsyncSerpentRunner
+from hydep.serpent.runner import STATE, SerpentProgress
 
 MAGIC_OMP_THREADS = 1234
 
@@ -62,3 +70,252 @@ def test_config():
     assert runner.executable == "sss2"
     assert runner.omp == 10
     assert runner.mpi == 4
+
+
+FAKE_SERPENT = """\
+import os
+import signal
+import sys
+
+# Mimic the external depletion interface of Serpent: block the signals
+# so none are lost, and answer each request from the parent
+signal.pthread_sigmask(
+    signal.SIG_BLOCK, {{signal.SIGUSR1, signal.SIGUSR2}}
+)
+parent = os.getppid()
+with open(sys.argv[-1]) as stream:
+    nsteps = int(stream.read())
+print("Starting fake Serpent", flush=True)
+if {fail}:
+    print("Out of memory error (fake)", flush=True)
+    sys.exit(1)
+os.kill(parent, signal.SIGUSR1)
+while True:
+    sig = signal.sigwait({{signal.SIGUSR1, signal.SIGUSR2}})
+    if sig == signal.SIGUSR1:
+        nsteps -= 1
+        os.kill(parent, signal.SIGUSR1)
+    elif nsteps:
+        os.kill(parent, signal.SIGUSR2)
+    else:
+        os.kill(parent, signal.SIGTERM)
+        sys.exit(0)
+"""
+
+
+def makeFakeSerpent(tmp_path, fail=False):
+    exe = tmp_path / "fake-sss2"
+    exe.write_text(f"#!{sys.executable}\n" + FAKE_SERPENT.format(fail=fail))
+    exe.chmod(0o755)
+    inputfile = tmp_path / "input"
+    inputfile.write_text("2")
+    return ExtDepRunner(str(exe), omp=1), inputfile
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="Requires POSIX signals")
+def test_extDepRunner(tmp_path):
+    previous = signal.getsignal(signal.SIGTERM)
+    runner, inputfile = makeFakeSerpent(tmp_path)
+
+    start = time.perf_counter()
+    runner.start(inputfile, tmp_path / "output.log")
+    assert runner.state == STATE.WAIT_IFC
+    runner.solveNext()
+    assert runner.state == STATE.WAIT_IFC
+    runner.solveEOL()
+    assert runner.state in {STATE.TERM, STATE.DEAD}
+    # Each transition would take up to one second when polling
+    assert time.perf_counter() - start < 2
+
+    runner.terminate()
+    assert signal.getsignal(signal.SIGTERM) is previous
+    assert (tmp_path / "output.log").read_text().startswith("Starting fake")
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="Requires POSIX signals")
+def test_extDepRunnerFailure(tmp_path):
+    runner, inputfile = makeFakeSerpent(tmp_path, fail=True)
+
+    start = time.perf_counter()
+    with pytest.raises(FailedSolverError, match="Out of memory"):
+        runner.start(inputfile, tmp_path / "output.log")
+    assert time.perf_counter() - start < 2
+    assert runner.state == STATE.DEAD
+    runner.terminate()
+
+
+STREAMING_SERPENT = """\
+import sys
+import time
+
+with open(sys.argv[-1]) as stream:
+    ncycles = int(stream.read())
+print("Serpent 2.1.31 (fake)", flush=True)
+for cycle in range(1, ncycles + 1):
+    print(f"Inactive cycle {{cycle:4d}} / {{ncycles}}  Source neutrons : 1000")
+    print(f" k-eff (analog)    = {{1 + cycle / 100:.5f}}", flush=True)
+    time.sleep({delay})
+for cycle in range(1, ncycles + 1):
+    print(f" Active cycle {{cycle:4d}} / {{ncycles}}  Source neutrons : 1000")
+    print(f" k-eff (analog)    = {{1 + cycle / 1000:.5f}} +/- 0.00100  [0.9 1.1]")
+    sys.stdout.flush()
+    time.sleep({delay})
+if {fail}:
+    print("Out of memory error (fake)", flush=True)
+    sys.exit(1)
+"""
+
+
+def makeStreamingSerpent(tmp_path, fail=False, delay=0.01):
+    exe = tmp_path / "fake-sss2"
+    exe.write_text(
+        f"#!{sys.executable}\n" + STREAMING_SERPENT.format(fail=fail, delay=delay)
+    )
+    exe.chmod(0o755)
+    inputfile = tmp_path / "serpent-s0"
+    inputfile.write_text("4")
+    return AsyncSerpentRunner(str(exe), omp=1), inputfile
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX scripts")
+def test_asyncRunner(tmp_path):
+    runner, inputfile = makeStreamingSerpent(tmp_path)
+    progress = []
+
+    final = runner(inputfile, callback=progress.append)
+
+    assert final == runner.progress == SerpentProgress(True, 4, 4, 1.004, 0.001)
+    # Cycle header and multiplication factor for each cycle
+    assert len(progress) == 16
+    assert progress[0] == SerpentProgress(False, 1, 4, None, None)
+    assert progress[1] == SerpentProgress(False, 1, 4, 1.01, None)
+    assert [p.cycle for p in progress if p.active] == [1, 1, 2, 2, 3, 3, 4, 4]
+
+    log = (tmp_path / "serpent-s0.log").read_text().splitlines()
+    assert log[0] == "Serpent 2.1.31 (fake)"
+    assert len(log) == 17
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX scripts")
+def test_asyncRunnerOverlap(tmp_path):
+    runner, inputfile = makeStreamingSerpent(tmp_path, delay=0.05)
+    events = []
+
+    async def other():
+        # Work done while Serpent is running
+        await asyncio.sleep(0.1)
+        events.append(("other", runner.progress))
+
+    async def main():
+        await asyncio.gather(
+            runner.run(inputfile, callback=lambda p: events.append(("serpent", p))),
+            other(),
+        )
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+    # Other work completed while progress was still being reported
+    position = [source for source, _p in events].index("other")
+    assert 0 < position < len(events) - 1
+    assert events[position][1] == events[position - 1][1]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX scripts")
+def test_asyncRunnerFailure(tmp_path):
+    runner, inputfile = makeStreamingSerpent(tmp_path, fail=True)
+
+    with pytest.raises(FailedSolverError, match="Out of memory"):
+        runner(inputfile, logfile=tmp_path / "failed.log")
+    assert runner.progress.active
+    assert (tmp_path / "failed.log").read_text().endswith(
+        "Out of memory error (fake)\n"
+    )
+
+    with pytest.raises(IOError):
+        runner(tmp_path / "missing")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX scripts")
+def test_asyncRunnerRotation(tmp_path):
+    runner, inputfile = makeStreamingSerpent(tmp_path, delay=0)
+    runner.maxBytes = 200
+    runner.backupCount = 2
+
+    runner(inputfile)
+
+    logs = sorted(p.name for p in tmp_path.glob("serpent-s0.log*"))
+    assert logs == ["serpent-s0.log", "serpent-s0.log.1", "serpent-s0.log.2"]
+    assert all(p.stat().st_size <= 200 for p in tmp_path.glob("serpent-s0.log*"))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX scripts")
+def test_asyncRunnerCancel(tmp_path, monkeypatch):
+    # Serpent would run for minutes after the first cycle
+    runner, inputfile = makeStreamingSerpent(tmp_path, delay=60)
+    processes = []
+    createProcess = asyncio.create_subprocess_exec
+
+    async def recordProcess(*args, **kwargs):
+        processes.append(await createProcess(*args, **kwargs))
+        return processes[-1]
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", recordProcess)
+
+    async def cancelled():
+        started = asyncio.Event()
+        task = asyncio.ensure_future(
+            runner.run(inputfile, callback=lambda _p: started.set())
+        )
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    def failingCallback(_progress):
+        raise ValueError("Failed in callback")
+
+    start = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(cancelled())
+        with pytest.raises(ValueError, match="callback"):
+            loop.run_until_complete(runner.run(inputfile, callback=failingCallback))
+    finally:
+        loop.close()
+    assert time.perf_counter() - start < 30
+
+    assert len(processes) == 2
+    for proc in processes:
+        assert proc.returncode == -signal.SIGKILL
+        with pytest.raises(ProcessLookupError):
+            os.kill(proc.pid, 0)
+
+
+DIRECTORY_SERPENT = """\
+import os
+import sys
+
+with open(sys.argv[-1] + "_res.m", "w") as stream:
+    stream.write(os.getcwd())
+"""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX scripts")
+@pytest.mark.parametrize("klass", (SerpentRunner, AsyncSerpentRunner))
+def test_runnerDirectory(tmp_path, klass):
+    """Serpent is run next to the input file, not the working directory"""
+    exe = tmp_path / "fake-sss2"
+    exe.write_text(f"#!{sys.executable}\n" + DIRECTORY_SERPENT)
+    exe.chmod(0o755)
+    rundir = tmp_path / "run"
+    rundir.mkdir()
+    inputfile = rundir / "serpent-s0"
+    inputfile.write_text("")
+
+    klass(str(exe), omp=1)(inputfile)
+
+    assert (rundir / "serpent-s0_res.m").read_text() == str(rundir)
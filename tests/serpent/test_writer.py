@@ -12,6 +12,7 @@ from hydep.internal import (
 )
 import hydep.serpent
 from hydep.serpent.utils import Library
+from hydep.serpent.writer import _scanProblemIsotopes
 
 from tests import strcompare, filecompare
 from tests.regressions import config
@@ -160,6 +161,21 @@ def test_writeSteadyStateFile(tmp_path, beavrsMaterials):
 
     testfile.unlink()
 
+    # Isotope names are cached, but must follow problematic isotopes
+    xsdataf = tmp_path / "fake.xsdata"
+    xsdataf.write_text("")
+    writer.updateProblemIsotopes([(92, 235, 0)], xsdataf)
+    updated = writer.writeSteadyStateFile(
+        tmp_path / "missing_steady_state", comp, TimeStep(), 1e4,
+    )
+    refcontent = "".join(
+        line for line in reference.read_text().splitlines(keepends=True)
+        if not line.startswith("92235.")
+    )
+    assert strcompare(
+        refcontent, updated.read_text().replace(str(basefile), "BASEFILE")
+    )
+
 
 @pytest.mark.serpent
 def test_filteredMaterials(tmp_path, fakeXsDataStream):
@@ -212,6 +228,12 @@ def test_filteredMaterials(tmp_path, fakeXsDataStream):
     assert len(p.missing) == 1
     assert BAD_ISO in p.missing
 
+    # Library scans are shared between writers
+    hits = _scanProblemIsotopes.cache_info().hits
+    other = hydep.serpent.SerpentWriter().updateProblemIsotopes(allIsotopes, xsdataf)
+    assert other == p
+    assert _scanProblemIsotopes.cache_info().hits == hits + 1
+
     missing = writer.writeMatIsoDef(stream, zip(allIsotopes, densities), LIB)
     assert missing == BAD_DENS
     strcompare("\n".join(explines), stream.getvalue())
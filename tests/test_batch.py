@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+import hydep
+from hydep.constants import SECONDS_PER_DAY
+from hydep.internal.isotope import _ISOTOPES
+
+from tests.test_integrators import (
+    AnalyticHFSolver,
+    AnalyticROSolver,
+    AnalyticStore,
+    buildDepletionChain,
+    SCHEMES,
+)
+
+
+class JsonStore(AnalyticStore):
+    """Write densities to a file, as results are lost with the worker"""
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+
+    def writeCompositions(self, timestep, compBundle):
+        super().writeCompositions(timestep, compBundle)
+        with open(self.filename, "w") as stream:
+            json.dump([list(d) for d in self.densities], stream)
+
+
+def buildAnalyticCase(scheme, filename, fail=False):
+    """Factory called in the worker processes"""
+    if fail:
+        raise ValueError("Failure in factory")
+    _ISOTOPES.clear()
+    mat = hydep.BurnableMaterial("analytic", adens=1.0, volume=1.0)
+    mat["U235"] = 1.0
+    model = hydep.Model(hydep.InfiniteMaterial(mat))
+    dep = hydep.Manager(buildDepletionChain(), [5 / SECONDS_PER_DAY], [1.0], [1])
+    integrator = SCHEMES[scheme].solver(
+        model, AnalyticHFSolver(), AnalyticROSolver(), dep, store=JsonStore(filename)
+    )
+    # Overwritten by the driver
+    integrator.settings.rundir = os.devnull
+    return integrator
+
+
+def test_batchDriver(tmp_path):
+    driver = hydep.BatchDriver(tmp_path, numThreads=4, maxWorkers=2)
+    for name, threads in [("predictor", None), ("celi", 8), ("rk4", None)]:
+        driver.add(
+            name, buildAnalyticCase, threads=threads, scheme=name,
+            filename=tmp_path / f"{name}.json",
+        )
+    driver.add("fail", buildAnalyticCase, scheme="rk4", filename=None, fail=True)
+
+    with pytest.raises(ValueError, match="exists"):
+        driver.add("celi", buildAnalyticCase, scheme="celi", filename=None)
+
+    assert driver.names == ("predictor", "celi", "rk4", "fail")
+
+    results = driver.run()
+
+    assert [r.name for r in results] == list(driver.names)
+    for result in results[:3]:
+        assert result.error is None, result.name
+        assert result.walltime > 0
+        assert result.directory == tmp_path / result.name
+        assert result.directory.is_dir()
+        # Requests larger than the node are reduced
+        assert result.threads == (4 if result.name == "celi" else 2)
+
+        with (tmp_path / f"{result.name}.json").open() as stream:
+            densities = json.load(stream)
+        _klass, eosXe, eosU = SCHEMES[result.name]
+        assert densities[-1] == pytest.approx([eosXe, eosU])
+
+    # Cases start in order, so rk4 waits for celi to use the whole node
+    mtimes = {
+        name: (tmp_path / f"{name}.json").stat().st_mtime_ns
+        for name in ("celi", "rk4")
+    }
+    assert mtimes["celi"] < mtimes["rk4"]
+
+    fail = results[-1]
+    assert isinstance(fail.error, ValueError)
+    assert fail.walltime is None
+
+
+def test_batchDriverOptions(tmp_path):
+    with pytest.raises(ValueError):
+        hydep.BatchDriver(tmp_path, numThreads=0)
+    with pytest.raises(TypeError):
+        hydep.BatchDriver(tmp_path, numThreads=2, maxWorkers=1.5)
+
+    driver = hydep.BatchDriver(tmp_path, numThreads=2)
+    assert driver.maxWorkers == 2
+    with pytest.raises(TypeError):
+        driver.add("bad", None)
+    with pytest.raises(ValueError):
+        driver.add("bad", buildAnalyticCase, threads=0, scheme="celi")
+    assert driver.names == ()
@@ -1,8 +1,19 @@
+import itertools
 import math
+import pickle
 
+import numpy
 import pytest
-from hydep.constants import REACTION_MT_MAP
-from hydep.internal import ReactionTuple, DecayTuple, getIsotope
+import hydep.internal.pattern
+from hydep.constants import REACTION_MT_MAP, FISSION_REACTIONS
+from hydep.internal import (
+    ReactionTuple,
+    DecayTuple,
+    getIsotope,
+    MaterialData,
+    MaterialDataArray,
+    XsIndex,
+)
 
 
 def test_chain(simpleChain):
@@ -92,3 +103,169 @@ def test_xsindex(simpleChain):
         assert index.zais[start] == zai
         assert index[ix] == (zai, rxn)
         assert index(zai, rxn) == ix
+
+
+def test_pickleChain(simpleChain):
+    restored = pickle.loads(pickle.dumps(simpleChain))
+    assert isinstance(restored, type(simpleChain))
+    assert restored.zaiOrder == simpleChain.zaiOrder
+    assert restored.reactionIndex == simpleChain.reactionIndex
+    for actual, expected in zip(restored, simpleChain):
+        assert actual.reactions == expected.reactions
+        assert actual.decayModes == expected.decayModes
+        assert actual.decayConstant == expected.decayConstant
+
+
+def _referenceMatrix(chain, rates, fissionYields):
+    """Dense depletion matrix built one term at a time"""
+    n = len(chain)
+    mtx = numpy.zeros((n, n))
+    index = chain.reactionIndex
+    for col, isotope in enumerate(chain):
+        for rxn in isotope.reactions:
+            try:
+                rate = rates[index(isotope.zai, rxn.mt)]
+            except ValueError:
+                continue
+            mtx[col, col] -= rate * rxn.branch
+            if rxn.mt in FISSION_REACTIONS:
+                for product, fyield in fissionYields.get(isotope.zai, {}).items():
+                    if product in chain:
+                        mtx[chain.index(product), col] += rate * fyield
+            elif rxn.target is not None and rxn.target in chain:
+                mtx[chain.index(rxn.target), col] += rate * rxn.branch
+        if isotope.decayConstant is not None:
+            mtx[col, col] -= isotope.decayConstant
+        for decay in isotope.decayModes:
+            if decay.target is not None and decay.target in chain:
+                mtx[chain.index(decay.target), col] += (
+                    isotope.decayConstant * decay.branch
+                )
+    return mtx
+
+
+def test_formMatrix(simpleChain):
+    rates = numpy.linspace(1, 2, len(simpleChain.reactionIndex))
+    fissionYields = {
+        iso.zai: iso.fissionYields.at(0)
+        for iso in simpleChain
+        if iso.fissionYields is not None
+    }
+    expected = _referenceMatrix(simpleChain, rates, fissionYields)
+
+    actual = simpleChain.formMatrix(
+        MaterialData(simpleChain.reactionIndex, rates), fissionYields
+    )
+    assert actual.toarray() == pytest.approx(expected)
+
+    pattern = simpleChain.getMatrixPattern()
+    assert simpleChain.getMatrixPattern(dict(pattern.ordering)) is pattern
+    assert simpleChain.getMatrixPattern(simpleChain.zaiOrder) is pattern
+    assert pattern.nnz == actual.nnz
+    diagRows = numpy.repeat(numpy.arange(len(simpleChain)), numpy.diff(pattern.indptr))
+    assert (diagRows[pattern.diagonal] == pattern.indices[pattern.diagonal]).all()
+
+    # Plain mappings are allowed for fission yields
+    plainYields = {zai: dict(fy.items()) for zai, fy in fissionYields.items()}
+    data = pattern.fill(rates, plainYields)
+    assert data == pytest.approx(actual.data)
+
+    with pytest.raises(ValueError):
+        simpleChain.formMatrix(
+            MaterialData(XsIndex([922350], [18], [0, 1]), rates[:1]), {}
+        )
+
+
+def test_formMatrices(simpleChain):
+    nmats = 3
+    rates = numpy.linspace(1, 2, nmats * len(simpleChain.reactionIndex)).reshape(
+        nmats, len(simpleChain.reactionIndex)
+    )
+    thermal = {
+        iso.zai: iso.fissionYields.at(0)
+        for iso in simpleChain
+        if iso.fissionYields is not None
+    }
+    fast = {
+        iso.zai: iso.fissionYields.at(-1)
+        for iso in simpleChain
+        if iso.fissionYields is not None
+    }
+    fissionYields = [thermal, fast, thermal]
+
+    data = simpleChain.formMatrices(
+        MaterialDataArray(simpleChain.reactionIndex, rates), fissionYields
+    )
+    pattern = simpleChain.getMatrixPattern()
+    assert data.shape == (nmats, pattern.nnz)
+
+    for ix, row in enumerate(data):
+        expected = simpleChain.formMatrix(
+            MaterialData(simpleChain.reactionIndex, rates[ix]), fissionYields[ix]
+        )
+        assert row == pytest.approx(expected.data)
+        assert pattern.toCsr(row).toarray() == pytest.approx(expected.toarray())
+
+    with pytest.raises(ValueError):
+        pattern.fillMany(rates, fissionYields[:-1])
+
+
+def test_fillManyYieldIdentity(endfChain, monkeypatch):
+    """Operators are not shared between distinct yields with the same id"""
+    thermal = {
+        iso.zai: iso.fissionYields.at(0)
+        for iso in endfChain
+        if iso.fissionYields is not None
+    }
+    fast = {
+        iso.zai: iso.fissionYields.at(-1)
+        for iso in endfChain
+        if iso.fissionYields is not None
+    }
+    fissionYields = [thermal, fast, fast, thermal]
+    pattern = endfChain.getMatrixPattern()
+    rates = numpy.random.default_rng(9).random(
+        (len(fissionYields), len(endfChain.reactionIndex))
+    )
+    expected = pattern.fillMany(rates, fissionYields)
+    assert not numpy.allclose(expected[0], pattern.fillMany(rates[:1], [fast])[0])
+
+    # Emulate ids reused after the yields are released
+    monkeypatch.setattr(hydep.internal.pattern, "id", lambda _obj: 0, raising=False)
+    actual = pattern.fillMany(rates, fissionYields)
+    assert actual == pytest.approx(expected, rel=1e-14)
+
+
+def test_findReachable(endfChain):
+    assert endfChain.findReachable([]) == ()
+    # Isotopes not in the chain are ignored
+    assert endfChain.findReachable([10010, 999990]) == endfChain.findReachable([10010])
+
+    reachable = endfChain.findReachable([922350, 80160])
+    assert reachable == tuple(z for z in endfChain.zaiOrder if z in reachable)
+    assert 922350 in reachable
+    assert 922360 in reachable
+    assert 400950 in reachable  # Zr95 from fission
+    assert len(reachable) < len(endfChain)
+
+    # Closed under transmutation and decay
+    members = set(reachable)
+    for zai in reachable:
+        isotope = endfChain[endfChain.index(zai)]
+        for event in itertools.chain(isotope.reactions, isotope.decayModes):
+            if event.target is not None and event.target.zai in endfChain:
+                assert event.target.zai in members
+
+
+def test_matrixPatternCache(simpleChain):
+    zais = simpleChain.zaiOrder
+    # Rotated orderings produce distinct patterns
+    orderings = [zais[ix:] + zais[:ix] for ix in range(9)]
+    first = simpleChain.getMatrixPattern(orderings[0])
+    assert simpleChain.getMatrixPattern(list(orderings[0])) is first
+    assert dict(first.ordering) == {z: ix for ix, z in enumerate(orderings[0])}
+
+    for ordering in orderings[1:]:
+        simpleChain.getMatrixPattern(ordering)
+    assert len(simpleChain._patterns) == 8
+    assert simpleChain.getMatrixPattern(orderings[0]) is not first
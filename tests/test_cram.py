@@ -0,0 +1,136 @@
+import numpy
+import scipy.sparse
+from scipy.sparse.linalg import spsolve
+import pytest
+
+from hydep.internal import cram
+
+
+def _referenceCram(solver, A, n0, dt):
+    A = scipy.sparse.csr_matrix(A * dt, dtype=numpy.float64)
+    y = numpy.array(n0, dtype=numpy.float64)
+    ident = scipy.sparse.eye(A.shape[0])
+    for alpha, theta in zip(solver.alpha, solver.theta):
+        y += 2 * numpy.real(alpha * spsolve(A - theta * ident, y))
+    return y * solver.alpha0
+
+
+def _buildMatrix(n, seed):
+    """Random transmutation matrix with one isotope lacking a diagonal"""
+    offdiag = scipy.sparse.random(
+        n, n, density=0.08, random_state=seed, format="coo"
+    )
+    keep = offdiag.row != offdiag.col
+    rows = offdiag.row[keep]
+    cols = offdiag.col[keep]
+    values = offdiag.data[keep]
+    # Isotope zero is stable and never removed
+    values[cols == 0] = 0
+    removal = numpy.bincount(cols, weights=values, minlength=n)
+    diag = numpy.arange(1, n)
+    return scipy.sparse.csr_matrix(
+        (
+            numpy.concatenate((values, -removal[1:])),
+            (numpy.concatenate((rows, diag)), numpy.concatenate((cols, diag))),
+        ),
+        shape=(n, n),
+    )
+
+
+@pytest.mark.parametrize("solverName", ["Cram16Solver", "Cram48Solver"])
+def test_structureReuse(solverName):
+    solver = getattr(cram, solverName)
+    n = 60
+    A = _buildMatrix(n, 4)
+    A.sum_duplicates()
+    n0 = numpy.random.default_rng(5).random(n)
+    dt = 0.5
+
+    structure = cram.getShiftedStructure(A, solver.theta[0], dt)
+    assert structure.diagonal.size == n
+    assert (structure.indices[structure.diagonal] == numpy.arange(n)).all()
+
+    original = n0.copy()
+    actual = solver(A, n0, dt)
+    assert n0 == pytest.approx(original, abs=0, rel=0)
+    assert actual == pytest.approx(_referenceCram(solver, A, n0, dt), rel=1e-10)
+
+    # Same pattern, different values, reusing scratch space
+    workspace = cram.getWorkspace(structure)
+    nbytes = workspace.nbytes
+    assert nbytes > 0
+    shifted = workspace.get("shifted", (structure.nnz, ), numpy.complex128)
+
+    B = A.copy()
+    B.data *= 2
+    assert cram.getShiftedStructure(B) is structure
+    actual = solver(B, n0, dt)
+    assert actual == pytest.approx(_referenceCram(solver, B, n0, dt), rel=1e-10)
+    assert workspace.get("shifted", (structure.nnz, ), numpy.complex128) is shifted
+    assert workspace.nbytes == nbytes
+
+
+def test_batchedCram():
+    n = 40
+    nmats = 5
+    rng = numpy.random.default_rng(6)
+    A = _buildMatrix(n, 7)
+    A.sum_duplicates()
+    matrices = []
+    for _ in range(nmats):
+        mtx = A.copy()
+        mtx.data *= rng.random(mtx.nnz)
+        matrices.append(mtx)
+    densities = rng.random((nmats, n))
+    dt = 2.0
+
+    solver = cram.BatchedCramSolver(cram.Cram16Solver, blockSize=2)
+    actual = solver(matrices, densities, dt)
+    assert actual.shape == densities.shape
+    for mtx, n0, n1 in zip(matrices, densities, actual):
+        assert n1 == pytest.approx(cram.Cram16Solver(mtx, n0, dt), rel=1e-10)
+
+    # Partial final block reuses the scratch space of a full block
+    structure = cram.getShiftedStructure(
+        scipy.sparse.csr_matrix(matrices[0]), cram.Cram16Solver.theta[0], dt
+    )
+    workspace = cram.getWorkspace(structure)
+    nbytes = workspace.nbytes
+    rhs = workspace.get("blockRhs", (2, n), numpy.complex128)
+    solver(matrices, densities, dt)
+    assert workspace.nbytes == nbytes
+    assert workspace.get("blockRhs", (2, n), numpy.complex128) is rhs
+
+    with pytest.raises(ValueError, match="number"):
+        solver(matrices[:-1], densities, dt)
+
+    other = _buildMatrix(n, 8)
+    with pytest.raises(ValueError, match="structure"):
+        solver([matrices[0], other], densities[:2], dt)
+
+
+def test_compiledCram():
+    n = 50
+    A = _buildMatrix(n, 9)
+    A.sum_duplicates()
+    schedule = cram.getEliminationSchedule(A)
+    assert schedule.size == n
+    assert schedule.nnz >= A.nnz
+    assert cram.getEliminationSchedule(A.copy()) is schedule
+
+    rng = numpy.random.default_rng(10)
+    n0 = rng.random(n)
+    dt = 0.5
+    base = cram.Cram48Solver
+    solver = cram.IPFCramSolver(base.alpha, base.theta, base.alpha0, compiled=True)
+    assert solver(A, n0, dt) == pytest.approx(
+        _referenceCram(base, A, n0, dt), rel=1e-10
+    )
+
+    matrices = [A.copy() for _ in range(3)]
+    for mtx in matrices:
+        mtx.data *= rng.random(mtx.nnz)
+    densities = rng.random((3, n))
+    actual = cram.BatchedCramSolver(solver, blockSize=2)(matrices, densities, dt)
+    for mtx, start, end in zip(matrices, densities, actual):
+        assert end == pytest.approx(_referenceCram(base, mtx, start, dt), rel=1e-10)
@@ -0,0 +1,94 @@
+import numpy
+import scipy.linalg
+import scipy.sparse
+import pytest
+
+from hydep.internal.eigen import subspaceEig, warmAdjFwdEig
+
+
+def _buildKernel(n, seed):
+    """Non-symmetric, positive kernel similar to a fission matrix"""
+    rng = numpy.random.default_rng(seed)
+    x = numpy.linspace(0, 1, n)
+    kernel = numpy.exp(-20 * numpy.abs(x[:, numpy.newaxis] - x))
+    return kernel * (1 + 0.1 * rng.random((n, n)))
+
+
+def _dominantEig(matrix, nmodes):
+    values, left, right = scipy.linalg.eig(matrix, left=True)
+    order = numpy.argsort(-numpy.abs(values))[:nmodes]
+    return values[order].real, left[:, order].real, right[:, order].real
+
+
+def test_subspaceEig():
+    nmodes = 6
+    matrix = _buildKernel(80, 1)
+    values, _left, right = _dominantEig(matrix, nmodes)
+
+    # Cold start from random vectors
+    basis = numpy.random.default_rng(2).random((80, nmodes))
+    actual, vectors, iterations, converged = subspaceEig(
+        matrix, basis, nmodes, tol=1e-10, maxiter=500
+    )
+    assert converged
+    assert iterations > 1
+    assert actual == pytest.approx(values, rel=1e-8)
+    assert numpy.linalg.norm(vectors, axis=0) == pytest.approx(numpy.ones(nmodes))
+    assert numpy.abs(numpy.einsum("ij,ij->j", vectors, right)) == pytest.approx(
+        numpy.linalg.norm(right, axis=0), rel=1e-6
+    )
+
+    # Exact eigenvectors converge immediately, also with sparse matrices
+    _v, _x, iterations, converged = subspaceEig(
+        scipy.sparse.csr_matrix(matrix), right, nmodes, tol=1e-8
+    )
+    assert converged
+    assert iterations == 1
+
+    _v, _x, iterations, converged = subspaceEig(matrix, basis, nmodes, maxiter=2)
+    assert not converged
+    assert iterations == 2
+
+
+def _coldAdjFwdEig(matrix, nmodes):
+    """Stand-in for sfv.getAdjFwdEig: unit forward vectors, paired adjoints"""
+    values, left, right = _dominantEig(matrix, nmodes)
+    right /= numpy.linalg.norm(right, axis=0)
+    left /= numpy.einsum("ij,ij->j", left, right)
+    return left, right, values
+
+
+def _projectors(adj, fwd):
+    return numpy.einsum("ik,jk->kij", fwd, adj)
+
+
+def test_warmAdjFwdEig():
+    nmodes = 5
+    previous = _buildKernel(60, 3)
+    left, right, _values = _coldAdjFwdEig(previous, nmodes)
+    # Signs of the original decomposition are retained
+    left[:, 1] *= -1
+    right[:, 1] *= -1
+
+    current = previous * (1 + 0.01 * numpy.random.default_rng(4).random((60, 60)))
+    coldAdj, coldFwd, values = _coldAdjFwdEig(current, nmodes)
+
+    adj, fwd, eig, iterations, converged = warmAdjFwdEig(
+        current, nmodes, left, right, tol=1e-10, maxiter=200
+    )
+    assert converged
+    assert iterations >= 2
+    assert eig == pytest.approx(values, rel=1e-8)
+
+    # Same normalization as the full decomposition
+    assert numpy.einsum("ij,ij->j", adj, fwd) == pytest.approx(numpy.ones(nmodes))
+    assert numpy.linalg.norm(fwd, axis=0) == pytest.approx(
+        numpy.linalg.norm(coldFwd, axis=0)
+    )
+    assert (numpy.einsum("ij,ij->j", fwd, right) > 0).all()
+    assert _projectors(adj, fwd) == pytest.approx(
+        _projectors(coldAdj, coldFwd), rel=1e-6, abs=1e-10
+    )
+
+    *_rest, converged = warmAdjFwdEig(current, nmodes, left, right, maxiter=1)
+    assert not converged
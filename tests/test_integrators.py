@@ -22,7 +22,10 @@ an adaptive RK4/5 are ``[A, B](5) = [0.0105478107949492 0.4873257599455337]``
 """
 
 import collections
+import concurrent.futures
+import json
 import pathlib
+import pstats
 import math
 
 import numpy
@@ -42,6 +45,7 @@ class AnalyticStore(hydep.lib.BaseStore):
     """Class that holds densities for analytic time integration"""
     def __init__(self):
         self.densities = []
+        self.timings = []
 
     @staticmethod
     def beforeMain(*args, **kwargs):
@@ -54,6 +58,9 @@ class AnalyticStore(hydep.lib.BaseStore):
     def writeCompositions(self, _timestep, compBundle):
         self.densities.append(compBundle.densities[0])
 
+    def writeTimings(self, timestep, timings):
+        self.timings.append((timestep.total, timings))
+
 
 def transportSolution(compositions):
     """Mimic a transport solution by varying the flux using compositions"""
@@ -161,3 +168,115 @@ def test_brave_integrators(recwarn, model, manager, scheme, brave):
         assert klass.__name__ in str(w.message)
     assert len(recwarn) == 0
     assert store.densities[-1] == pytest.approx([eosXe, eosU])
+
+
+def test_instrumentation(tmp_path, model, manager):
+    store = AnalyticStore()
+    solver = hydep.CELIIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager, store=store, brave=True
+    )
+    solver.settings.basedir = tmp_path
+    solver.settings.profile = True
+    solver.settings.timingTrace = True
+
+    solver.integrate()
+
+    assert [total for total, _t in store.timings] == [0, 1]
+    bos = store.timings[0][1]
+    assert {"transport", "processBOS", "xsExtrapolation", "store"}.issubset(bos)
+    eol = store.timings[1][1]
+    assert {"transport", "depletion", "reducedOrder", "cram"}.issubset(eol)
+    assert eol["depletion"] >= eol["cram"]
+    assert manager.timers is solver.timers
+    assert solver.timers.totals["transport"] == pytest.approx(
+        bos["transport"] + eol["transport"]
+    )
+
+    stats = pstats.Stats(str(tmp_path / "hydep-profile.pstats"))
+    assert stats.total_calls > 0
+
+    with (tmp_path / "hydep-trace.json").open() as stream:
+        trace = json.load(stream)
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert names == set(solver.timers.totals)
+
+
+def test_concurrentIntegrators(tmp_path, manager):
+    """Integrators do not change the working directory, and can share a process"""
+    cwd = pathlib.Path.cwd()
+    solvers = {}
+    for scheme in ("predictor", "rk4"):
+        # Each integrator requires a unique model and manager
+        mat = hydep.BurnableMaterial(scheme, adens=1.0, volume=1.0)
+        mat["U235"] = 1.0
+        dep = hydep.Manager(manager.chain, [5 / SECONDS_PER_DAY], [1.0], [1])
+        solver = SCHEMES[scheme].solver(
+            hydep.Model(hydep.InfiniteMaterial(mat)), AnalyticHFSolver(),
+            AnalyticROSolver(), dep, store=AnalyticStore(),
+            **({} if scheme == "predictor" else {"brave": True})
+        )
+        solver.settings.basedir = tmp_path / scheme
+        solver.settings.rundir = tmp_path / scheme / "run"
+        solvers[scheme] = solver
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        for future in [executor.submit(s.integrate) for s in solvers.values()]:
+            future.result()
+
+    assert pathlib.Path.cwd() == cwd
+    for scheme, solver in solvers.items():
+        assert (tmp_path / scheme / "run").is_dir()
+        assert solver.store.densities[-1] == pytest.approx(SCHEMES[scheme][1:])
+
+
+def test_defaultStore(tmp_path, manager, monkeypatch):
+    """Default result files are placed in basedir, not the working directory"""
+    hdf = pytest.importorskip("hydep.hdf")
+
+    class FileStore(AnalyticStore):
+        def __init__(self, filename):
+            super().__init__()
+            self.filename = filename
+
+    monkeypatch.setattr(hdf, "Store", FileStore)
+    monkeypatch.chdir(tmp_path)
+
+    solvers = []
+    for name in ("first", "second"):
+        mat = hydep.BurnableMaterial(name, adens=1.0, volume=1.0)
+        mat["U235"] = 1.0
+        dep = hydep.Manager(manager.chain, [5 / SECONDS_PER_DAY], [1.0], [1])
+        solver = hydep.PredictorIntegrator(
+            hydep.Model(hydep.InfiniteMaterial(mat)), AnalyticHFSolver(),
+            AnalyticROSolver(), dep,
+        )
+        solver.settings.basedir = tmp_path / name
+        solvers.append(solver)
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        for future in [executor.submit(s.integrate) for s in solvers]:
+            future.result()
+
+    for solver in solvers:
+        assert isinstance(solver.store, FileStore)
+        assert solver.store.filename.is_absolute()
+        assert solver.store.filename == solver.settings.basedir / "hydep-results.h5"
+
+
+def test_instrumentationFailure(tmp_path, model, manager):
+    """Failures writing profiles do not hide failures in the simulation"""
+    class FailingStore(AnalyticStore):
+        def writeCompositions(self, _timestep, _compBundle):
+            raise RuntimeError("Failed in the main sequence")
+
+    solver = hydep.PredictorIntegrator(
+        model, AnalyticHFSolver(), AnalyticROSolver(), manager, store=FailingStore()
+    )
+    solver.settings.basedir = tmp_path
+    solver.settings.profile = True
+    # Trace cannot be written to a directory
+    (tmp_path / "hydep-trace.json").mkdir()
+    solver.settings.timingTrace = True
+
+    with pytest.raises(RuntimeError, match="main sequence"):
+        solver.integrate()
@@ -2,7 +2,9 @@
 Tests for the depletion manager
 """
 import copy
+import time
 import collections
+import pathlib
 
 import pytest
 import numpy
@@ -286,3 +288,112 @@ def test_manager(toy2x2lattice, manager):
             foundOrig = True
 
     assert foundOrig, "Original fuel was not recovered"
+
+
+def _buildPoolModel():
+    fuel = hydep.BurnableMaterial("fuel", mdens=10.4, U235=8e-4, U238=2e-2)
+    water = hydep.Material("water", mdens=1, H1=5e-2, O16=2e-2)
+    pin = hydep.Pin([0.42], [fuel], outer=water)
+    model = hydep.Model(hydep.CartesianLattice(2, 1, 1.23, [[pin, pin]]))
+    model.differentiateBurnableMaterials(False)
+    for m in model.root.findBurnableMaterials():
+        m.volume = 1.0
+    return model
+
+
+def test_depletionPool(safeargs):
+    with pytest.raises(ValueError):
+        hydep.Manager(*safeargs, numProcesses=0)
+
+    with pytest.raises(ValueError):
+        hydep.Manager(*safeargs, startMethod="not a start method")
+
+    serial = hydep.Manager(*safeargs, numProcesses=1)
+    serial.beforeMain(_buildPoolModel())
+    assert serial._pool is None
+    serial.finalize(True)
+
+    manager = hydep.Manager(*safeargs, numProcesses=4)
+    manager.beforeMain(_buildPoolModel())
+    # Never more workers than burnable materials
+    assert manager._getNumWorkers(len(manager.burnable)) == 2
+    assert manager._pool is not None
+
+    manager.finalize(True)
+    assert manager._pool is None
+    # Multiple calls are harmless
+    manager.finalize(False)
+
+
+def _depletionInputs(manager):
+    """Compositions, reaction rates, and fission yields for all materials"""
+    chain = manager.chain
+    nmats = len(manager.burnable)
+    compositions = hydep.internal.compBundleFromMaterials(
+        manager.burnable, tuple(chain)
+    )
+    rng = numpy.random.default_rng(12345)
+    rates = hydep.internal.MaterialDataArray(
+        chain.reactionIndex, rng.random((nmats, len(chain.reactionIndex))) * 1e-9
+    )
+    yields = {
+        iso.zai: iso.fissionYields.at(0)
+        for iso in chain if iso.fissionYields is not None
+    }
+    return compositions, rates, [yields] * nmats
+
+
+@pytest.fixture
+def freshargs(clearIsotopes):
+    """Chain built against a clean isotope registry, for depleting"""
+    chainfile = pathlib.Path(__file__).parent / "simple_chain.xml"
+    return SafeManagerArgs(hydep.DepletionChain.fromXml(str(chainfile)), (1, 1), 6e6, 1)
+
+
+def test_depletionTimers(freshargs, monkeypatch):
+    manager = hydep.Manager(*freshargs, numProcesses=1)
+    manager.beforeMain(_buildPoolModel())
+    compositions, rates, yields = _depletionInputs(manager)
+
+    formMatrices = manager.chain.formMatrices
+
+    def slowFormMatrices(*args, **kwargs):
+        # Matrix data are assembled before any CSR matrix is requested
+        time.sleep(0.05)
+        return formMatrices(*args, **kwargs)
+
+    monkeypatch.setattr(manager.chain, "formMatrices", slowFormMatrices)
+    manager.deplete(1.0, compositions, rates, yields)
+
+    timings = manager.timers.pop()
+    assert timings["matrices"] >= 0.05
+    assert "cram" in timings
+    manager.finalize(True)
+
+
+@pytest.mark.parametrize("inWorkers", [False, True])
+@pytest.mark.parametrize("solver", ["cram16", "batchcram16"])
+def test_depletionPoolResults(freshargs, solver, inWorkers):
+    serial = hydep.Manager(*freshargs, numProcesses=1)
+    serial.setDepletionSolver(solver)
+    serial.beforeMain(_buildPoolModel())
+    compositions, rates, yields = _depletionInputs(serial)
+    expected = serial.deplete(1.0, compositions, rates, yields)
+    serial.finalize(True)
+
+    # Spawned workers receive the chain and solver through pickling
+    manager = hydep.Manager(
+        *freshargs, numProcesses=2, startMethod="spawn",
+        buildMatricesInWorkers=inWorkers,
+    )
+    manager.setDepletionSolver(solver)
+    manager.beforeMain(_buildPoolModel())
+    assert manager._pool is not None
+    try:
+        actual = manager.deplete(1.0, compositions, rates, yields)
+    finally:
+        manager.finalize(True)
+
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert a == pytest.approx(e, rel=1e-12)
@@ -167,6 +167,34 @@ def test_directories(tmpdir):
         fresh.update({"basedir": "none"})
 
 
+def test_xsHistorySettings():
+    settings = Settings()
+    assert not settings.sparseXsHistory
+    assert not settings.singlePrecisionXsHistory
+
+    settings.update(
+        {"sparse xs history": "yes", "single precision xs history": "1"}
+    )
+    assert settings.sparseXsHistory
+    assert settings.singlePrecisionXsHistory
+
+    with pytest.raises(TypeError):
+        settings.sparseXsHistory = 1
+
+
+def test_instrumentationSettings():
+    settings = Settings()
+    assert not settings.profile
+    assert not settings.timingTrace
+
+    settings.update({"profile": "true", "timing trace": "yes"})
+    assert settings.profile
+    assert settings.timingTrace
+
+    with pytest.raises(TypeError):
+        settings.timingTrace = "yes"
+
+
 @pytest.fixture
 def serpentdata(tmpdir):
     datadir = pathlib.Path(tmpdir / "serpentdata")
@@ -200,6 +228,10 @@ def test_exampleConfig(serpentdata):
     assert not settings.useTempDir
     assert settings.fittingOrder == 0
     assert settings.numFittingPoints == 2
+    assert not settings.sparseXsHistory
+    assert not settings.singlePrecisionXsHistory
+    assert not settings.profile
+    assert not settings.timingTrace
 
     serpent = settings.serpent
 
@@ -230,6 +262,9 @@ def test_exampleConfig(serpentdata):
     assert sfv.modes == 10
     assert sfv.modeFraction == 0.75
     assert sfv.densityCutoff == 1e-20
+    assert not sfv.warmStart
+    assert sfv.eigenTolerance == 1e-8
+    assert sfv.numThreads == 4
 
 
 def test_emptyconfig(tmpdir):
@@ -1,7 +1,17 @@
 """Unit tests for SFV interface, not module"""
+import importlib
+import sys
+import types
+
+import numpy
 import pytest
+import hydep
+from hydep.constants import BARN_PER_CM2
+from hydep.internal import CompBundle, MaterialDataArray
 from hydep.settings import SfvSettings, Settings
 
+from tests.test_eigen import _buildKernel, _coldAdjFwdEig
+
 
 @pytest.mark.sfv
 def test_config():
@@ -64,6 +74,28 @@ def test_config():
     with pytest.raises(ValueError):
         settings.update({"modes": "200", "fake setting": "1"})
 
+    assert not settings.warmStart
+    assert settings.eigenTolerance == 1e-8
+    settings.update({"warm start": "yes", "eigen tolerance": "1E-6"})
+    assert settings.warmStart
+    assert settings.eigenTolerance == 1e-6
+
+    with pytest.raises(ValueError):
+        settings.update({"eigen tolerance": "0"})
+
+    with pytest.raises(TypeError):
+        settings.update({"eigen tolerance": "tight"})
+
+    assert settings.numThreads == 1
+    settings.update({"threads": "8"})
+    assert settings.numThreads == 8
+
+    with pytest.raises(ValueError):
+        settings.update({"threads": "0"})
+
+    with pytest.raises(TypeError):
+        settings.numThreads = 1.5
+
 
 def test_fromSettings():
     """Test the integration into the dynamic settings framework"""
@@ -76,9 +108,210 @@ def test_fromSettings():
                 "modes": "1E6",
                 "mode fraction": "0.5",
                 "density cutoff": "1E-5",
+                "threads": "2",
             },
         }
     )
     assert hsettings.sfv.modes == 1e6
     assert hsettings.sfv.modeFraction == 0.5
     assert hsettings.sfv.densityCutoff == 1e-5
+    assert hsettings.sfv.numThreads == 2
+
+
+@pytest.fixture
+def sfvSolverModule(monkeypatch):
+    """Solver module imported with a stand-in for the compiled sfv package
+
+    Only routines that do not call into the sfv package are usable
+    """
+    def unavailable(*_args, **_kwargs):
+        raise NotImplementedError("sfv package is not available")
+
+    lib = types.ModuleType("sfv.lib")
+    lib.predict_spatial_flux = unavailable
+    fake = types.ModuleType("sfv")
+    fake.__version__ = "0.3.2"
+    fake.getAdjFwdEig = unavailable
+    fake.lib = lib
+
+    previous = [name for name in sys.modules if name.startswith("hydep.sfv")]
+    for name in previous:
+        monkeypatch.delitem(sys.modules, name)
+    monkeypatch.delattr(hydep, "sfv", raising=False)
+    monkeypatch.setitem(sys.modules, "sfv", fake)
+    monkeypatch.setitem(sys.modules, "sfv.lib", lib)
+
+    yield importlib.import_module("hydep.sfv.solver")
+
+    # Do not leak the stand-in to tests requiring the sfv package
+    for name in [name for name in sys.modules if name.startswith("hydep.sfv")]:
+        del sys.modules[name]
+    if hasattr(hydep, "sfv"):
+        delattr(hydep, "sfv")
+
+
+def _buildSfvSolver(module, chain, nmaterials, numThreads=1, cutoff=0.3, **options):
+    solver = module.SfvSolver()
+    manager = types.SimpleNamespace(
+        chain=chain,
+        burnable=[
+            types.SimpleNamespace(volume=1 + 0.1 * ix) for ix in range(nmaterials)
+        ],
+    )
+    settings = Settings()
+    settings.sfv.densityCutoff = cutoff
+    settings.sfv.numThreads = numThreads
+    for name, value in options.items():
+        setattr(settings.sfv, name, value)
+    solver.beforeMain(None, manager, settings)
+    return solver
+
+
+def _macroXsInputs(chain, nmaterials, seed):
+    rng = numpy.random.default_rng(seed)
+    # Ordering of compositions differs from the chain
+    isotopes = tuple(reversed(chain))
+    compositions = CompBundle(isotopes, rng.random((nmaterials, len(isotopes))))
+    microxs = MaterialDataArray(
+        chain.reactionIndex, rng.random((nmaterials, len(chain.reactionIndex)))
+    )
+    return compositions, microxs
+
+
+def _referenceMacroXs(solver, module, compositions, microxs):
+    """Original loop over materials and isotopes"""
+    absorption = numpy.zeros(len(microxs))
+    fission = numpy.zeros_like(absorption)
+    kappaFission = numpy.zeros_like(absorption)
+    zais = [iso.zai for iso in compositions.isotopes]
+
+    for matix, (comps, matxs) in enumerate(zip(compositions.densities, microxs)):
+        for isox, zai in enumerate(zais):
+            if comps[isox] < solver._densityCutoff:
+                continue
+            isorxns = matxs.getReactions(zai)
+            if isorxns is None:
+                continue
+            absorption[matix] += comps[isox] * sum(
+                isorxns.get(mt, 0.0) for mt in solver._NON_FISS_ABS_MT
+            )
+            sigf = sum(isorxns.get(mt, 0.0) for mt in module.FISSION_REACTIONS)
+            absorption[matix] += sigf * comps[isox]
+            fission[matix] += sigf * comps[isox]
+            kappaFission[matix] += (
+                sigf * comps[isox] * solver._isotopeFissionQs[zai]
+            )
+
+    volumes = solver._macroData[:, module.DataIndexes.VOLUMES]
+    return (
+        absorption * BARN_PER_CM2,
+        fission * BARN_PER_CM2,
+        kappaFission * BARN_PER_CM2 * volumes,
+    )
+
+
+def test_macroXsUpdate(sfvSolverModule, simpleChain):
+    nmaterials = 4
+    indexes = sfvSolverModule.DataIndexes
+    solver = _buildSfvSolver(sfvSolverModule, simpleChain, nmaterials)
+    compositions, microxs = _macroXsInputs(simpleChain, nmaterials, 7)
+    densities = compositions.densities.copy()
+    # Some isotopes with cross sections fall below the cutoff
+    assert (densities < solver._densityCutoff).any()
+
+    solver._updateMacroFromMicroXs(compositions, microxs)
+    solver.finalize(True)
+
+    assert compositions.densities == pytest.approx(densities, abs=0, rel=0)
+    absorption, fission, kappaFission = _referenceMacroXs(
+        solver, sfvSolverModule, compositions, microxs
+    )
+    assert (kappaFission > 0).all()
+    data = solver._macroData
+    assert data[:, indexes.ABS_1] == pytest.approx(absorption, rel=1e-12)
+    assert data[:, indexes.FIS_1] == pytest.approx(fission, rel=1e-12)
+    assert data[:, indexes.VOL_K_FIS] == pytest.approx(kappaFission, rel=1e-12)
+
+    # Gather is reused for the same ordering, and rebuilt for another
+    gather = solver._macroGather
+    solver._updateMacroFromMicroXs(compositions, microxs)
+    assert solver._macroGather is gather
+
+    chainOrder = CompBundle(tuple(simpleChain), compositions.densities[:, ::-1])
+    solver._updateMacroFromMicroXs(chainOrder, microxs)
+    assert solver._macroGather is not gather
+    assert data[:, indexes.ABS_1] == pytest.approx(absorption, rel=1e-12)
+    assert data[:, indexes.VOL_K_FIS] == pytest.approx(kappaFission, rel=1e-12)
+
+
+def test_threadedMacroXsUpdate(sfvSolverModule, simpleChain):
+    nmaterials = 7
+    compositions, microxs = _macroXsInputs(simpleChain, nmaterials, 8)
+
+    serial = _buildSfvSolver(sfvSolverModule, simpleChain, nmaterials)
+    assert serial._executor is None
+    serial._updateMacroFromMicroXs(compositions, microxs)
+    serial.finalize(True)
+
+    threaded = _buildSfvSolver(
+        sfvSolverModule, simpleChain, nmaterials, numThreads=3
+    )
+    executor = threaded._executor
+    assert executor is not None
+    # Materials are not evenly divided across the blocks
+    sizes = [b.stop - b.start for b in threaded._blocks]
+    assert sum(sizes) == nmaterials
+    assert len(set(sizes)) > 1
+
+    threaded._updateMacroFromMicroXs(compositions, microxs)
+    indexes = sfvSolverModule.DataIndexes
+    columns = [indexes.ABS_1, indexes.FIS_1, indexes.VOL_K_FIS]
+    assert (threaded._macroData[:, columns] == serial._macroData[:, columns]).all()
+
+    threaded.finalize(True)
+    assert threaded._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
+    # Multiple calls are harmless
+    threaded.finalize(False)
+
+    # Never more threads than materials
+    wide = _buildSfvSolver(sfvSolverModule, simpleChain, 2, numThreads=8)
+    assert len(wide._blocks) == 2
+    wide.finalize(True)
+
+
+def test_warmStartNormalization(sfvSolverModule, simpleChain, monkeypatch):
+    nmaterials = 40
+    nmodes = 6
+    monkeypatch.setattr(sfvSolverModule, "getAdjFwdEig", _coldAdjFwdEig)
+    warmResults = []
+    warmAdjFwdEig = sfvSolverModule.warmAdjFwdEig
+
+    def recordWarmStart(*args, **kwargs):
+        warmResults.append(warmAdjFwdEig(*args, **kwargs))
+        return warmResults[-1]
+
+    monkeypatch.setattr(sfvSolverModule, "warmAdjFwdEig", recordWarmStart)
+    solver = _buildSfvSolver(
+        sfvSolverModule, simpleChain, nmaterials, modes=nmodes, warmStart=True,
+        eigenTolerance=1e-10,
+    )
+    previous = _buildKernel(nmaterials, 11)
+    current = previous * (
+        1 + 0.01 * numpy.random.default_rng(12).random(previous.shape)
+    )
+
+    solver._bosProcessFmtx(types.SimpleNamespace(fmtx=previous), None)
+    solver._bosProcessFmtx(types.SimpleNamespace(fmtx=current), None)
+    solver.finalize(True)
+    assert [result[-1] for result in warmResults] == [True]
+    adj, fwd = solver._eigenBasis
+
+    # Warm start must agree with a full solution on the current matrix
+    coldAdj, coldFwd, values = _coldAdjFwdEig(current, nmodes)
+    assert solver._eigenvalues == pytest.approx(1 / values, rel=1e-8)
+    assert numpy.einsum("ij,ij->j", adj, fwd) == pytest.approx(numpy.ones(nmodes))
+    signs = numpy.sign(numpy.einsum("ij,ij->j", fwd, coldFwd))
+    assert fwd == pytest.approx(coldFwd * signs, abs=1e-8)
+    assert adj == pytest.approx(coldAdj * signs, abs=1e-6)
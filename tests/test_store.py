@@ -41,7 +41,7 @@ def compositions(simpleChain):
 
 @pytest.fixture
 def h5Destination(tmp_path, result, compositions, simpleChain):
-    dest = (tmp_path / __file__).with_suffix(".h5")
+    dest = tmp_path / "test_store.h5"
 
     store = hydep.hdf.Store(filename=dest)
     assert store.fp.samefile(dest)
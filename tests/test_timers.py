@@ -0,0 +1,52 @@
+import json
+import time
+
+import pytest
+
+from hydep.internal.timers import Timers
+
+
+def test_timers(tmp_path):
+    timers = Timers()
+    assert timers.current == {}
+
+    with timers.time("outer"):
+        with timers.time("inner"):
+            time.sleep(0.01)
+    timers.add("external", 2.0)
+
+    current = timers.pop()
+    assert set(current) == {"outer", "inner", "external"}
+    assert current["outer"] >= current["inner"] >= 0.01
+    assert current["external"] == 2.0
+    assert timers.current == {}
+
+    timers.add("external", 1.0)
+    assert timers.pop() == {"external": 1.0}
+    assert timers.totals["external"] == 3.0
+
+    with pytest.raises(AttributeError):
+        timers.writeChromeTrace(tmp_path / "trace.json")
+
+    timers.reset()
+    assert timers.totals == {}
+
+
+def test_chromeTrace(tmp_path):
+    timers = Timers(recordEvents=True)
+    with timers.time("outer"):
+        with timers.time("inner"):
+            pass
+
+    dest = tmp_path / "trace.json"
+    timers.writeChromeTrace(dest)
+    with dest.open() as stream:
+        events = json.load(stream)["traceEvents"]
+
+    assert [e["name"] for e in events] == ["inner", "outer"]
+    inner, outer = events
+    for event in events:
+        assert event["ph"] == "X"
+        assert event["dur"] >= 0
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
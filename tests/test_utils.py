@@ -79,3 +79,17 @@ def test_compBundle(passIsotopes, applyThreshold):
         assert bundle.densities[0, isox] == (0.0 if d0 is None else d0), key
         d1 = fuel1.get(key)
         assert bundle.densities[1, isox] == (0.0 if d1 is None else d1), key
+
+
+def test_transportResultTimings():
+    result = hydep.internal.TransportResult([1.0, 2.0], [1.0, numpy.nan])
+    assert result.timings is None
+
+    result.timings = {"macroxs": 0.5, "prediction": 1}
+    assert result.timings == {"macroxs": 0.5, "prediction": 1}
+
+    with pytest.raises(TypeError):
+        result.timings = [0.5, 1]
+
+    with pytest.raises(TypeError):
+        result.timings = {"prediction": "fast"}
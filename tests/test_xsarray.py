@@ -1,5 +1,9 @@
+import pickle
+
 import numpy
+from numpy.polynomial import polynomial
 import pytest
+from hydep.internal import TimeTraveler
 from hydep.internal.xs import (
     XsIndex,
     MaterialData,
@@ -83,6 +87,46 @@ def test_indexFailure():
         valid(10010, 18)
 
 
+def test_indexBulk(xsInputs):
+    index = xsInputs.index
+    assert (index.zaiArray == index.zais).all()
+    assert (index.rxnArray == index.rxns).all()
+    assert (index.zptrArray == index.zptr).all()
+    with pytest.raises(ValueError):
+        index.zaiArray[0] = 0
+
+    zais, rxns = zip(*index)
+    assert index.indices(zais, rxns) == pytest.approx(numpy.arange(len(index)))
+    assert index.indices([922380, 10010], 102) == pytest.approx([6, 0])
+    assert index.indices([922380, 10010, 333], [18, 18, 102], default=-1) == (
+        pytest.approx([5, -1, -1])
+    )
+    with pytest.raises(ValueError, match="Reactions"):
+        index.indices([10010], [18])
+
+    ordering = [922350, 333, 10010, 922380]
+    assert index.findZais(ordering, default=-1) == pytest.approx([3, -1, 0, 4])
+    with pytest.raises(ValueError, match="Isotopes"):
+        index.findZais(ordering)
+
+    starts, stops = index.getSlices(ordering)
+    assert starts == pytest.approx([3, 0, 0, 5])
+    assert stops == pytest.approx([5, 0, 1, 7])
+    for zai, start, stop in zip(ordering, starts, stops):
+        expected = xsInputs.getReactions(zai, {})
+        assert dict(zip(index.rxns[start:stop], xsInputs.data[start:stop])) == expected
+
+    # Isotopes without reactions
+    sparse = XsIndex([10010, 541350, 922350], [102, 18, 102], [0, 1, 1, 3])
+    assert sparse[1] == (922350, 18)
+    assert sparse.getSlices([541350])[1] == pytest.approx([1])
+
+    # Pickling retains lookup arrays
+    clone = pickle.loads(pickle.dumps(index))
+    assert clone == index
+    assert clone.indices(zais, rxns) == pytest.approx(numpy.arange(len(index)))
+
+
 @pytest.fixture
 def xsArray(xsInputs):
     return MaterialDataArray(
@@ -123,6 +167,44 @@ def test_xsMath(xsArray):
 
     assert xsArray.data == pytest.approx(orig)
 
+    # Accumulate into existing arrays
+    out = MaterialDataArray(xsArray.index, numpy.empty_like(orig))
+    result = MaterialDataArray.fromLinearCombination(
+        (0.5, xsArray), (1.5, mul), (2, xsArray), out=out
+    )
+    assert result is out
+    assert out.data == pytest.approx(orig * 4)
+
+    first = xsArray * 1
+    MaterialDataArray.fromLinearCombination((2, first), (1, xsArray), out=first)
+    assert first.data == pytest.approx(orig * 3)
+
+    with pytest.raises(ValueError, match="memory"):
+        MaterialDataArray.fromLinearCombination((2, xsArray), (1, first), out=first)
+    with pytest.raises(ValueError, match="shape"):
+        MaterialDataArray.fromLinearCombination(
+            (1, xsArray), out=MaterialDataArray(xsArray.index, orig[:1].copy())
+        )
+
+    # Strided data fall back to numpy arithmetic
+    strided = MaterialDataArray(xsArray.index, numpy.repeat(orig, 2, axis=0)[::2])
+    result = MaterialDataArray.fromLinearCombination((1, xsArray), (2, strided))
+    assert result.data == pytest.approx(orig * 3)
+    assert xsArray.data == pytest.approx(orig)
+
+
+def test_xsArrayViews(xsArray):
+    row = xsArray.getRow(1)
+    assert numpy.shares_memory(row, xsArray.data)
+    assert row == pytest.approx(xsArray[1].data)
+
+    columns = xsArray.getReactions(922350)
+    assert set(columns) == {18, 102}
+    for rxn, values in columns.items():
+        assert numpy.shares_memory(values, xsArray.data)
+        assert values == pytest.approx(xsArray.data[:, xsArray.index(922350, rxn)])
+    assert xsArray.getReactions(333) is None
+
 
 @pytest.mark.parametrize("order", (0, 1, 2))
 def test_extrapolation(xsArray, order):
@@ -216,3 +298,101 @@ def test_extrapolation(xsArray, order):
             assert rate == pytest.approx(
                 xsArray.data[0, xsArray.index(zai, rxn)] * weight * flux[0, 0]
             )
+
+
+@pytest.mark.parametrize("order", (1, 2))
+def test_timeTravelerFit(order):
+    rng = numpy.random.default_rng(12)
+    traveler = TimeTraveler(3, (2, 4), order)
+    times = 86400 * numpy.array([0, 10, 25, 40, 70], dtype=float)
+    stack = rng.random((times.size, 2, 4))
+    for ix, (t, data) in enumerate(zip(times, stack)):
+        traveler.push(t, data)
+        window = slice(max(0, ix - 2), ix + 1)
+        npoints = min(ix + 1, 3)
+        coeffs = polynomial.polyfit(
+            times[window], stack[window].reshape(npoints, -1),
+            deg=min(npoints - 1, order),
+        )
+        for target in (t + 5 * 86400, t - 3 * 86400):
+            expected = polynomial.polyval(target, coeffs).reshape(2, 4)
+            actual = traveler.at(target)
+            assert actual == pytest.approx(expected)
+            # Repeated requests are retained until the next push
+            assert traveler.at(target) is actual
+            with pytest.raises(ValueError):
+                actual[0, 0] = 0
+        assert traveler.at(t) == pytest.approx(data)
+
+
+def test_reactionRatesOut(xsArray):
+    bank = DataBank(2, len(xsArray), xsArray.index)
+    bank.push(0, xsArray)
+    bank.push(10, xsArray * 2)
+
+    flux = numpy.array([1e16, 4e16])
+    expected = xsArray.data * 3 * flux[:, numpy.newaxis]
+
+    rates = bank.getReactionRatesAt(20, flux)
+    assert rates.data == pytest.approx(expected)
+    # Cross sections are not modified by in-place operations on rates
+    rates *= 2
+    assert bank.at(20).data == pytest.approx(xsArray.data * 3)
+
+    reused = bank.getReactionRatesAt(20, flux.reshape(-1, 1), out=rates)
+    assert reused is rates
+    assert reused.data == pytest.approx(expected)
+
+    with pytest.raises(ValueError, match="shape"):
+        bank.getReactionRatesAt(20, numpy.ones((2, 2)))
+    with pytest.raises(ValueError, match="shape"):
+        bank.getReactionRatesAt(
+            20, flux, out=MaterialDataArray(xsArray.index, xsArray.data[:1])
+        )
+    other = XsIndex([10010], [102], [0, 1])
+    with pytest.raises(ValueError, match="indices"):
+        bank.getReactionRatesAt(
+            20, flux, out=MaterialDataArray(other, numpy.empty((2, 1)))
+        )
+
+
+@pytest.mark.parametrize("dtype", (numpy.float64, numpy.float32))
+def test_compactDataBank(xsArray, dtype):
+    dense = DataBank(2, len(xsArray), xsArray.index)
+    bank = DataBank(2, len(xsArray), xsArray.index, dtype=dtype, sparse=True)
+    assert bank.sparse
+    assert bank.shape == dense.shape
+    assert bank.nreactions == len(xsArray.index)
+
+    first = xsArray.data.copy()
+    first[:, [1, 4]] = 0
+    second = xsArray.data * 2
+    second[:, 4] = 0
+
+    for b in (dense, bank):
+        b.push(0, MaterialDataArray(xsArray.index, first))
+    assert bank.storedColumns == pytest.approx([0, 2, 3, 5, 6])
+
+    # New non-zero reactions are added to storage
+    for b in (dense, bank):
+        b.push(10, MaterialDataArray(xsArray.index, second))
+    assert bank.storedColumns == pytest.approx([0, 1, 2, 3, 5, 6])
+
+    rtol = 1e-6 if dtype is numpy.float32 else 1e-12
+    flux = numpy.array([1e16, 4e16])
+    for t in (0, 10, 15):
+        actual = bank.at(t)
+        assert actual.data.dtype == numpy.float64
+        assert actual.data.shape == (len(xsArray), len(xsArray.index))
+        assert actual.data == pytest.approx(dense.at(t).data, rel=rtol)
+        assert bank.getReactionRatesAt(t, flux).data == pytest.approx(
+            dense.getReactionRatesAt(t, flux).data, rel=rtol
+        )
+
+    usage = bank.memoryUsage()
+    denseUsage = dense.memoryUsage()
+    assert usage["dense"] == denseUsage["dense"] == denseUsage["stored"]
+    assert usage["stored"] == (
+        2 * len(xsArray) * 6 * numpy.dtype(dtype).itemsize
+    )
+    assert usage["cached"] > 0